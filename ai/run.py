@@ -25,6 +25,24 @@ def main():
         queue_name=settings.QUEUE_NAME,
         base_path=settings.BASE_PATH,
         seed=settings.SEED,
+        fuzzy_table_mode=settings.FUZZY_TABLE_MODE,
+        fuzzy_surfaces_path=settings.FUZZY_SURFACES_PATH,
+        fuzzy_workers=settings.FUZZY_WORKERS,
+        fuzzy_memo_size=settings.FUZZY_MEMO_SIZE,
+        grud_training=settings.GRUD_TRAINING,
+        grud_chunk_size=settings.GRUD_CHUNK_SIZE,
+        grud_weight=settings.GRUD_WEIGHT,
+        lstm_weight=settings.LSTM_WEIGHT,
+        imputation_concurrent=settings.IMPUTATION_CONCURRENT,
+        imputation_torch_threads=settings.IMPUTATION_TORCH_THREADS,
+        imputation_tf_threads=settings.IMPUTATION_TF_THREADS,
+        imputation_cache=settings.IMPUTATION_CACHE,
+        imputation_cache_size=settings.IMPUTATION_CACHE_SIZE,
+        forecast_batch_size=settings.FORECAST_BATCH_SIZE,
+        forecast_shuffle=settings.FORECAST_SHUFFLE,
+        forecast_cache=settings.FORECAST_CACHE,
+        forecast_prefetch=settings.FORECAST_PREFETCH,
+        predict_cache_mb=settings.PREDICT_CACHE_MB,
     )
 
 if __name__ == '__main__':
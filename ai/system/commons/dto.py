@@ -1,3 +1,5 @@
+from typing import Optional
+
 import pydantic
 
 from system.commons import enums
@@ -12,6 +14,22 @@ class Settings(pydantic.BaseModel):
 class TrainSettings(Settings):
     temporal_space: enums.TemporalSpace
     target_body: str
+    fuzzy_table_mode: bool = False
+    fuzzy_workers: int = 1
+    grud_training: str = 'step'
+    grud_chunk_size: int = 64
+    grud_weight: float = 0.7
+    lstm_weight: float = 0.3
+    imputation_concurrent: bool = False
+    imputation_torch_threads: int = 0
+    imputation_tf_threads: int = 0
+    imputation_seed: Optional[int] = None
+    imputation_cache: bool = True
+    imputation_cache_size: int = 64
+    forecast_batch_size: int = 1
+    forecast_shuffle: bool = True
+    forecast_cache: bool = True
+    forecast_prefetch: int = -1
 
     @property
     def data_file(self):
@@ -8,6 +8,28 @@ class Settings(BaseSettings):
 
     SEED: int
 
+    FUZZY_TABLE_MODE: bool = False
+    FUZZY_SURFACES_PATH: Optional[str] = None
+    FUZZY_WORKERS: int = 1
+    FUZZY_MEMO_SIZE: int = 0
+
+    GRUD_TRAINING: str = 'step'
+    GRUD_CHUNK_SIZE: int = 64
+    GRUD_WEIGHT: float = 0.7
+    LSTM_WEIGHT: float = 0.3
+    IMPUTATION_CONCURRENT: bool = False
+    IMPUTATION_TORCH_THREADS: int = 0
+    IMPUTATION_TF_THREADS: int = 0
+    IMPUTATION_CACHE: bool = True
+    IMPUTATION_CACHE_SIZE: int = 64
+
+    FORECAST_BATCH_SIZE: int = 1
+    FORECAST_SHUFFLE: bool = True
+    FORECAST_CACHE: bool = True
+    FORECAST_PREFETCH: int = -1
+
+    PREDICT_CACHE_MB: int = 512
+
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
@@ -0,0 +1,26 @@
+import numpy as np
+
+from system.fuzzy import core
+
+# Número máximo de filas evaluadas a la vez, acota la memoria de las matrices intermedias
+_CHUNK_SIZE = core._CHUNK_SIZE
+
+
+def compute(control_system, inputs: dict, chunk_size: int = _CHUNK_SIZE) -> np.ndarray:
+    """
+    Evalúa un ctrl.ControlSystem de skfuzzy sobre arrays de entradas.
+
+    Reproduce ControlSystemSimulation.compute() (recorte a los límites del
+    universo, AND/OR como min/max, acumulación por máximo y centroide sobre el
+    universo re-muestreado) para todas las filas a la vez, con el sistema
+    compilado a matrices de core.compile_system().
+
+    Parámetros:
+        control_system (ctrl.ControlSystem): Sistema de control ya construido.
+        inputs (dict): Etiqueta del antecedente -> array 1-D con los valores crisp.
+        chunk_size (int): Filas evaluadas por bloque.
+
+    Retorna:
+        np.ndarray: Valor defuzzificado por fila, NaN donde la salida quedó vacía.
+    """
+    return core.compile_system(control_system)(inputs, chunk_size)
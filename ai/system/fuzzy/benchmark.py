@@ -0,0 +1,400 @@
+import json
+import multiprocessing
+import os
+import re
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from system.commons import enums
+from system.tools import spacer
+
+_RESEARCH_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'research'))
+
+DATASETS = ('baltezers', 'kasumigaura', 'mezcala', 'mjosa', 'ontario')
+
+# Modo -> argumentos de execute_engine; reference es serial sobre ControlSystemSimulation de skfuzzy
+MODES = {
+    'serial': dict(),
+    'reference': dict(),
+    'batch': dict(batch_mode=True),
+    'table': dict(batch_mode=True, table_mode=True),
+    'surfaces': dict(batch_mode=True),
+    'parallel': dict(batch_mode=True, parallel_threshold=0),
+}
+
+# Secciones de los reportes de research/inference (reporte_motor de los notebooks)
+_SECTIONS = {
+    'NIVEL DE NITRÓGENO': 'nitrogen_level',
+    'NIVEL DE FÓSFORO': 'phosphorus_level',
+    'BALANCE DE OXÍGENO': 'oxygen_balance',
+    'NIVEL DE SOLIDOS': 'solids_level',
+    'NIVEL DE VISIBILIDAD': 'visibility_level',
+    'CONDICIONES ADICIONALES': 'additional_conditions',
+    'CONDICIONES FÍSICAS': 'physical_conditions',
+    'NIVEL DE NUTRIENTES': 'nutrient_level',
+    'CONDICIONES QUÍMICAS': 'chemical_conditions',
+    'NIVEL DE EUTRÓFIZACION': 'eutrophication_level',
+}
+
+_LABELS = {
+    'DESCONOCIDO': 'UNKNOWN',
+    'BAJO': 'LOW',
+    'MODERADO': 'MODERATE',
+    'ALTO': 'HIGH',
+    'MUY ALTO': 'VERY HIGH',
+    'BUENO': 'GOOD',
+    'BUENAS': 'GOOD',
+    'NEUTRALES': 'NEUTRALS',
+    'MALO': 'BAD',
+    'MALAS': 'BAD',
+    'MUY MALO': 'VERY BAD',
+    'MUY MALAS': 'VERY BAD',
+    'DESFAVORABLES': 'UNFAVORABLE',
+    'FAVORABLES': 'FAVORABLE',
+    'OLIGOTRÓFICO': 'OLIGOTROPHIC',
+    'MESOTRÓFICO': 'MESOTROPHIC',
+    'EUTRÓFICO': 'EUTROPHIC',
+    'HIPEREUTRÓFICO': 'HYPEREUTROPHIC',
+}
+
+_INPUT = re.compile(r'\(([A-Za-z0-9_]+): ([-+0-9.eE]+|nan)\)')
+
+
+def load_dataset(name: str, research_path: str = _RESEARCH_PATH, temporal_space=None) -> pd.DataFrame:
+    """
+    Variables de research/datasets/<name>.csv, opcionalmente llevadas a temporal_space
+    como en workers/train.py.
+    """
+    df = pd.read_csv(os.path.join(research_path, 'datasets', f'{name}.csv'))
+
+    if temporal_space is not None:
+        df = spacer.process_data_in_temporal_space(df, temporal_space)
+
+    df = df.drop(columns=['Water Body', 'Sample Date', 'Year', 'Month', 'Week', 'Day'], errors='ignore')
+
+    return df.reset_index(drop=True).astype(np.float64)
+
+
+def parse_report(file: str) -> list[dict]:
+    """
+    Lee un reporte de research/inference.
+
+    Retorna:
+        list[dict]: Por muestra, etapa -> {'inputs', 'value', 'label'}; inputs
+        solo en las etapas de la fase 1 con entradas disponibles.
+    """
+    samples = []
+    stage = None
+
+    with open(file, encoding='utf-8') as f:
+        for line in f:
+            text = line.strip()
+
+            if text.startswith('MUESTRA:'):
+                samples.append({})
+            elif text in _SECTIONS:
+                stage = {'inputs': {}, 'value': np.nan, 'label': 'UNKNOWN'}
+                samples[-1][_SECTIONS[text]] = stage
+            elif text.startswith('ENTRADAS:'):
+                stage['inputs'] = {var: float(value) for var, value in _INPUT.findall(text)}
+            elif text.startswith('VALOR:'):
+                stage['value'] = float(text.split(':', 1)[1])
+            elif text.startswith('ETIQUETA:'):
+                stage['label'] = _LABELS[text.split(':', 1)[1].strip()]
+
+    return samples
+
+
+def report_inputs(samples: list[dict]) -> pd.DataFrame:
+    """
+    Reconstruye una fila de entrada por muestra con las variables de ENTRADAS.
+    """
+    rows = [
+        {var: value for stage in sample.values() for var, value in stage['inputs'].items()}
+        for sample in samples
+    ]
+
+    columns = sorted({var for row in rows for var in row})
+
+    return pd.DataFrame(rows, columns=columns, dtype=np.float64)
+
+
+def compare(values: dict, labels: dict, reference_values: dict, reference_labels: dict, tolerance: float) -> dict:
+    """
+    Diferencias por etapa entre dos resultados en columnas (etapa -> array).
+    """
+    stages = {}
+
+    for stage in reference_values:
+        value = np.asarray(values[stage], dtype=np.float64)
+        reference = np.asarray(reference_values[stage], dtype=np.float64)
+
+        both = ~np.isnan(value) & ~np.isnan(reference)
+        diff = np.abs(value[both] - reference[both])
+
+        stages[stage] = {
+            'rows': int(len(reference)),
+            'nan_mismatches': int((np.isnan(value) != np.isnan(reference)).sum()),
+            'max_abs_diff': float(diff.max()) if len(diff) else 0.0,
+            'within_tolerance': float((diff <= tolerance).mean()) if len(diff) else 1.0,
+            'label_agreement': float((np.asarray(labels[stage]) == np.asarray(reference_labels[stage])).mean()),
+        }
+
+    return stages
+
+
+def _columns(result) -> tuple[dict, dict]:
+    return (
+        {stage: result.value[stage] for stage in result.stages},
+        {stage: result.get_labels(stage) for stage in result.stages},
+    )
+
+
+def profile_stages(df: pd.DataFrame) -> dict:
+    """
+    Latencia por etapa del motor fila a fila (FuzzyEngine.run): media y p95 en ms por fila,
+    leída de timing.Timings (construcción más evaluación de cada componente).
+    """
+    from system.fuzzy import timing
+    from system.fuzzy.engine import FuzzyEngine
+
+    elapsed = {}
+
+    for row in df.to_dict('records'):
+        motor = FuzzyEngine(**row)
+        motor.set_timings(timings=timing.Timings())
+        motor.run()
+
+        for stage, entry in motor.timings.stages.items():
+            elapsed.setdefault(stage, []).append(entry['build'] + entry['compute'])
+
+    return {
+        stage: {
+            'mean_ms': 1000.0 * statistics.fmean(times),
+            'p95_ms': 1000.0 * float(np.percentile(times, 95)),
+        }
+        for stage, times in elapsed.items()
+    }
+
+
+def _run_mode(df: pd.DataFrame, mode: str, repeat: int, workers: int, surfaces_path) -> dict:
+    """
+    Ejecuta un modo en el proceso actual. Se llama en un proceso nuevo por modo
+    para que la caché de sistemas parta vacía y el pico de RSS sea solo del modo.
+    """
+    from system.fuzzy import core, engine, surfaces
+
+    kwargs = dict(MODES[mode])
+
+    if mode == 'reference':
+        core.set_backend('skfuzzy')
+    if mode == 'surfaces':
+        surfaces.load_surfaces(surfaces_path)
+    if mode == 'parallel':
+        kwargs['workers'] = workers
+
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = engine.execute_engine(df, columnar=True, **kwargs)
+        times.append(time.perf_counter() - start)
+
+    # El pool de execute_engine vive mientras el proceso; hay que cerrarlo para que este termine
+    engine.shutdown_pool()
+
+    values, labels = _columns(result)
+
+    # ru_maxrss está en KiB en Linux; los procesos del pool cuentan como hijos
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return {
+        'first_s': times[0],
+        'best_s': min(times),
+        'median_s': statistics.median(times),
+        'rows_per_s': len(df) / min(times) if min(times) > 0 else float('inf'),
+        'peak_rss_mb': rss / 1024.0,
+        'peak_rss_children_mb': children / 1024.0,
+        'values': values,
+        'labels': labels,
+    }
+
+
+def _isolated(function, *args):
+    # ProcessPoolExecutor y no multiprocessing.Pool: el modo parallel necesita crear sus propios procesos
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(function, *args).result()
+
+
+def run_benchmark(
+    datasets=DATASETS,
+    modes=('serial', 'batch', 'table', 'parallel'),
+    repeat: int = 3,
+    workers: int = 2,
+    tolerance: float = 5e-3,
+    temporal_space=None,
+    surfaces_path=None,
+    profile: bool = True,
+    research_path: str = _RESEARCH_PATH,
+) -> dict:
+    """
+    Mide el motor difuso sobre los datasets de research.
+
+    Por dataset y modo reporta filas/s, tiempos y pico de RSS; cada modo se
+    compara con el motor fila a fila (serial) y este con los reportes de
+    research/inference, reconstruyendo las entradas de cada muestra desde
+    sus ENTRADAS. Los reportes tienen las entradas y valores redondeados a
+    3 decimales, por lo que esa comparación es con tolerance.
+
+    Parámetros:
+        datasets (tuple): Nombres de research/datasets sin extensión.
+        modes (tuple): Claves de MODES a medir.
+        repeat (int): Ejecuciones por modo; la primera incluye construir los sistemas.
+        workers (int): Procesos del modo parallel.
+        tolerance (float): Diferencia máxima aceptada entre valores.
+        temporal_space (enums.TemporalSpace): Agregación temporal previa, o None.
+        surfaces_path (str): Directorio de superficies para el modo surfaces.
+        profile (bool): Mide también la latencia por etapa del motor fila a fila.
+        research_path (str): Directorio research del repositorio.
+
+    Retorna:
+        dict: Reporte por dataset, serializable a JSON.
+    """
+    if 'surfaces' in modes and not surfaces_path:
+        raise ValueError("El modo surfaces requiere surfaces_path")
+
+    report = {}
+
+    for name in datasets:
+        df = load_dataset(name, research_path, temporal_space)
+        logger.info(f"Benchmarking {name}: {len(df)} rows")
+
+        runs = {mode: _isolated(_run_mode, df, mode, repeat, workers, surfaces_path) for mode in modes}
+        reference = runs['serial'] if 'serial' in runs else _isolated(_run_mode, df, 'serial', 1, workers, surfaces_path)
+        reference_values = reference['values']
+        reference_labels = reference['labels']
+
+        entry = {'rows': len(df), 'modes': {}}
+
+        for mode, run in runs.items():
+            values = run.pop('values')
+            labels = run.pop('labels')
+
+            run['stages'] = compare(values, labels, reference_values, reference_labels, tolerance)
+            entry['modes'][mode] = run
+
+            logger.info(
+                f"{name} {mode}: {run['rows_per_s']:.1f} rows/s, best {run['best_s']:.3f}s, "
+                f"peak RSS {run['peak_rss_mb']:.0f} MB, "
+                f"max diff {max(stage['max_abs_diff'] for stage in run['stages'].values()):.2e}"
+            )
+
+        if profile:
+            entry['stage_latency'] = _isolated(profile_stages, df)
+
+        report_file = os.path.join(research_path, 'inference', f'{name}.txt')
+
+        if os.path.exists(report_file):
+            entry['reference'] = _check_report(report_file, tolerance)
+
+            agreement = min(stage['label_agreement'] for stage in entry['reference']['stages'].values())
+            logger.info(f"{name} vs {os.path.basename(report_file)}: min label agreement {agreement:.2%}")
+
+        report[name] = entry
+
+    return report
+
+
+def _check_report(file: str, tolerance: float) -> dict:
+    from system.fuzzy import engine
+
+    samples = parse_report(file)
+    result = engine.execute_engine(report_inputs(samples), columnar=True)
+    values, labels = _columns(result)
+
+    stages = compare(
+        values,
+        labels,
+        {stage: [sample[stage]['value'] for sample in samples] for stage in _SECTIONS.values()},
+        {stage: [sample[stage]['label'] for sample in samples] for stage in _SECTIONS.values()},
+        tolerance,
+    )
+
+    return {'samples': len(samples), 'stages': stages}
+
+
+def format_report(report: dict) -> str:
+    lines = []
+
+    for name, entry in report.items():
+        lines.append(f"\n{name} ({entry['rows']} rows)")
+        lines.append(f"  {'mode':<10}{'rows/s':>12}{'first s':>10}{'best s':>10}{'RSS MB':>10}{'max diff':>12}{'labels':>9}")
+
+        for mode, run in entry['modes'].items():
+            diff = max(stage['max_abs_diff'] for stage in run['stages'].values())
+            labels = min(stage['label_agreement'] for stage in run['stages'].values())
+            rss = max(run['peak_rss_mb'], run['peak_rss_children_mb'])
+
+            lines.append(
+                f"  {mode:<10}{run['rows_per_s']:>12.1f}{run['first_s']:>10.3f}{run['best_s']:>10.3f}"
+                f"{rss:>10.0f}{diff:>12.2e}{labels:>9.2%}"
+            )
+
+        if 'stage_latency' in entry:
+            lines.append(f"  {'stage':<24}{'mean ms':>10}{'p95 ms':>10}")
+
+            for stage, latency in entry['stage_latency'].items():
+                lines.append(f"  {stage:<24}{latency['mean_ms']:>10.3f}{latency['p95_ms']:>10.3f}")
+
+        if 'reference' in entry:
+            lines.append(f"  reference: {entry['reference']['samples']} samples")
+            lines.append(f"  {'stage':<24}{'nan diff':>10}{'max diff':>12}{'in tol':>9}{'labels':>9}")
+
+            for stage, check in entry['reference']['stages'].items():
+                lines.append(
+                    f"  {stage:<24}{check['nan_mismatches']:>10}{check['max_abs_diff']:>12.2e}"
+                    f"{check['within_tolerance']:>9.2%}{check['label_agreement']:>9.2%}"
+                )
+
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mide el motor difuso sobre los datasets de research.")
+    parser.add_argument('--datasets', nargs='+', default=list(DATASETS), choices=DATASETS)
+    parser.add_argument('--modes', nargs='+', default=['serial', 'batch', 'table', 'parallel'], choices=list(MODES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--tolerance', type=float, default=5e-3)
+    parser.add_argument('--temporal-space', choices=[space.value for space in enums.TemporalSpace])
+    parser.add_argument('--surfaces', help="Directorio de superficies para el modo surfaces")
+    parser.add_argument('--no-profile', action='store_true', help="No mide la latencia por etapa")
+    parser.add_argument('--output', help="Archivo JSON del reporte")
+
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        datasets=args.datasets,
+        modes=args.modes,
+        repeat=args.repeat,
+        workers=args.workers,
+        tolerance=args.tolerance,
+        temporal_space=enums.TemporalSpace(args.temporal_space) if args.temporal_space else None,
+        surfaces_path=args.surfaces,
+        profile=not args.no_profile,
+    )
+
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from system.commons import enums
+from system.fuzzy.componentes import (
+    aditional, chemical, eutrophication, nitrogen, nutrients, oxygen, phosphorus, physical, solids, visibility,
+)
+
+_COMPONENTS = (
+    eutrophication, chemical, physical, aditional, nutrients, nitrogen, phosphorus, oxygen, solids, visibility,
+)
+
+# Tabla de códigos común a todas las etiquetas difusas: los niveles de
+# enums.EutrophicationLevel seguidos de los términos de salida de cada componente
+CATEGORIES = tuple(dict.fromkeys([
+    *(level.value for level in enums.EutrophicationLevel),
+    *(label for component in _COMPONENTS for label in component.TERMS),
+]))
+
+CODES = {label: code for code, label in enumerate(CATEGORIES)}
+
+DTYPE = pd.CategoricalDtype(CATEGORIES)
+
+
+def recode(codes, labels) -> np.ndarray:
+    """
+    Traduce posiciones sobre labels (p. ej. Labeler.encode) a códigos de CATEGORIES.
+    """
+    return np.array([CODES[label] for label in labels], dtype=np.int8)[codes]
+
+
+def label(labeler, values) -> pd.Categorical:
+    """
+    Etiqueta values con labeler y retorna el resultado como categórico de la tabla común.
+    """
+    return pd.Categorical.from_codes(recode(labeler.encode(values), labeler.labels), dtype=DTYPE)
+
+
+def dictionary_array(codes) -> pa.DictionaryArray:
+    return pa.DictionaryArray.from_arrays(codes, pa.array(CATEGORIES))
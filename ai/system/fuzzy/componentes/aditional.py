@@ -2,6 +2,62 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from system.fuzzy import core, labels, memo, registry, spec
+
+# Variable de salida, común a todos los sistemas del componente
+UNIVERSE = np.arange(0, 1.01, 0.01)
+TERMS = {
+    'UNFAVORABLE': fuzz.trapmf(UNIVERSE, [0, 0, 0.2, 0.4]),
+    'NEUTRALS': fuzz.trimf(UNIVERSE, [0.3, 0.5, 0.7]),
+    'FAVORABLE': fuzz.trapmf(UNIVERSE, [0.6, 0.8, 1, 1]),
+}
+LABELER = labels.Labeler(UNIVERSE, TERMS)
+OUTPUT = spec.Variable('condiciones', UNIVERSE, TERMS)
+
+# Variables de entrada, compiladas una vez al importar el módulo
+VARIABLES = spec.variables(dict(
+    TEMP=dict(
+        universe = np.arange(0, 35.1, 0.1),
+        mf_definitions = {
+            'VERY LOW': {'type': 'trapmf', 'params': [0, 0, 4, 6]},
+            'LOW': {'type': 'trimf', 'params': [4, 8, 12]},
+            'MODERATE': {'type': 'trimf', 'params': [10, 18, 26]},
+            'HIGH': {'type': 'trapmf', 'params': [24, 28, 35, 35]}
+        }
+    ),
+    pH=dict(
+        universe = np.arange(5, 10.1, 0.1),
+        mf_definitions = {
+            'ACID': {'type': 'trapmf', 'params': [5, 5, 6, 6.5]},
+            'NEUTRAL': {'type': 'trimf', 'params': [6, 7, 8]},
+            'ALKALINE': {'type': 'trapmf', 'params': [7.5, 8.5, 10, 10]}
+        }
+    )
+))
+
+# Reglas por vars disponibles
+RULES = spec.rules({
+    'TEMP_pH': [
+        # Regla 1: Condiciones FAVORABLE
+        ('(TEMP[MODERATE] | TEMP[HIGH]) & pH[NEUTRAL]', 'FAVORABLE'),
+        # Regla 2: Condiciones NEUTRALS
+        ('(TEMP[LOW] & pH[NEUTRAL]) | ((TEMP[MODERATE] | TEMP[HIGH]) & (pH[ACID] | pH[ALKALINE]))', 'NEUTRALS'),
+        # Regla 3: Condiciones UNFAVORABLE
+        ('TEMP[VERY LOW] | (TEMP[LOW] & (pH[ACID] | pH[ALKALINE]))', 'UNFAVORABLE'),
+    ],
+    'TEMP': [
+        ('TEMP[MODERATE] | TEMP[HIGH]', 'FAVORABLE'),
+        ('TEMP[LOW]', 'NEUTRALS'),
+        ('TEMP[VERY LOW]', 'UNFAVORABLE'),
+    ],
+    'pH': [
+        ('pH[NEUTRAL]', 'FAVORABLE'),
+        ('pH[ALKALINE]', 'NEUTRALS'),
+        ('pH[ACID]', 'UNFAVORABLE'),
+    ],
+})
+
+
 class AdditionalConditions:
     def __init__(self, custom_vars=dict(), **kwargs):
         """
@@ -27,145 +83,47 @@ class AdditionalConditions:
         self.available_vars = {k: v for k, v in self.available_vars.items() if k in self.priority_vars}
 
         self._init_variable_definitions()
-        self._create_fuzzy_system()
+        registry.load_fuzzy_system(self, self._create_fuzzy_system, self.available_vars, self.custom_vars)
 
     def _init_variable_definitions(self):
-        self.base_vars = dict(
-            TEMP=dict(
-                universe = np.arange(0, 35.1, 0.1),
-                mf_definitions = {
-                    'VERY LOW': {'type': 'trapmf', 'params': [0, 0, 4, 6]},
-                    'LOW': {'type': 'trimf', 'params': [4, 8, 12]},
-                    'MODERATE': {'type': 'trimf', 'params': [10, 18, 26]},
-                    'HIGH': {'type': 'trapmf', 'params': [24, 28, 35, 35]}
-                }
-            ),
-            pH=dict(
-                universe = np.arange(5, 10.1, 0.1),
-                mf_definitions = {
-                    'ACID': {'type': 'trapmf', 'params': [5, 5, 6, 6.5]},
-                    'NEUTRAL': {'type': 'trimf', 'params': [6, 7, 8]},
-                    'ALKALINE': {'type': 'trapmf', 'params': [7.5, 8.5, 10, 10]}
-                }
-            )
-        )
-
-        for var_name, var_content in self.custom_vars.items():
-            self.base_vars[var_name] = var_content
+        # Definiciones compiladas al importar, con las personalizadas del trabajo
+        self.base_vars = spec.override(VARIABLES, self.custom_vars)
 
     def _create_fuzzy_system(self):
         """
         Crea el sistema difuso basado en las vars disponibles.
         Define las reglas y configura el sistema de control.
         """
-        # Inicializar estructuras
-        self.rules = []
-        self.vars_fuzzy = {}
-        
         # Definir vars difusas según las vars disponibles
+        self.vars_fuzzy = {}
         for var in self.available_vars:
             if var in self.base_vars:
-                universe, mf_definitions = self.base_vars[var]['universe'], self.base_vars[var]['mf_definitions']
-                antecedent = ctrl.Antecedent(universe, var)
-                for label, params in mf_definitions.items():
-                    if params['type'] == 'trapmf':
-                        antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                    elif params['type'] == 'trimf':
-                        antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-                self.vars_fuzzy[var] = antecedent
+                self.vars_fuzzy[var] = self.base_vars[var].antecedent()
             else:
                 raise ValueError(f"Definición de variable desconocida: {var}")
 
         # Definir la variable de salida
-        self.additional_conditions_universe = np.arange(0, 1.01, 0.01)
-        self.additional_conditions_var = ctrl.Consequent(self.additional_conditions_universe, 'condiciones')
-        self.additional_conditions_var['UNFAVORABLE'] = fuzz.trapmf(self.additional_conditions_var.universe, [0, 0, 0.2, 0.4])
-        self.additional_conditions_var['NEUTRALS'] = fuzz.trimf(self.additional_conditions_var.universe, [0.3, 0.5, 0.7])
-        self.additional_conditions_var['FAVORABLE'] = fuzz.trapmf(self.additional_conditions_var.universe, [0.6, 0.8, 1, 1])
+        self.additional_conditions_universe = UNIVERSE
+        self.additional_conditions_var = OUTPUT.consequent()
 
         # Definir reglas difusas basadas en las vars disponibles
         self._define_rules()
 
         # Crear el sistema de control
         self.control_system = ctrl.ControlSystem(self.rules)
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.simulation = core.simulation(self.control_system)
 
     def _define_rules(self):
         """
         Define las reglas difusas basadas en las vars disponibles.
         """
-        if 'TEMP' in self.vars_fuzzy and 'pH' in self.vars_fuzzy:
-            temp = self.vars_fuzzy['TEMP']
-            ph = self.vars_fuzzy['pH']
-
-            # Regla 1: Condiciones FAVORABLE
-            rule1 = ctrl.Rule(
-                antecedent=((temp['MODERATE'] | temp['HIGH']) & ph['NEUTRAL']),
-                consequent=self.additional_conditions_var['FAVORABLE']
-            )
-
-            # Regla 2: Condiciones NEUTRALS
-            rule2 = ctrl.Rule(
-                antecedent=((temp['LOW'] & ph['NEUTRAL']) | ((temp['MODERATE'] | temp['HIGH']) & (ph['ACID'] | ph['ALKALINE']))),
-                consequent=self.additional_conditions_var['NEUTRALS']
-            )
-
-            # Regla 3: Condiciones UNFAVORABLE
-            rule3 = ctrl.Rule(
-                antecedent=(temp['VERY LOW'] | (temp['LOW'] & (ph['ACID'] | ph['ALKALINE']))),
-                consequent=self.additional_conditions_var['UNFAVORABLE']
-            )
-
-            self.rules.extend([rule1, rule2, rule3])
+        used_vars, _ = self.get_used_vars()
 
-        elif 'TEMP' in self.vars_fuzzy:
-            temp = self.vars_fuzzy['TEMP']
-
-            # Regla 1: Condiciones FAVORABLE
-            rule1 = ctrl.Rule(
-                antecedent=(temp['MODERATE'] | temp['HIGH']),
-                consequent=self.additional_conditions_var['FAVORABLE']
-            )
-
-            # Regla 2: Condiciones NEUTRALS
-            rule2 = ctrl.Rule(
-                antecedent=temp['LOW'],
-                consequent=self.additional_conditions_var['NEUTRALS']
-            )
-
-            # Regla 3: Condiciones UNFAVORABLE
-            rule3 = ctrl.Rule(
-                antecedent=temp['VERY LOW'],
-                consequent=self.additional_conditions_var['UNFAVORABLE']
-            )
-
-            self.rules.extend([rule1, rule2, rule3])
-
-        elif 'pH' in self.vars_fuzzy:
-            ph = self.vars_fuzzy['pH']
-
-            # Regla 1: Condiciones FAVORABLE
-            rule1 = ctrl.Rule(
-                antecedent=ph['NEUTRAL'],
-                consequent=self.additional_conditions_var['FAVORABLE']
-            )
-
-            # Regla 2: Condiciones NEUTRALS
-            rule2 = ctrl.Rule(
-                antecedent=ph['ALKALINE'],
-                consequent=self.additional_conditions_var['NEUTRALS']
-            )
-
-            # Regla 3: Condiciones UNFAVORABLE
-            rule3 = ctrl.Rule(
-                antecedent=ph['ACID'],
-                consequent=self.additional_conditions_var['UNFAVORABLE']
-            )
-
-            self.rules.extend([rule1, rule2, rule3])
-        else:
+        if used_vars not in RULES:
             raise ValueError("No hay suficientes vars disponibles para definir reglas.")
 
+        self.rules = spec.build_rules(RULES[used_vars], self.vars_fuzzy, self.additional_conditions_var)
+
     def calculate_inference(self):
         """
         Calcula la inferencia difusa para determinar las condiciones additional_conditions.
@@ -174,19 +132,37 @@ class AdditionalConditions:
             tuple: (used_vars (str), confidence (float))
         """
         # Asignar los valuees de entrada disponibles
-        for var in self.available_vars:
-            self.simulation.input[var] = self.available_vars[var]
+        crisp_inputs = self.get_crisp_inputs(self.available_vars)
+        for var, value in crisp_inputs.items():
+            self.simulation.input[var] = value
 
         try:
             # Realizar la inferencia
-            self.simulation.compute()
-
-            # Obtener el resultado
-            self.additional_conditions = self.simulation.output['condiciones']
+            self.additional_conditions = memo.compute(self, crisp_inputs)
         except Exception as e:
             raise ValueError(f"Error al calcular la inferencia: {e}")
 
-        # Determinar vars usadas y confidence
+        return self.get_used_vars()
+
+    def get_crisp_inputs(self, values):
+        """
+        Obtiene las entradas crisp del sistema de control a partir de las vars.
+
+        Parámetros:
+            values (dict): Valores de las vars, escalares o arrays.
+
+        Retorna:
+            dict: Entradas por etiqueta de antecedente.
+        """
+        return {var: values[var] for var in self.available_vars}
+
+    def get_used_vars(self):
+        """
+        Determina las vars usadas y la confianza según las vars difusas definidas.
+
+        Retorna:
+            tuple: (used_vars (str), confidence (float))
+        """
         if 'TEMP' in self.vars_fuzzy and 'pH' in self.vars_fuzzy:
             used_vars = 'TEMP_pH'
             confidence = 1.0
@@ -212,12 +188,4 @@ class AdditionalConditions:
         if np.isnan(self.additional_conditions):
             raise ValueError("No se ha calculado la inferencia de condiciones.")
 
-        # Determinar la label con mayor degree de pertenencia
-        membership_degrees = {}
-        for label in self.additional_conditions_var.terms:
-            membership_function = self.additional_conditions_var[label].mf
-            degree = fuzz.interp_membership(self.additional_conditions_var.universe, membership_function, self.additional_conditions)
-            membership_degrees[label] = degree
-
-        predicted_label = max(membership_degrees, key=membership_degrees.get)
-        return predicted_label
+        return LABELER([self.additional_conditions])[0]
@@ -2,6 +2,69 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from system.fuzzy import core, labels, memo, registry, spec
+
+# Variable de salida, común a todos los sistemas del componente
+UNIVERSE = np.arange(0, 1.01, 0.01)
+TERMS = {
+    'GOOD': fuzz.trapmf(UNIVERSE, [0, 0, 0.2, 0.35]),
+    'NEUTRALS': fuzz.trimf(UNIVERSE, [0.3, 0.45, 0.6]),
+    'BAD': fuzz.trimf(UNIVERSE, [0.55, 0.7, 0.85]),
+    'VERY BAD': fuzz.trapmf(UNIVERSE, [0.8, 0.9, 1, 1]),
+}
+LABELER = labels.Labeler(UNIVERSE, TERMS)
+OUTPUT = spec.Variable('chemical_conditions', UNIVERSE, TERMS)
+
+# Variables de entrada, compiladas una vez al importar el módulo
+VARIABLES = spec.variables(dict(
+    nutrient_level=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.2, 0.4]},
+            'MODERATE': {'type': 'trimf', 'params': [0.3, 0.5, 0.7]},
+            'HIGH': {'type': 'trimf', 'params': [0.6, 0.75, 0.9]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.85, 0.95, 1, 1]}
+        }
+    ),
+    oxygen_balance=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'GOOD': {'type': 'trapmf', 'params': [0, 0, 0.2, 0.4]},
+            'MODERATE': {'type': 'trimf', 'params': [0.3, 0.5, 0.7]},
+            'BAD': {'type': 'trimf', 'params': [0.6, 0.75, 0.9]},
+            'VERY BAD': {'type': 'trapmf', 'params': [0.85, 0.95, 1, 1]}
+        }
+    )
+))
+
+# Reglas por vars usadas (ver get_used_vars)
+RULES = spec.rules({
+    'NUTRIENTS_OXYGEN': [
+        ('nutrient_level[LOW] & oxygen_balance[GOOD]', 'GOOD'),
+        ('nutrient_level[LOW] & oxygen_balance[MODERATE]', 'GOOD'),
+        ('nutrient_level[LOW] & (oxygen_balance[BAD] | oxygen_balance[VERY BAD])', 'NEUTRALS'),
+        ('nutrient_level[MODERATE] & oxygen_balance[GOOD]', 'NEUTRALS'),
+        ('nutrient_level[MODERATE] & oxygen_balance[MODERATE]', 'NEUTRALS'),
+        ('nutrient_level[MODERATE] & (oxygen_balance[BAD] | oxygen_balance[VERY BAD])', 'BAD'),
+        ('(nutrient_level[HIGH] | nutrient_level[VERY HIGH]) & oxygen_balance[GOOD]', 'BAD'),
+        ('(nutrient_level[HIGH] | nutrient_level[VERY HIGH]) & oxygen_balance[MODERATE]', 'BAD'),
+        ('(nutrient_level[HIGH] | nutrient_level[VERY HIGH]) & (oxygen_balance[BAD] | oxygen_balance[VERY BAD])', 'VERY BAD'),
+    ],
+    'NUTRIENTS': [
+        ('nutrient_level[LOW]', 'GOOD'),
+        ('nutrient_level[MODERATE]', 'NEUTRALS'),
+        ('nutrient_level[HIGH]', 'BAD'),
+        ('nutrient_level[VERY HIGH]', 'VERY BAD'),
+    ],
+    'OXYGEN': [
+        ('oxygen_balance[GOOD]', 'GOOD'),
+        ('oxygen_balance[MODERATE]', 'NEUTRALS'),
+        ('oxygen_balance[BAD]', 'BAD'),
+        ('oxygen_balance[VERY BAD]', 'VERY BAD'),
+    ],
+})
+
+
 class ChemicalConditions:
     def __init__(self, nutrient_level=np.nan, oxygen_balance=np.nan):
         self.nutrient_level = nutrient_level
@@ -20,114 +83,46 @@ class ChemicalConditions:
             self.available_vars.append('oxygen_balance')
 
         # Crear el sistema difuso según las vars disponibles
-        self._create_fuzzy_system()
+        registry.load_fuzzy_system(self, self._create_fuzzy_system, self.available_vars)
 
     def _create_fuzzy_system(self):
         # Definir la variable de salida
-        self.chemical_conditions_universe = np.arange(0, 1.01, 0.01)
-        self.chemical_conditions_var = ctrl.Consequent(self.chemical_conditions_universe, 'chemical_conditions')
-        self.chemical_conditions_var['GOOD'] = fuzz.trapmf(self.chemical_conditions_var.universe, [0, 0, 0.2, 0.35])
-        self.chemical_conditions_var['NEUTRALS'] = fuzz.trimf(self.chemical_conditions_var.universe, [0.3, 0.45, 0.6])
-        self.chemical_conditions_var['BAD'] = fuzz.trimf(self.chemical_conditions_var.universe, [0.55, 0.7, 0.85])
-        self.chemical_conditions_var['VERY BAD'] = fuzz.trapmf(self.chemical_conditions_var.universe, [0.8, 0.9, 1, 1])
-
-        self.rules = []
-        self.vars = {}
+        self.chemical_conditions_universe = UNIVERSE
+        self.chemical_conditions_var = OUTPUT.consequent()
 
         # Definir vars difusas según las vars disponibles
-        if 'nutrient_level' in self.available_vars:
-            # Definir el universo de discurso para nutrient_level
-            self.nutrient_level_universe = np.arange(0, 1.01, 0.01)
-            self.nutrient_level_var = ctrl.Antecedent(self.nutrient_level_universe, 'nutrient_level')
-            self.nutrient_level_var['LOW'] = fuzz.trapmf(self.nutrient_level_var.universe, [0, 0, 0.2, 0.4])
-            self.nutrient_level_var['MODERATE'] = fuzz.trimf(self.nutrient_level_var.universe, [0.3, 0.5, 0.7])
-            self.nutrient_level_var['HIGH'] = fuzz.trimf(self.nutrient_level_var.universe, [0.6, 0.75, 0.9])
-            self.nutrient_level_var['VERY HIGH'] = fuzz.trapmf(self.nutrient_level_var.universe, [0.85, 0.95, 1, 1])
-            self.vars['nutrient_level'] = self.nutrient_level_var
-
-        if 'oxygen_balance' in self.available_vars:
-            # Definir el universo de discurso para oxygen_balance
-            self.oxygen_balance_universe = np.arange(0, 1.01, 0.01)
-            self.oxygen_balance_var = ctrl.Antecedent(self.oxygen_balance_universe, 'oxygen_balance')
-            self.oxygen_balance_var['GOOD'] = fuzz.trapmf(self.oxygen_balance_var.universe, [0, 0, 0.2, 0.4])
-            self.oxygen_balance_var['MODERATE'] = fuzz.trimf(self.oxygen_balance_var.universe, [0.3, 0.5, 0.7])
-            self.oxygen_balance_var['BAD'] = fuzz.trimf(self.oxygen_balance_var.universe, [0.6, 0.75, 0.9])
-            self.oxygen_balance_var['VERY BAD'] = fuzz.trapmf(self.oxygen_balance_var.universe, [0.85, 0.95, 1, 1])
-            self.vars['oxygen_balance'] = self.oxygen_balance_var
+        self.vars = {var_name: VARIABLES[var_name].antecedent() for var_name in self.available_vars}
 
         # Definir las reglas difusas según las vars disponibles
         self._define_rules()
 
         # Crear el sistema de control
         self.control_system = ctrl.ControlSystem(self.rules)
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.simulation = core.simulation(self.control_system)
 
     def _define_rules(self):
-        # Reglas basadas en las vars disponibles
-        if 'nutrient_level' in self.vars and 'oxygen_balance' in self.vars:
-            # Ambas vars están disponibles
-            nutrient_level = self.vars['nutrient_level']
-            oxygen_balance = self.vars['oxygen_balance']
-
-            # Regla 1
-            self.rules.append(ctrl.Rule(nutrient_level['LOW'] & oxygen_balance['GOOD'], self.chemical_conditions_var['GOOD']))
-
-            # Regla 2
-            self.rules.append(ctrl.Rule(nutrient_level['LOW'] & oxygen_balance['MODERATE'], self.chemical_conditions_var['GOOD']))
-
-            # Regla 3
-            self.rules.append(ctrl.Rule(nutrient_level['LOW'] & (oxygen_balance['BAD'] | oxygen_balance['VERY BAD']), self.chemical_conditions_var['NEUTRALS']))
-
-            # Regla 4
-            self.rules.append(ctrl.Rule(nutrient_level['MODERATE'] & oxygen_balance['GOOD'], self.chemical_conditions_var['NEUTRALS']))
-
-            # Regla 5
-            self.rules.append(ctrl.Rule(nutrient_level['MODERATE'] & oxygen_balance['MODERATE'], self.chemical_conditions_var['NEUTRALS']))
-
-            # Regla 6
-            self.rules.append(ctrl.Rule(nutrient_level['MODERATE'] & (oxygen_balance['BAD'] | oxygen_balance['VERY BAD']), self.chemical_conditions_var['BAD']))
-
-            # Regla 7
-            self.rules.append(ctrl.Rule((nutrient_level['HIGH'] | nutrient_level['VERY HIGH']) & oxygen_balance['GOOD'], self.chemical_conditions_var['BAD']))
-
-            # Regla 8
-            self.rules.append(ctrl.Rule((nutrient_level['HIGH'] | nutrient_level['VERY HIGH']) & oxygen_balance['MODERATE'], self.chemical_conditions_var['BAD']))
-
-            # Regla 9
-            self.rules.append(ctrl.Rule((nutrient_level['HIGH'] | nutrient_level['VERY HIGH']) & (oxygen_balance['BAD'] | oxygen_balance['VERY BAD']), self.chemical_conditions_var['VERY BAD']))
-
-        elif 'nutrient_level' in self.vars:
-            # Solo nivel de nutrient_level está disponible
-            nutrient_level = self.vars['nutrient_level']
-            self.rules.append(ctrl.Rule(nutrient_level['LOW'], self.chemical_conditions_var['GOOD']))
-            self.rules.append(ctrl.Rule(nutrient_level['MODERATE'], self.chemical_conditions_var['NEUTRALS']))
-            self.rules.append(ctrl.Rule(nutrient_level['HIGH'], self.chemical_conditions_var['BAD']))
-            self.rules.append(ctrl.Rule(nutrient_level['VERY HIGH'], self.chemical_conditions_var['VERY BAD']))
-
-        elif 'oxygen_balance' in self.vars:
-            # Solo balance de oxígeno está disponible
-            oxygen_balance = self.vars['oxygen_balance']
-            self.rules.append(ctrl.Rule(oxygen_balance['GOOD'], self.chemical_conditions_var['GOOD']))
-            self.rules.append(ctrl.Rule(oxygen_balance['MODERATE'], self.chemical_conditions_var['NEUTRALS']))
-            self.rules.append(ctrl.Rule(oxygen_balance['BAD'], self.chemical_conditions_var['BAD']))
-            self.rules.append(ctrl.Rule(oxygen_balance['VERY BAD'], self.chemical_conditions_var['VERY BAD']))
+        used_vars, _ = self.get_used_vars()
+        self.rules = spec.build_rules(RULES[used_vars], self.vars, self.chemical_conditions_var)
 
     def calculate_inference(self):
         # Asignar los valuees de entrada disponibles
-        if 'nutrient_level' in self.vars:
-            self.simulation.input['nutrient_level'] = self.nutrient_level
-        if 'oxygen_balance' in self.vars:
-            self.simulation.input['oxygen_balance'] = self.oxygen_balance
+        values = {'nutrient_level': self.nutrient_level, 'oxygen_balance': self.oxygen_balance}
+        crisp_inputs = self.get_crisp_inputs(values)
+        for var_name, var_value in crisp_inputs.items():
+            self.simulation.input[var_name] = var_value
 
         try:
             # Realizar la inferencia
-            self.simulation.compute()
-
-            # Obtener el resultado
-            self.chemical_conditions = self.simulation.output['chemical_conditions']
+            self.chemical_conditions = memo.compute(self, crisp_inputs)
         except Exception as e:
             raise ValueError(f"Error al calcular la inferencia: {e}")
 
+        return self.get_used_vars()
+
+    def get_crisp_inputs(self, values):
+        return {var_name: values[var_name] for var_name in self.vars}
+
+    def get_used_vars(self):
         # Determinar vars usadas y confidence
         if 'nutrient_level' in self.vars and 'oxygen_balance' in self.vars:
             used_vars = 'NUTRIENTS_OXYGEN'
@@ -145,13 +140,5 @@ class ChemicalConditions:
         if np.isnan(self.chemical_conditions):
             raise ValueError("No se ha calculado la inferencia de condiciones químicas.")
 
-        # Determinar la label con mayor degree de pertenencia
-        membership_degrees = {}
-        for label in self.chemical_conditions_var.terms:
-            membership_function = self.chemical_conditions_var[label].mf
-            degree = fuzz.interp_membership(self.chemical_conditions_var.universe, membership_function, self.chemical_conditions)
-            membership_degrees[label] = degree
-
-        predicted_label = max(membership_degrees, key=membership_degrees.get)
-        return predicted_label
+        return LABELER([self.chemical_conditions])[0]
 
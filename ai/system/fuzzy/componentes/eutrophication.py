@@ -2,6 +2,128 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from system.fuzzy import core, labels, memo, registry, spec
+
+# Variable de salida, común a todos los sistemas del componente
+UNIVERSE = np.arange(0, 1.01, 0.01)
+TERMS = {
+    'OLIGOTROPHIC': fuzz.trapmf(UNIVERSE, [0, 0, 0.2, 0.3]),
+    'MESOTROPHIC': fuzz.trimf(UNIVERSE, [0.25, 0.4, 0.55]),
+    'EUTROPHIC': fuzz.trimf(UNIVERSE, [0.5, 0.65, 0.8]),
+    'HYPEREUTROPHIC': fuzz.trapmf(UNIVERSE, [0.75, 0.85, 1, 1]),
+}
+LABELER = labels.Labeler(UNIVERSE, TERMS)
+OUTPUT = spec.Variable('eutrophication_level', UNIVERSE, TERMS)
+
+# Variables de entrada, compiladas una vez al importar el módulo
+VARIABLES = spec.variables(dict(
+    chemical_conditions=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'GOOD': {'type': 'trapmf', 'params': [0, 0, 0.2, 0.35]},
+            'NEUTRALS': {'type': 'trimf', 'params': [0.3, 0.45, 0.6]},
+            'BAD': {'type': 'trimf', 'params': [0.55, 0.7, 0.85]},
+            'VERY BAD': {'type': 'trapmf', 'params': [0.8, 0.9, 1, 1]}
+        }
+    ),
+    physical_conditions=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'GOOD': {'type': 'trapmf', 'params': [0, 0, 0.2, 0.3]},
+            'NEUTRALS': {'type': 'trimf', 'params': [0.25, 0.4, 0.55]},
+            'BAD': {'type': 'trimf', 'params': [0.5, 0.65, 0.8]},
+            'VERY BAD': {'type': 'trapmf', 'params': [0.75, 0.85, 1, 1]}
+        }
+    ),
+    additional_conditions=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'UNFAVORABLE': {'type': 'trapmf', 'params': [0, 0, 0.2, 0.4]},
+            'NEUTRALS': {'type': 'trimf', 'params': [0.3, 0.5, 0.7]},
+            'FAVORABLE': {'type': 'trapmf', 'params': [0.6, 0.8, 1, 1]}
+        }
+    )
+))
+
+# Reglas por vars usadas (ver get_used_vars)
+RULES = spec.rules({
+    'CHEMICALS_PHYSICAL_ADDITIONALS': [
+        # Regla 1
+        ('chemical_conditions[GOOD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS] | physical_conditions[BAD]) & additional_conditions[UNFAVORABLE]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[GOOD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS] | physical_conditions[BAD]) & additional_conditions[NEUTRALS]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[GOOD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS] | physical_conditions[BAD]) & additional_conditions[FAVORABLE]', 'MESOTROPHIC'),
+        # Regla 2
+        ('chemical_conditions[GOOD] & physical_conditions[VERY BAD] & additional_conditions[UNFAVORABLE]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[GOOD] & physical_conditions[VERY BAD] & additional_conditions[NEUTRALS]', 'MESOTROPHIC'),
+        ('chemical_conditions[GOOD] & physical_conditions[VERY BAD] & additional_conditions[FAVORABLE]', 'EUTROPHIC'),
+        # Regla 3
+        ('chemical_conditions[NEUTRALS] & physical_conditions[GOOD] & additional_conditions[UNFAVORABLE]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & physical_conditions[GOOD] & additional_conditions[NEUTRALS]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & physical_conditions[GOOD] & additional_conditions[FAVORABLE]', 'MESOTROPHIC'),
+        # Regla 4
+        ('chemical_conditions[NEUTRALS] & physical_conditions[NEUTRALS] & additional_conditions[UNFAVORABLE]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & physical_conditions[NEUTRALS] & additional_conditions[NEUTRALS]', 'MESOTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & physical_conditions[NEUTRALS] & additional_conditions[FAVORABLE]', 'EUTROPHIC'),
+        # Regla 5
+        ('chemical_conditions[NEUTRALS] & (physical_conditions[BAD] | physical_conditions[VERY BAD]) & additional_conditions[UNFAVORABLE]', 'MESOTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & (physical_conditions[BAD] | physical_conditions[VERY BAD]) & additional_conditions[NEUTRALS]', 'EUTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & (physical_conditions[BAD] | physical_conditions[VERY BAD]) & additional_conditions[FAVORABLE]', 'HYPEREUTROPHIC'),
+        # Regla 6
+        ('chemical_conditions[BAD] & physical_conditions[GOOD] & additional_conditions[UNFAVORABLE]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[BAD] & physical_conditions[GOOD] & additional_conditions[NEUTRALS]', 'MESOTROPHIC'),
+        ('chemical_conditions[BAD] & physical_conditions[GOOD] & additional_conditions[FAVORABLE]', 'EUTROPHIC'),
+        # Regla 7
+        ('chemical_conditions[BAD] & (physical_conditions[NEUTRALS] | physical_conditions[BAD]) & additional_conditions[UNFAVORABLE]', 'MESOTROPHIC'),
+        ('chemical_conditions[BAD] & (physical_conditions[NEUTRALS] | physical_conditions[BAD]) & additional_conditions[NEUTRALS]', 'EUTROPHIC'),
+        ('chemical_conditions[BAD] & (physical_conditions[NEUTRALS] | physical_conditions[BAD]) & additional_conditions[FAVORABLE]', 'HYPEREUTROPHIC'),
+        # Regla 8
+        ('chemical_conditions[BAD] & physical_conditions[VERY BAD] & additional_conditions[UNFAVORABLE]', 'EUTROPHIC'),
+        ('chemical_conditions[BAD] & physical_conditions[VERY BAD] & additional_conditions[NEUTRALS]', 'HYPEREUTROPHIC'),
+        ('chemical_conditions[BAD] & physical_conditions[VERY BAD] & additional_conditions[FAVORABLE]', 'HYPEREUTROPHIC'),
+        # Regla 9
+        ('chemical_conditions[VERY BAD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS]) & additional_conditions[UNFAVORABLE]', 'MESOTROPHIC'),
+        ('chemical_conditions[VERY BAD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS]) & additional_conditions[NEUTRALS]', 'EUTROPHIC'),
+        ('chemical_conditions[VERY BAD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS]) & additional_conditions[FAVORABLE]', 'HYPEREUTROPHIC'),
+        # Regla 10
+        ('chemical_conditions[VERY BAD] & (physical_conditions[BAD] | physical_conditions[VERY BAD]) & additional_conditions[UNFAVORABLE]', 'EUTROPHIC'),
+        ('chemical_conditions[VERY BAD] & (physical_conditions[BAD] | physical_conditions[VERY BAD]) & additional_conditions[NEUTRALS]', 'HYPEREUTROPHIC'),
+        ('chemical_conditions[VERY BAD] & (physical_conditions[BAD] | physical_conditions[VERY BAD]) & additional_conditions[FAVORABLE]', 'HYPEREUTROPHIC'),
+    ],
+    'CHEMICALS_PHYSICAL': [
+        ('chemical_conditions[GOOD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS] | physical_conditions[BAD])', 'OLIGOTROPHIC'),
+        ('chemical_conditions[GOOD] & physical_conditions[VERY BAD]', 'MESOTROPHIC'),
+
+        ('chemical_conditions[NEUTRALS] & physical_conditions[GOOD]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & (physical_conditions[NEUTRALS])', 'MESOTROPHIC'),
+        ('chemical_conditions[NEUTRALS] & (physical_conditions[BAD] | physical_conditions[VERY BAD])', 'EUTROPHIC'),
+
+        ('chemical_conditions[BAD] & physical_conditions[GOOD]', 'MESOTROPHIC'),
+        ('chemical_conditions[BAD] & (physical_conditions[NEUTRALS] | physical_conditions[BAD])', 'EUTROPHIC'),
+        ('chemical_conditions[BAD] & physical_conditions[VERY BAD]', 'HYPEREUTROPHIC'),
+
+        ('chemical_conditions[VERY BAD] & (physical_conditions[GOOD] | physical_conditions[NEUTRALS])', 'EUTROPHIC'),
+        ('chemical_conditions[VERY BAD] & (physical_conditions[BAD] | physical_conditions[VERY BAD])', 'HYPEREUTROPHIC'),
+    ],
+    # Con una sola de chemical_conditions o physical_conditions, additional_conditions no entra en las reglas
+    'CHEMICALS': [
+        ('chemical_conditions[GOOD]', 'OLIGOTROPHIC'),
+        ('chemical_conditions[NEUTRALS]', 'MESOTROPHIC'),
+        ('chemical_conditions[BAD]', 'EUTROPHIC'),
+        ('chemical_conditions[VERY BAD]', 'HYPEREUTROPHIC'),
+    ],
+    'PHYSICAL': [
+        ('physical_conditions[GOOD]', 'OLIGOTROPHIC'),
+        ('physical_conditions[NEUTRALS]', 'MESOTROPHIC'),
+        ('physical_conditions[BAD]', 'EUTROPHIC'),
+        ('physical_conditions[VERY BAD]', 'HYPEREUTROPHIC'),
+    ],
+    'ADDITIONALS': [
+        ('additional_conditions[UNFAVORABLE]', 'OLIGOTROPHIC'),
+        ('additional_conditions[NEUTRALS]', 'MESOTROPHIC'),
+        ('additional_conditions[FAVORABLE]', 'EUTROPHIC'),
+    ],
+})
+
 
 class EutrophicationLevel:
     def __init__(
@@ -29,305 +151,46 @@ class EutrophicationLevel:
             self.available_vars.append('additional_conditions')
 
         # Crear el sistema difuso según las vars disponibles
-        self._create_fuzzy_system()
+        registry.load_fuzzy_system(self, self._create_fuzzy_system, self.available_vars)
 
     def _create_fuzzy_system(self):
         # Definir la variable de salida
-        self.eutrophication_level_universe = np.arange(0, 1.01, 0.01)
-        self.eutrophication_level_var = ctrl.Consequent(self.eutrophication_level_universe, 'eutrophication_level')
-        self.eutrophication_level_var['OLIGOTROPHIC'] = fuzz.trapmf(self.eutrophication_level_var.universe, [0, 0, 0.2, 0.3])
-        self.eutrophication_level_var['MESOTROPHIC'] = fuzz.trimf(self.eutrophication_level_var.universe, [0.25, 0.4, 0.55])
-        self.eutrophication_level_var['EUTROPHIC'] = fuzz.trimf(self.eutrophication_level_var.universe, [0.5, 0.65, 0.8])
-        self.eutrophication_level_var['HYPEREUTROPHIC'] = fuzz.trapmf(self.eutrophication_level_var.universe, [0.75, 0.85, 1, 1])
-
-        self.rules = []
-        self.vars = {}
+        self.eutrophication_level_universe = UNIVERSE
+        self.eutrophication_level_var = OUTPUT.consequent()
 
         # Definir vars difusas según las vars disponibles
-        if 'chemical_conditions' in self.available_vars:
-            # Definir el universo de discurso para chemical_conditions
-            self.chemical_conditions_universe = np.arange(0, 1.01, 0.01)
-            self.chemical_conditions_var = ctrl.Antecedent(self.chemical_conditions_universe, 'chemical_conditions')
-            self.chemical_conditions_var['GOOD'] = fuzz.trapmf(self.chemical_conditions_var.universe, [0, 0, 0.2, 0.35])
-            self.chemical_conditions_var['NEUTRALS'] = fuzz.trimf(self.chemical_conditions_var.universe, [0.3, 0.45, 0.6])
-            self.chemical_conditions_var['BAD'] = fuzz.trimf(self.chemical_conditions_var.universe, [0.55, 0.7, 0.85])
-            self.chemical_conditions_var['VERY BAD'] = fuzz.trapmf(self.chemical_conditions_var.universe, [0.8, 0.9, 1, 1])
-            self.vars['chemical_conditions'] = self.chemical_conditions_var
-
-        if 'physical_conditions' in self.available_vars:
-            # Definir el universo de discurso para physical_conditions
-            self.physical_conditions_universe = np.arange(0, 1.01, 0.01)
-            self.physical_conditions_var = ctrl.Antecedent(self.physical_conditions_universe, 'physical_conditions')
-            self.physical_conditions_var['GOOD'] = fuzz.trapmf(self.physical_conditions_var.universe, [0, 0, 0.2, 0.3])
-            self.physical_conditions_var['NEUTRALS'] = fuzz.trimf(self.physical_conditions_var.universe, [0.25, 0.4, 0.55])
-            self.physical_conditions_var['BAD'] = fuzz.trimf(self.physical_conditions_var.universe, [0.5, 0.65, 0.8])
-            self.physical_conditions_var['VERY BAD'] = fuzz.trapmf(self.physical_conditions_var.universe, [0.75, 0.85, 1, 1])
-            self.vars['physical_conditions'] = self.physical_conditions_var
-
-        if 'additional_conditions' in self.available_vars:
-            self.additional_conditions_universe = np.arange(0, 1.01, 0.01)
-            self.additional_conditions_var = ctrl.Antecedent(self.additional_conditions_universe, 'additional_conditions')
-            self.additional_conditions_var['UNFAVORABLE'] = fuzz.trapmf(self.additional_conditions_var.universe, [0, 0, 0.2, 0.4])
-            self.additional_conditions_var['NEUTRALS'] = fuzz.trimf(self.additional_conditions_var.universe, [0.3, 0.5, 0.7])
-            self.additional_conditions_var['FAVORABLE'] = fuzz.trapmf(self.additional_conditions_var.universe, [0.6, 0.8, 1, 1])
-            self.vars['additional_conditions'] = self.additional_conditions_var
-
+        self.vars = {var_name: VARIABLES[var_name].antecedent() for var_name in self.available_vars}
 
         # Definir las reglas difusas según las vars disponibles
         self._define_rules()
 
         # Crear el sistema de control
         self.control_system = ctrl.ControlSystem(self.rules)
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.simulation = core.simulation(self.control_system)
 
     def _define_rules(self):
-        # Reglas basadas en las vars disponibles
-        if 'chemical_conditions' in self.vars and 'physical_conditions' in self.vars and 'additional_conditions' in self.vars:
-            # Todas las vars están disponibles
-            chemical_conditions = self.vars['chemical_conditions']
-            physical_conditions = self.vars['physical_conditions']
-            additional_conditions = self.vars['additional_conditions']
-
-            # Regla 1a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['GOOD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS'] | physical_conditions['BAD']) & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['OLIGOTROPHIC']
-            ))
-
-            # Regla 1b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['GOOD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS'] | physical_conditions['BAD']) & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['OLIGOTROPHIC']
-            ))
-
-            # Regla 1c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['GOOD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS'] | physical_conditions['BAD']) & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 2a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['GOOD'] & physical_conditions['VERY BAD'] & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['OLIGOTROPHIC']
-            ))
-
-            # Regla 2b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['GOOD'] & physical_conditions['VERY BAD'] & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 2c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['GOOD'] & physical_conditions['VERY BAD'] & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 3a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & physical_conditions['GOOD'] & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['OLIGOTROPHIC']
-            ))
-
-            # Regla 3b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & physical_conditions['GOOD'] & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['OLIGOTROPHIC']
-            ))
-
-            # Regla 3c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & physical_conditions['GOOD'] & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 4a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & physical_conditions['NEUTRALS'] & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['OLIGOTROPHIC']
-            ))
-
-            # Regla 4b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & physical_conditions['NEUTRALS'] & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 4c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & physical_conditions['NEUTRALS'] & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 5a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']) & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 5b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']) & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 5c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['NEUTRALS'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']) & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['HYPEREUTROPHIC']
-            ))
-
-            # Regla 6a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & physical_conditions['GOOD'] & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['OLIGOTROPHIC']
-            ))
-
-            # Regla 6b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & physical_conditions['GOOD'] & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 6c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & physical_conditions['GOOD'] & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 7a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & (physical_conditions['NEUTRALS'] | physical_conditions['BAD']) & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 7b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & (physical_conditions['NEUTRALS'] | physical_conditions['BAD']) & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 7c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & (physical_conditions['NEUTRALS'] | physical_conditions['BAD']) & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['HYPEREUTROPHIC']
-            ))
-
-            # Regla 8a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & physical_conditions['VERY BAD'] & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 8b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & physical_conditions['VERY BAD'] & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['HYPEREUTROPHIC']
-            ))
-
-            # Regla 8c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['BAD'] & physical_conditions['VERY BAD'] & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['HYPEREUTROPHIC']
-            ))
-
-            # Regla 9a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['VERY BAD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS']) & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['MESOTROPHIC']
-            ))
-
-            # Regla 9b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['VERY BAD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS']) & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 9c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['VERY BAD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS']) & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['HYPEREUTROPHIC']
-            ))
-
-            # Regla 10a
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['VERY BAD'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']) & additional_conditions['UNFAVORABLE'],
-                self.eutrophication_level_var['EUTROPHIC']
-            ))
-
-            # Regla 10b
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['VERY BAD'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']) & additional_conditions['NEUTRALS'],
-                self.eutrophication_level_var['HYPEREUTROPHIC']
-            ))
-
-            # Regla 10c
-            self.rules.append(ctrl.Rule(
-                chemical_conditions['VERY BAD'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']) & additional_conditions['FAVORABLE'],
-                self.eutrophication_level_var['HYPEREUTROPHIC']
-            ))
-
-        elif 'chemical_conditions' in self.vars and 'physical_conditions' in self.vars:
-            # Ambas vars están disponibles
-            chemical_conditions = self.vars['chemical_conditions']
-            physical_conditions = self.vars['physical_conditions']
-
-            self.rules.append(ctrl.Rule(chemical_conditions['GOOD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS'] | physical_conditions['BAD']), self.eutrophication_level_var['OLIGOTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['GOOD'] & physical_conditions['VERY BAD'], self.eutrophication_level_var['MESOTROPHIC']))
-
-            self.rules.append(ctrl.Rule(chemical_conditions['NEUTRALS'] & physical_conditions['GOOD'], self.eutrophication_level_var['OLIGOTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['NEUTRALS'] & (physical_conditions['NEUTRALS']), self.eutrophication_level_var['MESOTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['NEUTRALS'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']), self.eutrophication_level_var['EUTROPHIC']))
-
-            self.rules.append(ctrl.Rule(chemical_conditions['BAD'] & physical_conditions['GOOD'], self.eutrophication_level_var['MESOTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['BAD'] & (physical_conditions['NEUTRALS'] | physical_conditions['BAD']), self.eutrophication_level_var['EUTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['BAD'] & physical_conditions['VERY BAD'], self.eutrophication_level_var['HYPEREUTROPHIC']))
-
-            self.rules.append(ctrl.Rule(chemical_conditions['VERY BAD'] & (physical_conditions['GOOD'] | physical_conditions['NEUTRALS']), self.eutrophication_level_var['EUTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['VERY BAD'] & (physical_conditions['BAD'] | physical_conditions['VERY BAD']), self.eutrophication_level_var['HYPEREUTROPHIC']))
-        
-        elif 'chemical_conditions' in self.vars:
-            # Solo condiciones químicas están disponibles
-            chemical_conditions = self.vars['chemical_conditions']
-            self.rules.append(ctrl.Rule(chemical_conditions['GOOD'], self.eutrophication_level_var['OLIGOTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['NEUTRALS'], self.eutrophication_level_var['MESOTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['BAD'], self.eutrophication_level_var['EUTROPHIC']))
-            self.rules.append(ctrl.Rule(chemical_conditions['VERY BAD'], self.eutrophication_level_var['HYPEREUTROPHIC']))
-
-        elif 'physical_conditions' in self.vars:
-            # Solo condiciones physical_conditions están disponibles
-            physical_conditions = self.vars['physical_conditions']
-            self.rules.append(ctrl.Rule(physical_conditions['GOOD'], self.eutrophication_level_var['OLIGOTROPHIC']))
-            self.rules.append(ctrl.Rule(physical_conditions['NEUTRALS'], self.eutrophication_level_var['MESOTROPHIC']))
-            self.rules.append(ctrl.Rule(physical_conditions['BAD'], self.eutrophication_level_var['EUTROPHIC']))
-            self.rules.append(ctrl.Rule(physical_conditions['VERY BAD'], self.eutrophication_level_var['HYPEREUTROPHIC']))
-
-        elif 'additional_conditions' in self.vars:
-            additional_conditions = self.vars['additional_conditions']
-            self.rules.append(ctrl.Rule(additional_conditions['UNFAVORABLE'], self.eutrophication_level_var['OLIGOTROPHIC']))
-            self.rules.append(ctrl.Rule(additional_conditions['NEUTRALS'], self.eutrophication_level_var['MESOTROPHIC']))
-            self.rules.append(ctrl.Rule(additional_conditions['FAVORABLE'], self.eutrophication_level_var['EUTROPHIC']))
-
+        used_vars, _ = self.get_used_vars()
+        self.rules = spec.build_rules(RULES[used_vars], self.vars, self.eutrophication_level_var)
 
     def calculate_inference(self):
         # Asignar los valuees de entrada disponibles
-        if 'chemical_conditions' in self.vars:
-            self.simulation.input['chemical_conditions'] = self.chemical_conditions
-        if 'physical_conditions' in self.vars:
-            self.simulation.input['physical_conditions'] = self.physical_conditions
-        if 'additional_conditions' in self.vars:
-            self.simulation.input['additional_conditions'] = self.additional_conditions
+        values = {'chemical_conditions': self.chemical_conditions, 'physical_conditions': self.physical_conditions, 'additional_conditions': self.additional_conditions}
+        crisp_inputs = self.get_crisp_inputs(values)
+        for var_name, var_value in crisp_inputs.items():
+            self.simulation.input[var_name] = var_value
 
         try:
             # Realizar la inferencia
-            self.simulation.compute()
-
-            # Obtener el resultado
-            self.eutrophication_level = self.simulation.output['eutrophication_level']
+            self.eutrophication_level = memo.compute(self, crisp_inputs)
         except Exception as e:
             raise ValueError(f"Error al calcular la inferencia: {e}")
 
+        return self.get_used_vars()
+
+    def get_crisp_inputs(self, values):
+        return {var_name: values[var_name] for var_name in self.vars}
+
+    def get_used_vars(self):
         # Determinar vars usadas y confidence
         if 'chemical_conditions' in self.vars and 'physical_conditions' in self.vars and 'additional_conditions' in self.vars:
             used_vars = 'CHEMICALS_PHYSICAL_ADDITIONALS'
@@ -351,12 +214,4 @@ class EutrophicationLevel:
         if np.isnan(self.eutrophication_level):
             raise ValueError("No se ha calculado la inferencia del nivel de eutrofización.")
 
-        # Determinar la label con mayor degree de pertenencia
-        membership_degrees = {}
-        for label in self.eutrophication_level_var.terms:
-            membership_function = self.eutrophication_level_var[label].mf
-            degree = fuzz.interp_membership(self.eutrophication_level_var.universe, membership_function, self.eutrophication_level)
-            membership_degrees[label] = degree
-
-        predicted_label = max(membership_degrees, key=membership_degrees.get)
-        return predicted_label
+        return LABELER([self.eutrophication_level])[0]
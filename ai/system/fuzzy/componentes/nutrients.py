@@ -2,6 +2,80 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from system.fuzzy import core, labels, memo, registry, spec
+
+# Variable de salida, común a todos los sistemas del componente
+UNIVERSE = np.arange(0, 1.01, 0.01)
+TERMS = {
+    'LOW': fuzz.trapmf(UNIVERSE, [0, 0, 0.2, 0.4]),
+    'MODERATE': fuzz.trimf(UNIVERSE, [0.3, 0.5, 0.7]),
+    'HIGH': fuzz.trimf(UNIVERSE, [0.6, 0.75, 0.9]),
+    'VERY HIGH': fuzz.trapmf(UNIVERSE, [0.85, 0.95, 1, 1]),
+}
+LABELER = labels.Labeler(UNIVERSE, TERMS)
+OUTPUT = spec.Variable('nutrient_level', UNIVERSE, TERMS)
+
+# Variables de entrada, compiladas una vez al importar el módulo
+VARIABLES = spec.variables(dict(
+    nitrogen_level=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.15, 0.3]},
+            'MODERATE': {'type': 'trimf', 'params': [0.25, 0.4, 0.55]},
+            'HIGH': {'type': 'trimf', 'params': [0.5, 0.65, 0.8]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.75, 0.85, 1, 1]}
+        }
+    ),
+    phosphorus_level=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.15, 0.3]},
+            'MODERATE': {'type': 'trimf', 'params': [0.25, 0.4, 0.55]},
+            'HIGH': {'type': 'trimf', 'params': [0.5, 0.65, 0.8]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.75, 0.85, 1, 1]}
+        }
+    )
+))
+
+# Reglas por vars usadas (ver get_used_vars)
+RULES = spec.rules({
+    'NITROGEN_PHOSPHORUS': [
+        # Ambos LOW
+        ('nitrogen_level[LOW] & phosphorus_level[LOW]', 'LOW'),
+        # Ambos MODERATE
+        ('nitrogen_level[MODERATE] & phosphorus_level[MODERATE]', 'MODERATE'),
+        # Ambos HIGH
+        ('nitrogen_level[HIGH] & phosphorus_level[HIGH]', 'VERY HIGH'),
+        # Ambos VERY_HIGH
+        ('nitrogen_level[VERY HIGH] & phosphorus_level[VERY HIGH]', 'VERY HIGH'),
+        # Uno HIGH y otro MODERATE
+        ('(nitrogen_level[HIGH] & phosphorus_level[MODERATE]) | (nitrogen_level[MODERATE] & phosphorus_level[HIGH])', 'HIGH'),
+        # Uno VERY_HIGH y otro HIGH
+        ('(nitrogen_level[VERY HIGH] & phosphorus_level[HIGH]) | (nitrogen_level[HIGH] & phosphorus_level[VERY HIGH])', 'VERY HIGH'),
+        # Uno MODERATE y otro LOW
+        ('(nitrogen_level[MODERATE] & phosphorus_level[LOW]) | (nitrogen_level[LOW] & phosphorus_level[MODERATE])', 'MODERATE'),
+        # Uno HIGH y otro LOW
+        ('(nitrogen_level[HIGH] & phosphorus_level[LOW]) | (nitrogen_level[LOW] & phosphorus_level[HIGH])', 'MODERATE'),
+        # Uno VERY_HIGH y otro LOW
+        ('(nitrogen_level[VERY HIGH] & phosphorus_level[LOW]) | (nitrogen_level[LOW] & phosphorus_level[VERY HIGH])', 'MODERATE'),
+        # Uno VERY_HIGH y otro MODERATE
+        ('(nitrogen_level[VERY HIGH] & phosphorus_level[MODERATE]) | (nitrogen_level[MODERATE] & phosphorus_level[VERY HIGH])', 'HIGH'),
+        # Si la diferencia es más de un nivel, el nivel es el más bajo
+        ('(nitrogen_level[VERY HIGH] & phosphorus_level[LOW]) | (nitrogen_level[LOW] & phosphorus_level[VERY HIGH])', 'MODERATE'),
+    ],
+    # Si solo una variable está disponible, el nivel de nutrient_level es el mismo que la variable disponible
+    **{
+        used_vars: [
+            (f'{var_name}[LOW]', 'LOW'),
+            (f'{var_name}[MODERATE]', 'MODERATE'),
+            (f'{var_name}[HIGH]', 'HIGH'),
+            (f'{var_name}[VERY HIGH]', 'VERY HIGH'),
+        ]
+        for used_vars, var_name in [('NITROGEN', 'nitrogen_level'), ('PHOSPHORUS', 'phosphorus_level')]
+    },
+})
+
+
 class NutrientLevel:
     def __init__(self, nitrogen_level=np.nan, phosphorus_level=np.nan):
         self.nitrogen_level = nitrogen_level
@@ -20,136 +94,46 @@ class NutrientLevel:
             self.available_vars.append('phosphorus_level')
 
         # Crear el sistema difuso según las vars disponibles
-        self._create_fuzzy_system()
+        registry.load_fuzzy_system(self, self._create_fuzzy_system, self.available_vars)
 
     def _create_fuzzy_system(self):
         # Definir la variable de salida
-        self.nutrient_level_universe = np.arange(0, 1.01, 0.01)
-        self.nutrient_level_var = ctrl.Consequent(self.nutrient_level_universe, 'nutrient_level')
-        self.nutrient_level_var['LOW'] = fuzz.trapmf(self.nutrient_level_var.universe, [0, 0, 0.2, 0.4])
-        self.nutrient_level_var['MODERATE'] = fuzz.trimf(self.nutrient_level_var.universe, [0.3, 0.5, 0.7])
-        self.nutrient_level_var['HIGH'] = fuzz.trimf(self.nutrient_level_var.universe, [0.6, 0.75, 0.9])
-        self.nutrient_level_var['VERY HIGH'] = fuzz.trapmf(self.nutrient_level_var.universe, [0.85, 0.95, 1, 1])
-
-        self.rules = []
-        self.vars = {}
+        self.nutrient_level_universe = UNIVERSE
+        self.nutrient_level_var = OUTPUT.consequent()
 
         # Definir vars difusas según las vars disponibles
-        if 'nitrogen_level' in self.available_vars:
-            # Definir el universo de discurso para nitrogen_level
-            self.nitrogen_level_universe = np.arange(0, 1.01, 0.01)
-            self.nitrogen_level_var = ctrl.Antecedent(self.nitrogen_level_universe, 'nitrogen_level')
-            self.nitrogen_level_var['LOW'] = fuzz.trapmf(self.nitrogen_level_var.universe, [0, 0, 0.15, 0.3])
-            self.nitrogen_level_var['MODERATE'] = fuzz.trimf(self.nitrogen_level_var.universe, [0.25, 0.4, 0.55])
-            self.nitrogen_level_var['HIGH'] = fuzz.trimf(self.nitrogen_level_var.universe, [0.5, 0.65, 0.8])
-            self.nitrogen_level_var['VERY HIGH'] = fuzz.trapmf(self.nitrogen_level_var.universe, [0.75, 0.85, 1, 1])
-            self.vars['nitrogen_level'] = self.nitrogen_level_var
-
-        if 'phosphorus_level' in self.available_vars:
-            # Definir el universo de discurso para phosphorus_level
-            self.phosphorus_level_universe = np.arange(0, 1.01, 0.01)
-            self.phosphorus_level_var = ctrl.Antecedent(self.phosphorus_level_universe, 'phosphorus_level')
-            self.phosphorus_level_var['LOW'] = fuzz.trapmf(self.phosphorus_level_var.universe, [0, 0, 0.15, 0.3])
-            self.phosphorus_level_var['MODERATE'] = fuzz.trimf(self.phosphorus_level_var.universe, [0.25, 0.4, 0.55])
-            self.phosphorus_level_var['HIGH'] = fuzz.trimf(self.phosphorus_level_var.universe, [0.5, 0.65, 0.8])
-            self.phosphorus_level_var['VERY HIGH'] = fuzz.trapmf(self.phosphorus_level_var.universe, [0.75, 0.85, 1, 1])
-            self.vars['phosphorus_level'] = self.phosphorus_level_var
+        self.vars = {var_name: VARIABLES[var_name].antecedent() for var_name in self.available_vars}
 
         # Definir las reglas difusas según las vars disponibles
         self._define_rules()
 
         # Crear el sistema de control
         self.control_system = ctrl.ControlSystem(self.rules)
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.simulation = core.simulation(self.control_system)
 
     def _define_rules(self):
-        # Reglas basadas en las vars disponibles
-        if 'nitrogen_level' in self.vars and 'phosphorus_level' in self.vars:
-            # Ambas vars están disponibles
-            nitrogen_level = self.vars['nitrogen_level']
-            phosphorus_level = self.vars['phosphorus_level']
-
-            # Reglas detalladas
-            # Ambos LOW
-            self.rules.append(ctrl.Rule(nitrogen_level['LOW'] & phosphorus_level['LOW'], self.nutrient_level_var['LOW']))
-
-            # Ambos MODERATE
-            self.rules.append(ctrl.Rule(nitrogen_level['MODERATE'] & phosphorus_level['MODERATE'], self.nutrient_level_var['MODERATE']))
-
-            # Ambos HIGH
-            self.rules.append(ctrl.Rule(nitrogen_level['HIGH'] & phosphorus_level['HIGH'], self.nutrient_level_var['VERY HIGH']))
-
-            # Ambos VERY_HIGH
-            self.rules.append(ctrl.Rule(nitrogen_level['VERY HIGH'] & phosphorus_level['VERY HIGH'], self.nutrient_level_var['VERY HIGH']))
-
-            # Uno HIGH y otro MODERATE
-            self.rules.append(ctrl.Rule(
-                (nitrogen_level['HIGH'] & phosphorus_level['MODERATE']) | (nitrogen_level['MODERATE'] & phosphorus_level['HIGH']),
-                self.nutrient_level_var['HIGH']
-            ))
-
-            # Uno VERY_HIGH y otro HIGH
-            self.rules.append(ctrl.Rule(
-                (nitrogen_level['VERY HIGH'] & phosphorus_level['HIGH']) | (nitrogen_level['HIGH'] & phosphorus_level['VERY HIGH']),
-                self.nutrient_level_var['VERY HIGH']
-            ))
-
-            # Uno MODERATE y otro LOW
-            self.rules.append(ctrl.Rule(
-                (nitrogen_level['MODERATE'] & phosphorus_level['LOW']) | (nitrogen_level['LOW'] & phosphorus_level['MODERATE']),
-                self.nutrient_level_var['MODERATE']
-            ))
-
-            # Uno HIGH y otro LOW
-            self.rules.append(ctrl.Rule(
-                (nitrogen_level['HIGH'] & phosphorus_level['LOW']) | (nitrogen_level['LOW'] & phosphorus_level['HIGH']),
-                self.nutrient_level_var['MODERATE']
-            ))
-
-            # Uno VERY_HIGH y otro LOW
-            self.rules.append(ctrl.Rule(
-                (nitrogen_level['VERY HIGH'] & phosphorus_level['LOW']) | (nitrogen_level['LOW'] & phosphorus_level['VERY HIGH']),
-                self.nutrient_level_var['MODERATE']
-            ))
-
-            # Uno VERY_HIGH y otro MODERATE
-            self.rules.append(ctrl.Rule(
-                (nitrogen_level['VERY HIGH'] & phosphorus_level['MODERATE']) | (nitrogen_level['MODERATE'] & phosphorus_level['VERY HIGH']),
-                self.nutrient_level_var['HIGH']
-            ))
-
-            # Si la diferencia es más de un nivel, el nivel es el más bajo
-            self.rules.append(ctrl.Rule(
-                (nitrogen_level['VERY HIGH'] & phosphorus_level['LOW']) | (nitrogen_level['LOW'] & phosphorus_level['VERY HIGH']),
-                self.nutrient_level_var['MODERATE']
-            ))
-
-        else:
-            # Si solo una variable está disponible, el nivel de nutrient_level es el mismo que la variable disponible
-            for var_name in ['nitrogen_level', 'phosphorus_level']:
-                if var_name in self.vars:
-                    antecedent = self.vars[var_name]
-                    self.rules.append(ctrl.Rule(antecedent['LOW'], self.nutrient_level_var['LOW']))
-                    self.rules.append(ctrl.Rule(antecedent['MODERATE'], self.nutrient_level_var['MODERATE']))
-                    self.rules.append(ctrl.Rule(antecedent['HIGH'], self.nutrient_level_var['HIGH']))
-                    self.rules.append(ctrl.Rule(antecedent['VERY HIGH'], self.nutrient_level_var['VERY HIGH']))
+        used_vars, _ = self.get_used_vars()
+        self.rules = spec.build_rules(RULES[used_vars], self.vars, self.nutrient_level_var)
 
     def calculate_inference(self):
         # Asignar los valuees de entrada disponibles
-        if 'nitrogen_level' in self.vars:
-            self.simulation.input['nitrogen_level'] = self.nitrogen_level
-        if 'phosphorus_level' in self.vars:
-            self.simulation.input['phosphorus_level'] = self.phosphorus_level
+        values = {'nitrogen_level': self.nitrogen_level, 'phosphorus_level': self.phosphorus_level}
+        crisp_inputs = self.get_crisp_inputs(values)
+        for var_name, var_value in crisp_inputs.items():
+            self.simulation.input[var_name] = var_value
 
         try:
             # Realizar la inferencia
-            self.simulation.compute()
-
-            # Obtener el resultado
-            self.nutrient_level = self.simulation.output['nutrient_level']
+            self.nutrient_level = memo.compute(self, crisp_inputs)
         except Exception as e:
             raise ValueError(f"Error al calcular la inferencia: {e}")
 
+        return self.get_used_vars()
+
+    def get_crisp_inputs(self, values):
+        return {var_name: values[var_name] for var_name in self.vars}
+
+    def get_used_vars(self):
         # Determinar vars usadas y confidence
         if 'nitrogen_level' in self.vars and 'phosphorus_level' in self.vars:
             used_vars = 'NITROGEN_PHOSPHORUS'
@@ -164,12 +148,4 @@ class NutrientLevel:
         if np.isnan(self.nutrient_level):
             raise ValueError("No se ha calculado la inferencia de nivel de nutrient_level.")
 
-        # Determinar la label con mayor degree de pertenencia
-        membership_degrees = {}
-        for label in self.nutrient_level_var.terms:
-            membership_function = self.nutrient_level_var[label].mf
-            degree = fuzz.interp_membership(self.nutrient_level_var.universe, membership_function, self.nutrient_level)
-            membership_degrees[label] = degree
-
-        predicted_label = max(membership_degrees, key=membership_degrees.get)
-        return predicted_label
+        return LABELER([self.nutrient_level])[0]
@@ -2,6 +2,103 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from system.fuzzy import core, labels, memo, registry, spec
+
+# Variable de salida, común a todos los sistemas del componente
+UNIVERSE = np.arange(0, 1.01, 0.01)
+TERMS = {
+    'LOW': fuzz.trapmf(UNIVERSE, [0, 0, 0.15, 0.3]),
+    'MODERATE': fuzz.trimf(UNIVERSE, [0.25, 0.4, 0.55]),
+    'HIGH': fuzz.trimf(UNIVERSE, [0.5, 0.65, 0.8]),
+    'VERY HIGH': fuzz.trapmf(UNIVERSE, [0.75, 0.85, 1, 1]),
+}
+LABELER = labels.Labeler(UNIVERSE, TERMS)
+OUTPUT = spec.Variable('phosphorus_level', UNIVERSE, TERMS)
+
+# Variables de entrada, compiladas una vez al importar el módulo
+VARIABLES = spec.variables(dict(
+    TP=dict(
+        universe = np.arange(0, 0.1, 0.001),  # Rango de 0 a 1 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.010, 0.015]},
+            'MODERATE': {'type': 'trimf', 'params': [0.012, 0.018, 0.024]},
+            'HIGH': {'type': 'trimf', 'params': [0.024, 0.06, 0.096]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.090, 0.096, 0.1, 0.1]}
+        }
+    ),
+    TDP=dict(
+        universe = np.arange(0, 0.51, 0.01),  # Rango de 0 a 0.5 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.01, 0.03]},
+            'MODERATE': {'type': 'trimf', 'params': [0.02, 0.05, 0.1]},
+            'HIGH': {'type': 'trimf', 'params': [0.08, 0.15, 0.25]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.2, 0.35, 0.5, 0.5]}
+        }
+    ),
+    TIP=dict(
+        universe = np.arange(0, 0.51, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.015, 0.035]},
+            'MODERATE': {'type': 'trimf', 'params': [0.025, 0.06, 0.1]},
+            'HIGH': {'type': 'trimf', 'params': [0.08, 0.15, 0.25]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.2, 0.35, 0.5, 0.5]}
+        }
+    ),
+    DIP=dict(
+        universe = np.arange(0, 0.26, 0.01),  # Rango de 0 a 0.25 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.005, 0.015]},
+            'MODERATE': {'type': 'trimf', 'params': [0.01, 0.03, 0.06]},
+            'HIGH': {'type': 'trimf', 'params': [0.05, 0.1, 0.15]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.12, 0.18, 0.25, 0.25]}
+        }
+    ),
+    TRP=dict(
+        universe = np.arange(0, 0.51, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.01, 0.03]},
+            'MODERATE': {'type': 'trimf', 'params': [0.02, 0.05, 0.1]},
+            'HIGH': {'type': 'trimf', 'params': [0.08, 0.15, 0.25]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.2, 0.35, 0.5, 0.5]}
+        }
+    ),
+    DRP=dict(
+        universe = np.arange(0, 0.26, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.005, 0.015]},
+            'MODERATE': {'type': 'trimf', 'params': [0.01, 0.03, 0.06]},
+            'HIGH': {'type': 'trimf', 'params': [0.05, 0.1, 0.15]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.12, 0.18, 0.25, 0.25]}
+        }
+    ),
+    TPP=dict(
+        universe = np.arange(0, 0.51, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.005, 0.02]},
+            'MODERATE': {'type': 'trimf', 'params': [0.015, 0.04, 0.08]},
+            'HIGH': {'type': 'trimf', 'params': [0.06, 0.12, 0.2]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.15, 0.25, 0.5, 0.5]}
+        }
+    )
+))
+
+# Orden de prioridad de las vars
+PRIORITY_VARS = (
+    'TP', 'TDP', 'TIP', 'DIP', 'TRP', 'DRP', 'TPP'
+)
+
+# Reglas por variable de entrada; TP calculado (TDP_TPP, TIP_TRP) usa las de TP
+RULES = spec.rules({
+    var: [
+        (f'{var}[LOW]', 'LOW'),
+        (f'{var}[MODERATE]', 'MODERATE'),
+        (f'{var}[HIGH]', 'HIGH'),
+        (f'{var}[VERY HIGH]', 'VERY HIGH'),
+    ]
+    for var in PRIORITY_VARS
+})
+
+
 class PhosphorusLevel:
     def __init__(self, custom_vars=dict(), **kwargs):
         self.custom_vars = custom_vars
@@ -9,10 +106,7 @@ class PhosphorusLevel:
         self.available_vars = {k: v for k, v in self.inputs.items() if not np.isnan(v)}
         self.phosphorus_level = np.nan
 
-        # Orden de prioridad de las vars
-        self.priority_vars = [
-            'TP', 'TDP', 'TIP', 'DIP', 'TRP', 'DRP', 'TPP'
-        ]
+        self.priority_vars = PRIORITY_VARS
 
         self.available_vars = {k: v for k, v in self.available_vars.items() if k in self.priority_vars}
 
@@ -20,208 +114,83 @@ class PhosphorusLevel:
             raise ValueError(f"No se encontraron vars válidas para inferencia.")
 
         self._init_vars()
-        self._create_fuzzy_system()
+        registry.load_fuzzy_system(self, self._create_fuzzy_system, self.available_vars, self.custom_vars)
 
     def _init_vars(self):
-        self.base_vars = dict(
-            TP=dict(
-                universe = np.arange(0, 0.1, 0.001),  # Rango de 0 a 1 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 0.010, 0.015]},
-                    'MODERATE': {'type': 'trimf', 'params': [0.012, 0.018, 0.024]},
-                    'HIGH': {'type': 'trimf', 'params': [0.024, 0.06, 0.096]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [0.090, 0.096, 0.1, 0.1]}
-                }
-            ),
-            TDP=dict(
-                universe = np.arange(0, 0.51, 0.01),  # Rango de 0 a 0.5 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 0.01, 0.03]},
-                    'MODERATE': {'type': 'trimf', 'params': [0.02, 0.05, 0.1]},
-                    'HIGH': {'type': 'trimf', 'params': [0.08, 0.15, 0.25]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [0.2, 0.35, 0.5, 0.5]}
-                }
-            ),
-            TIP=dict(
-                universe = np.arange(0, 0.51, 0.01),
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 0.015, 0.035]},
-                    'MODERATE': {'type': 'trimf', 'params': [0.025, 0.06, 0.1]},
-                    'HIGH': {'type': 'trimf', 'params': [0.08, 0.15, 0.25]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [0.2, 0.35, 0.5, 0.5]}
-                }
-            ),
-            DIP=dict(
-                universe = np.arange(0, 0.26, 0.01),  # Rango de 0 a 0.25 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 0.005, 0.015]},
-                    'MODERATE': {'type': 'trimf', 'params': [0.01, 0.03, 0.06]},
-                    'HIGH': {'type': 'trimf', 'params': [0.05, 0.1, 0.15]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [0.12, 0.18, 0.25, 0.25]}
-                }
-            ),
-            TRP=dict(
-                universe = np.arange(0, 0.51, 0.01),
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 0.01, 0.03]},
-                    'MODERATE': {'type': 'trimf', 'params': [0.02, 0.05, 0.1]},
-                    'HIGH': {'type': 'trimf', 'params': [0.08, 0.15, 0.25]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [0.2, 0.35, 0.5, 0.5]}
-                }
-            ),
-            DRP=dict(
-                universe = np.arange(0, 0.26, 0.01),
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 0.005, 0.015]},
-                    'MODERATE': {'type': 'trimf', 'params': [0.01, 0.03, 0.06]},
-                    'HIGH': {'type': 'trimf', 'params': [0.05, 0.1, 0.15]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [0.12, 0.18, 0.25, 0.25]}
-                }
-            ),
-            TPP=dict(
-                universe = np.arange(0, 0.51, 0.01),
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 0.005, 0.02]},
-                    'MODERATE': {'type': 'trimf', 'params': [0.015, 0.04, 0.08]},
-                    'HIGH': {'type': 'trimf', 'params': [0.06, 0.12, 0.2]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [0.15, 0.25, 0.5, 0.5]}
-                }
-            )
-        )
-
-        for var_name, var_content in self.custom_vars.items():
-            self.base_vars[var_name] = var_content
-
-    def _get_variable_definitions(self, var_name):
-        var_content = self.base_vars.get(var_name, None)
-
-        if var_content:
-            universe = var_content['universe']
-            mf_definitions = var_content['mf_definitions']
-        else:
+        # Definiciones compiladas al importar, con las personalizadas del trabajo
+        self.base_vars = spec.override(VARIABLES, self.custom_vars)
+
+    def _get_variable(self, var_name):
+        variable = self.base_vars.get(var_name, None)
+
+        if variable is None:
             raise ValueError(f"Variable desconocida: {var_name}")
 
-        return universe, mf_definitions
+        return variable
 
     def _create_fuzzy_system(self):
-        # Inicializar estructuras
-        self.rules = []
-        self.vars = {}
-        self.mf_definitions = {}
         self.calculation_method = None  # Método utilizado para el cálculo
 
         # Verificar la disponibilidad de vars en orden de prioridad
         if 'TP' in self.available_vars:
             self.calculation_method = 'TP'
-            # Definir variable difusa para TP
-            universe, mf_definitions = self._get_variable_definitions('TP')
-            antecedent = ctrl.Antecedent(universe, 'TP')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TP'] = antecedent
 
+        # TP calculado a partir de TDP y TPP
         elif 'TDP' in self.available_vars and 'TPP' in self.available_vars:
             self.calculation_method = 'TDP_TPP'
-            # Definir variable difusa para TP (calculado)
-            universe, mf_definitions = self._get_variable_definitions('TP')
-            antecedent = ctrl.Antecedent(universe, 'TP')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TP'] = antecedent
 
+        # TP calculado a partir de TIP y TRP
         elif 'TIP' in self.available_vars and 'TRP' in self.available_vars:
             self.calculation_method = 'TIP_TRP'
-            # Definir variable difusa para TP (calculado)
-            universe, mf_definitions = self._get_variable_definitions('TP')
-            antecedent = ctrl.Antecedent(universe, 'TP')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TP'] = antecedent
 
         else:
             # Usar vars individuales en orden de prioridad
             for var_name in self.priority_vars:
                 if var_name in self.available_vars:
                     self.calculation_method = var_name
-                    universe, mf_definitions = self._get_variable_definitions(var_name)
-                    antecedent = ctrl.Antecedent(universe, var_name)
-                    for label, params in mf_definitions.items():
-                        if params['type'] == 'trapmf':
-                            antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                        elif params['type'] == 'trimf':
-                            antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-                    self.vars[var_name] = antecedent
                     break
             else:
                 # Si no hay vars disponibles, error
                 raise ValueError("No hay vars válidas disponibles para crear el sistema difuso.")
 
-        # Definir variable de salida
-        self.phosphorus_level_universe = np.arange(0, 1.01, 0.01)
-        self.phosphorus_level_var = ctrl.Consequent(self.phosphorus_level_universe, 'phosphorus_level')
-        self.phosphorus_level_var['LOW'] = fuzz.trapmf(self.phosphorus_level_var.universe, [0, 0, 0.15, 0.3])
-        self.phosphorus_level_var['MODERATE'] = fuzz.trimf(self.phosphorus_level_var.universe, [0.25, 0.4, 0.55])
-        self.phosphorus_level_var['HIGH'] = fuzz.trimf(self.phosphorus_level_var.universe, [0.5, 0.65, 0.8])
-        self.phosphorus_level_var['VERY HIGH'] = fuzz.trapmf(self.phosphorus_level_var.universe, [0.75, 0.85, 1, 1])
-
-        # Definir reglas difusas basadas en la variable seleccionada
-        if self.calculation_method in ['TP', 'TDP_TPP', 'TIP_TRP']:
-            # Reglas basadas en TP
-            self.rules.append(ctrl.Rule(self.vars['TP']['LOW'], self.phosphorus_level_var['LOW']))
-            self.rules.append(ctrl.Rule(self.vars['TP']['MODERATE'], self.phosphorus_level_var['MODERATE']))
-            self.rules.append(ctrl.Rule(self.vars['TP']['HIGH'], self.phosphorus_level_var['HIGH']))
-            self.rules.append(ctrl.Rule(self.vars['TP']['VERY HIGH'], self.phosphorus_level_var['VERY HIGH']))
-        else:
-            # Reglas basadas en vars individuales
-            var_name = self.calculation_method
-            antecedent = self.vars[var_name]
-            self.rules.append(ctrl.Rule(antecedent['LOW'], self.phosphorus_level_var['LOW']))
-            self.rules.append(ctrl.Rule(antecedent['MODERATE'], self.phosphorus_level_var['MODERATE']))
-            self.rules.append(ctrl.Rule(antecedent['HIGH'], self.phosphorus_level_var['HIGH']))
-            self.rules.append(ctrl.Rule(antecedent['VERY HIGH'], self.phosphorus_level_var['VERY HIGH']))
+        # Variable difusa de entrada (TP también cuando se calcula)
+        var_name = 'TP' if self.calculation_method in ['TP', 'TDP_TPP', 'TIP_TRP'] else self.calculation_method
+        self.vars = {var_name: self._get_variable(var_name).antecedent()}
+
+        # Variable de salida y reglas
+        self.phosphorus_level_universe = UNIVERSE
+        self.phosphorus_level_var = OUTPUT.consequent()
+        self.rules = spec.build_rules(RULES[var_name], self.vars, self.phosphorus_level_var)
 
         # Crear el sistema de control
         self.control_system = ctrl.ControlSystem(self.rules)
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.simulation = core.simulation(self.control_system)
+
+    def get_crisp_inputs(self, values):
+        if self.calculation_method == 'TP':
+            return {'TP': values['TP']}
+
+        elif self.calculation_method == 'TDP_TPP':
+            return {'TP': values['TDP'] + values['TPP']}
+
+        elif self.calculation_method == 'TIP_TRP':
+            return {'TP': values['TIP'] + values['TRP']}
+
+        else:
+            var_name = self.calculation_method
+            return {var_name: values[var_name]}
 
     def calculate_inference(self):
         if not hasattr(self, 'simulation'):
             raise ValueError("No ha sido posible crear el sistema de control.")
 
         try:
-            if self.calculation_method == 'TP':
-                tp_value = self.available_vars['TP']
-                self.simulation.input['TP'] = tp_value
-
-            elif self.calculation_method == 'TDP_TPP':
-                tdp_value = self.available_vars['TDP']
-                tpp_value = self.available_vars['TPP']
-                tp_value = tdp_value + tpp_value
-                self.simulation.input['TP'] = tp_value
-
-            elif self.calculation_method == 'TIP_TRP':
-                tip_value = self.available_vars['TIP']
-                trp_value = self.available_vars['TRP']
-                tp_value = tip_value + trp_value
-                self.simulation.input['TP'] = tp_value
-
-            else:
-                var_name = self.calculation_method
-                var_value = self.available_vars[var_name]
+            crisp_inputs = self.get_crisp_inputs(self.available_vars)
+            for var_name, var_value in crisp_inputs.items():
                 self.simulation.input[var_name] = var_value
 
             # Realizar la computación
-            self.simulation.compute()
-            self.phosphorus_level = self.simulation.output['phosphorus_level']
+            self.phosphorus_level = memo.compute(self, crisp_inputs)
 
         except Exception as e:
             raise ValueError(f"Error al calcular la inferencia: {e}")
@@ -232,19 +201,4 @@ class PhosphorusLevel:
         if np.isnan(self.phosphorus_level):
             raise ValueError("El nivel de nitrógeno no está disponible.")
 
-        # Crear un diccionario para almacenar los degrees de pertenencia
-        membership_degrees = {}
-
-        # Para cada label en la variable de salida
-        for label in self.phosphorus_level_var.terms:
-            # Obtener la función de pertenencia correspondiente
-            membership_function = self.phosphorus_level_var[label].mf
-            # Calcular el degree de pertenencia del value de salida en esta función
-            degree = fuzz.interp_membership(self.phosphorus_level_var.universe, membership_function, self.phosphorus_level)
-            # Almacenar el degree en el diccionario
-            membership_degrees[label] = degree
-
-        # Encontrar la label con el mayor degree de pertenencia
-        predicted_label = max(membership_degrees, key=membership_degrees.get)
-
-        return predicted_label
+        return LABELER([self.phosphorus_level])[0]
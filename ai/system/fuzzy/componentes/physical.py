@@ -2,6 +2,71 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from system.fuzzy import core, labels, memo, registry, spec
+
+# Variable de salida, común a todos los sistemas del componente
+UNIVERSE = np.arange(0, 1.01, 0.01)
+TERMS = {
+    'GOOD': fuzz.trapmf(UNIVERSE, [0, 0, 0.2, 0.3]),
+    'NEUTRALS': fuzz.trimf(UNIVERSE, [0.25, 0.4, 0.55]),
+    'BAD': fuzz.trimf(UNIVERSE, [0.5, 0.65, 0.8]),
+    'VERY BAD': fuzz.trapmf(UNIVERSE, [0.75, 0.85, 1, 1]),
+}
+LABELER = labels.Labeler(UNIVERSE, TERMS)
+OUTPUT = spec.Variable('physical_conditions', UNIVERSE, TERMS)
+
+# Variables de entrada, compiladas una vez al importar el módulo
+VARIABLES = spec.variables(dict(
+    solids_level=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.2, 0.4]},
+            'MODERATE': {'type': 'trimf', 'params': [0.3, 0.5, 0.7]},
+            'HIGH': {'type': 'trimf', 'params': [0.6, 0.75, 0.9]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.85, 0.95, 1, 1]}
+        }
+    ),
+    visibility_level=dict(
+        universe = np.arange(0, 1.01, 0.01),
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 0.2, 0.4]},
+            'MODERATE': {'type': 'trimf', 'params': [0.3, 0.5, 0.7]},
+            'HIGH': {'type': 'trimf', 'params': [0.6, 0.75, 0.9]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [0.85, 0.95, 1, 1]}
+        }
+    )
+))
+
+# Reglas por vars usadas (ver get_used_vars)
+RULES = spec.rules({
+    'SOLIDS_VISIBILITY': [
+        ('visibility_level[VERY HIGH] & (solids_level[LOW] | solids_level[MODERATE])', 'GOOD'),
+        ('visibility_level[VERY HIGH] & (solids_level[HIGH] | solids_level[VERY HIGH])', 'NEUTRALS'),
+
+        ('visibility_level[HIGH] & solids_level[LOW]', 'GOOD'),
+        ('visibility_level[HIGH] & (solids_level[MODERATE] | solids_level[HIGH] | solids_level[VERY HIGH])', 'NEUTRALS'),
+
+        ('visibility_level[MODERATE] & (solids_level[LOW] | solids_level[MODERATE])', 'NEUTRALS'),
+        ('visibility_level[MODERATE] & (solids_level[HIGH] | solids_level[VERY HIGH])', 'BAD'),
+
+        ('visibility_level[LOW] & solids_level[LOW]', 'NEUTRALS'),
+        ('visibility_level[LOW] & (solids_level[MODERATE] | solids_level[HIGH])', 'BAD'),
+        ('visibility_level[LOW] & (solids_level[VERY HIGH])', 'VERY BAD'),
+    ],
+    'SOLIDS': [
+        ('solids_level[LOW]', 'GOOD'),
+        ('solids_level[MODERATE]', 'NEUTRALS'),
+        ('solids_level[HIGH]', 'BAD'),
+        ('solids_level[VERY HIGH]', 'VERY BAD'),
+    ],
+    'VISIBILITY': [
+        ('visibility_level[VERY HIGH]', 'GOOD'),
+        ('visibility_level[HIGH]', 'NEUTRALS'),
+        ('visibility_level[MODERATE]', 'BAD'),
+        ('visibility_level[LOW]', 'VERY BAD'),
+    ],
+})
+
 
 class PhysicalConditions:
     def __init__(self, solids_level=np.nan, visibility_level=np.nan):
@@ -21,100 +86,46 @@ class PhysicalConditions:
             self.available_vars.append('visibility_level')
 
         # Crear el sistema difuso según las vars disponibles
-        self._create_fuzzy_system()
+        registry.load_fuzzy_system(self, self._create_fuzzy_system, self.available_vars)
 
     def _create_fuzzy_system(self):
         # Definir la variable de salida
-        self.physical_conditions_universe = np.arange(0, 1.01, 0.01)
-        self.physical_conditions_var = ctrl.Consequent(self.physical_conditions_universe, 'physical_conditions')
-        self.physical_conditions_var['GOOD'] = fuzz.trapmf(self.physical_conditions_var.universe, [0, 0, 0.2, 0.3])
-        self.physical_conditions_var['NEUTRALS'] = fuzz.trimf(self.physical_conditions_var.universe, [0.25, 0.4, 0.55])
-        self.physical_conditions_var['BAD'] = fuzz.trimf(self.physical_conditions_var.universe, [0.5, 0.65, 0.8])
-        self.physical_conditions_var['VERY BAD'] = fuzz.trapmf(self.physical_conditions_var.universe, [0.75, 0.85, 1, 1])
-
-        self.rules = []
-        self.vars = {}
+        self.physical_conditions_universe = UNIVERSE
+        self.physical_conditions_var = OUTPUT.consequent()
 
         # Definir vars difusas según las vars disponibles
-        if 'solids_level' in self.available_vars:
-            # Definir el universo de discurso para solids_level
-            self.solids_level_universe = np.arange(0, 1.01, 0.01)
-            self.solids_level_var = ctrl.Antecedent(self.solids_level_universe, 'solids_level')
-            self.solids_level_var['LOW'] = fuzz.trapmf(self.solids_level_var.universe, [0, 0, 0.2, 0.4])
-            self.solids_level_var['MODERATE'] = fuzz.trimf(self.solids_level_var.universe, [0.3, 0.5, 0.7])
-            self.solids_level_var['HIGH'] = fuzz.trimf(self.solids_level_var.universe, [0.6, 0.75, 0.9])
-            self.solids_level_var['VERY HIGH'] = fuzz.trapmf(self.solids_level_var.universe, [0.85, 0.95, 1, 1])
-            self.vars['solids_level'] = self.solids_level_var
-
-        if 'visibility_level' in self.available_vars:
-            # Definir el universo de discurso para visibility_level
-            self.visibility_level_universe = np.arange(0, 1.01, 0.01)
-            self.visibility_level_var = ctrl.Antecedent(self.visibility_level_universe, 'visibility_level')
-            self.visibility_level_var['LOW'] = fuzz.trapmf(self.visibility_level_var.universe, [0, 0, 0.2, 0.4])
-            self.visibility_level_var['MODERATE'] = fuzz.trimf(self.visibility_level_var.universe, [0.3, 0.5, 0.7])
-            self.visibility_level_var['HIGH'] = fuzz.trimf(self.visibility_level_var.universe, [0.6, 0.75, 0.9])
-            self.visibility_level_var['VERY HIGH'] = fuzz.trapmf(self.visibility_level_var.universe, [0.85, 0.95, 1, 1])
-            self.vars['visibility_level'] = self.visibility_level_var
+        self.vars = {var_name: VARIABLES[var_name].antecedent() for var_name in self.available_vars}
 
         # Definir las reglas difusas según las vars disponibles
         self._define_rules()
 
         # Crear el sistema de control
         self.control_system = ctrl.ControlSystem(self.rules)
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.simulation = core.simulation(self.control_system)
 
     def _define_rules(self):
-        # Reglas basadas en las vars disponibles
-        if 'solids_level' in self.vars and 'visibility_level' in self.vars:
-            # Ambas vars están disponibles
-            solids_level = self.vars['solids_level']
-            visibility_level = self.vars['visibility_level']
-
-            self.rules.append(ctrl.Rule(visibility_level['VERY HIGH'] & (solids_level['LOW'] | solids_level['MODERATE']), self.physical_conditions_var['GOOD']))
-            self.rules.append(ctrl.Rule(visibility_level['VERY HIGH'] & (solids_level['HIGH'] | solids_level['VERY HIGH']), self.physical_conditions_var['NEUTRALS']))
-
-            self.rules.append(ctrl.Rule(visibility_level['HIGH'] & solids_level['LOW'], self.physical_conditions_var['GOOD']))
-            self.rules.append(ctrl.Rule(visibility_level['HIGH'] & (solids_level['MODERATE'] | solids_level['HIGH'] | solids_level['VERY HIGH']), self.physical_conditions_var['NEUTRALS']))
-
-            self.rules.append(ctrl.Rule(visibility_level['MODERATE'] & (solids_level['LOW'] | solids_level['MODERATE']), self.physical_conditions_var['NEUTRALS']))
-            self.rules.append(ctrl.Rule(visibility_level['MODERATE'] & (solids_level['HIGH'] | solids_level['VERY HIGH']), self.physical_conditions_var['BAD']))
-
-            self.rules.append(ctrl.Rule(visibility_level['LOW'] & solids_level['LOW'], self.physical_conditions_var['NEUTRALS']))
-            self.rules.append(ctrl.Rule(visibility_level['LOW'] & (solids_level['MODERATE'] | solids_level['HIGH']), self.physical_conditions_var['BAD']))
-            self.rules.append(ctrl.Rule(visibility_level['LOW'] & (solids_level['VERY HIGH']), self.physical_conditions_var['VERY BAD']))
-
-        elif 'solids_level' in self.vars:
-            # Solo solids_level está disponible
-            solids_level = self.vars['solids_level']
-            self.rules.append(ctrl.Rule(solids_level['LOW'], self.physical_conditions_var['GOOD']))
-            self.rules.append(ctrl.Rule(solids_level['MODERATE'], self.physical_conditions_var['NEUTRALS']))
-            self.rules.append(ctrl.Rule(solids_level['HIGH'], self.physical_conditions_var['BAD']))
-            self.rules.append(ctrl.Rule(solids_level['VERY HIGH'], self.physical_conditions_var['VERY BAD']))
-
-        elif 'visibility_level' in self.vars:
-            # Solo visibility_level está disponible
-            visibility_level = self.vars['visibility_level']
-            self.rules.append(ctrl.Rule(visibility_level['VERY HIGH'], self.physical_conditions_var['GOOD']))
-            self.rules.append(ctrl.Rule(visibility_level['HIGH'], self.physical_conditions_var['NEUTRALS']))
-            self.rules.append(ctrl.Rule(visibility_level['MODERATE'], self.physical_conditions_var['BAD']))
-            self.rules.append(ctrl.Rule(visibility_level['LOW'], self.physical_conditions_var['VERY BAD']))
+        used_vars, _ = self.get_used_vars()
+        self.rules = spec.build_rules(RULES[used_vars], self.vars, self.physical_conditions_var)
 
     def calculate_inference(self):
         # Asignar los valuees de entrada disponibles
-        if 'solids_level' in self.vars:
-            self.simulation.input['solids_level'] = self.solids_level
-        if 'visibility_level' in self.vars:
-            self.simulation.input['visibility_level'] = self.visibility_level
+        values = {'solids_level': self.solids_level, 'visibility_level': self.visibility_level}
+        crisp_inputs = self.get_crisp_inputs(values)
+        for var_name, var_value in crisp_inputs.items():
+            self.simulation.input[var_name] = var_value
 
         try:
             # Realizar la inferencia
-            self.simulation.compute()
-
-            # Obtener el resultado
-            self.physical_conditions = self.simulation.output['physical_conditions']
+            self.physical_conditions = memo.compute(self, crisp_inputs)
         except Exception as e:
             raise ValueError(f"Error al calcular la inferencia: {e}")
 
+        return self.get_used_vars()
+
+    def get_crisp_inputs(self, values):
+        return {var_name: values[var_name] for var_name in self.vars}
+
+    def get_used_vars(self):
         # Determinar vars usadas y confidence
         if 'solids_level' in self.vars and 'visibility_level' in self.vars:
             used_vars = 'SOLIDS_VISIBILITY'
@@ -132,12 +143,4 @@ class PhysicalConditions:
         if np.isnan(self.physical_conditions):
             raise ValueError("No se ha calculado la inferencia de condiciones físicas.")
 
-        # Determinar la label con mayor degree de pertenencia
-        membership_degrees = {}
-        for label in self.physical_conditions_var.terms:
-            membership_function = self.physical_conditions_var[label].mf
-            degree = fuzz.interp_membership(self.physical_conditions_var.universe, membership_function, self.physical_conditions)
-            membership_degrees[label] = degree
-
-        predicted_label = max(membership_degrees, key=membership_degrees.get)
-        return predicted_label
+        return LABELER([self.physical_conditions])[0]
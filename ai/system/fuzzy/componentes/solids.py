@@ -2,6 +2,115 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from system.fuzzy import core, labels, memo, registry, spec
+
+# Variable de salida, común a todos los sistemas del componente
+UNIVERSE = np.arange(0, 1.01, 0.01)
+TERMS = {
+    'LOW': fuzz.trapmf(UNIVERSE, [0, 0, 0.2, 0.4]),
+    'MODERATE': fuzz.trimf(UNIVERSE, [0.3, 0.5, 0.7]),
+    'HIGH': fuzz.trimf(UNIVERSE, [0.6, 0.75, 0.9]),
+    'VERY HIGH': fuzz.trapmf(UNIVERSE, [0.85, 0.95, 1, 1]),
+}
+LABELER = labels.Labeler(UNIVERSE, TERMS)
+OUTPUT = spec.Variable('solids_level', UNIVERSE, TERMS)
+
+# Variables de entrada, compiladas una vez al importar el módulo
+VARIABLES = spec.variables(dict(
+    TS=dict(
+        # Definición para Total Solids
+        universe = np.arange(0, 2001, 1),  # Rango de 0 a 2000 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 200, 500]},
+            'MODERATE': {'type': 'trimf', 'params': [400, 700, 1000]},
+            'HIGH': {'type': 'trimf', 'params': [900, 1200, 1500]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [1400, 1700, 2000, 2000]}
+        }
+    ),
+    TDS=dict(
+        # Definición para Total Dissolved Solids
+        universe = np.arange(0, 1501, 1),  # Rango de 0 a 1500 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 150, 300]},
+            'MODERATE': {'type': 'trimf', 'params': [250, 500, 750]},
+            'HIGH': {'type': 'trimf', 'params': [700, 900, 1100]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [1000, 1250, 1500, 1500]}
+        }
+    ),
+    TSS=dict(
+        # Definición para Total Suspended Solids
+        universe = np.arange(0, 500.1, 0.1),  # Rango de 0 a 500 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 20, 50]},
+            'MODERATE': {'type': 'trimf', 'params': [40, 100, 200]},
+            'HIGH': {'type': 'trimf', 'params': [150, 250, 350]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [300, 400, 500, 500]}
+        }
+    ),
+    FS=dict(
+        # Definición para Fixed Solids
+        universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
+            'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
+            'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
+        }
+    ),
+    VS=dict(
+        # Definición para Volatile Solids
+        universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
+            'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
+            'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
+        }
+    ),
+    FDS=dict(
+        # Definición para Fixed Dissolved Solids
+        universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
+            'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
+            'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
+        }
+    ),
+    VDS=dict(
+        # Definición para Volatile Dissolved Solids
+        universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
+        mf_definitions = {
+            'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
+            'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
+            'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
+            'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
+        }
+    )
+))
+
+# Orden de prioridad de las vars
+PRIORITY_VARS = ('TS', 'TDS', 'TSS', 'FDS', 'VDS', 'FS', 'VS')
+
+# Reglas por variable de entrada
+RULES = spec.rules({
+    var: [
+        (f'{var}[LOW]', 'LOW'),
+        (f'{var}[MODERATE]', 'MODERATE'),
+        (f'{var}[HIGH]', 'HIGH'),
+        (f'{var}[VERY HIGH]', 'VERY HIGH'),
+    ]
+    for var in PRIORITY_VARS
+})
+
+# Métodos que estiman TS o TDS a partir de otras vars, y la variable estimada
+ESTIMATED_VARS = {
+    'TDS_TSS': 'TS',
+    'FS_VS': 'TS',
+    'FDS_VDS': 'TDS',
+}
+
+
 class SolidsLevel:
     def __init__(self, custom_vars=dict(), **kwargs):
         self.custom_vars = custom_vars
@@ -9,8 +118,7 @@ class SolidsLevel:
         self.available_vars = {k: v for k, v in self.inputs.items() if not np.isnan(v)}
         self.solids_level = np.nan
 
-        # Orden de prioridad de las vars
-        self.priority_vars = ['TS', 'TDS', 'TSS', 'FDS', 'VDS', 'FS', 'VS']
+        self.priority_vars = PRIORITY_VARS
 
         self.available_vars = {k: v for k, v in self.available_vars.items() if k in self.priority_vars}
 
@@ -18,291 +126,89 @@ class SolidsLevel:
             raise ValueError("No se encontraron vars válidas para inferencia.")
 
         self._init_vars()
-        self._create_fuzzy_system()
+        registry.load_fuzzy_system(self, self._create_fuzzy_system, self.available_vars, self.custom_vars)
 
     def _init_vars(self):
-        self.base_vars = dict(
-            TS=dict(
-                # Definición para Total Solids
-                universe = np.arange(0, 2001, 1),  # Rango de 0 a 2000 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 200, 500]},
-                    'MODERATE': {'type': 'trimf', 'params': [400, 700, 1000]},
-                    'HIGH': {'type': 'trimf', 'params': [900, 1200, 1500]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [1400, 1700, 2000, 2000]}
-                }
-            ),
-            TDS=dict(
-                # Definición para Total Dissolved Solids
-                universe = np.arange(0, 1501, 1),  # Rango de 0 a 1500 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 150, 300]},
-                    'MODERATE': {'type': 'trimf', 'params': [250, 500, 750]},
-                    'HIGH': {'type': 'trimf', 'params': [700, 900, 1100]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [1000, 1250, 1500, 1500]}
-                }
-            ),
-            TSS=dict(
-                # Definición para Total Suspended Solids
-                universe = np.arange(0, 500.1, 0.1),  # Rango de 0 a 500 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 20, 50]},
-                    'MODERATE': {'type': 'trimf', 'params': [40, 100, 200]},
-                    'HIGH': {'type': 'trimf', 'params': [150, 250, 350]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [300, 400, 500, 500]}
-                }
-            ),
-            FS=dict(
-                # Definición para Fixed Solids
-                universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
-                    'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
-                    'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
-                }
-            ),
-            VS=dict(
-                # Definición para Volatile Solids
-                universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
-                    'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
-                    'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
-                }
-            ),
-            FDS=dict(
-                # Definición para Fixed Dissolved Solids
-                universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
-                    'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
-                    'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
-                }
-            ),
-            VDS=dict(
-                # Definición para Volatile Dissolved Solids
-                universe = np.arange(0, 1001, 1),  # Rango de 0 a 1000 mg/L
-                mf_definitions = {
-                    'LOW': {'type': 'trapmf', 'params': [0, 0, 100, 250]},
-                    'MODERATE': {'type': 'trimf', 'params': [200, 350, 500]},
-                    'HIGH': {'type': 'trimf', 'params': [450, 600, 750]},
-                    'VERY HIGH': {'type': 'trapmf', 'params': [700, 850, 1000, 1000]}
-                }
-            )
-        )
-
-        for var_name, var_content in self.custom_vars.items():
-            self.base_vars[var_name] = var_content
-
-    def _get_variable_definitions(self, var_name):
-        var_content = self.base_vars.get(var_name, None)
-
-        if var_content:
-            universe = var_content['universe']
-            mf_definitions = var_content['mf_definitions']
-        else:
+        # Definiciones compiladas al importar, con las personalizadas del trabajo
+        self.base_vars = spec.override(VARIABLES, self.custom_vars)
+
+    def _get_variable(self, var_name):
+        variable = self.base_vars.get(var_name, None)
+
+        if variable is None:
             raise ValueError(f"Variable desconocida: {var_name}")
 
-        return universe, mf_definitions
+        return variable
 
     def _create_fuzzy_system(self):
-        # Inicializar estructuras
-        self.rules = []
-        self.vars = {}
-        self.mf_definitions = {}
         self.calculation_method = None  # Método utilizado para el cálculo
 
         # Verificar la disponibilidad de vars en orden de prioridad
         if 'TS' in self.available_vars:
             self.calculation_method = 'TS'
-            # Definir variable difusa para TS
-            universe, mf_definitions = self._get_variable_definitions('TS')
-            antecedent = ctrl.Antecedent(universe, 'TS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TS'] = antecedent
-
         elif 'TDS' in self.available_vars and 'TSS' in self.available_vars:
             self.calculation_method = 'TDS_TSS'
-            # Definir variable difusa para TS (calculado)
-            universe, mf_definitions = self._get_variable_definitions('TS')
-            antecedent = ctrl.Antecedent(universe, 'TS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TS'] = antecedent
-
         elif 'FS' in self.available_vars and 'VS' in self.available_vars:
             self.calculation_method = 'FS_VS'
-            # Definir variable difusa para TS (estimado)
-            universe, mf_definitions = self._get_variable_definitions('TS')
-            antecedent = ctrl.Antecedent(universe, 'TS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TS'] = antecedent
-
         elif 'TDS' in self.available_vars:
             self.calculation_method = 'TDS'
-            universe, mf_definitions = self._get_variable_definitions('TDS')
-            antecedent = ctrl.Antecedent(universe, 'TDS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TDS'] = antecedent
-
         elif 'TSS' in self.available_vars:
             self.calculation_method = 'TSS'
-            universe, mf_definitions = self._get_variable_definitions('TSS')
-            antecedent = ctrl.Antecedent(universe, 'TSS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TSS'] = antecedent
-
         elif 'FDS' in self.available_vars and 'VDS' in self.available_vars:
             self.calculation_method = 'FDS_VDS'
-            # Definir variable difusa para TDS (estimado)
-            universe, mf_definitions = self._get_variable_definitions('TDS')
-            antecedent = ctrl.Antecedent(universe, 'TDS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['TDS'] = antecedent
-
         elif 'FDS' in self.available_vars:
             self.calculation_method = 'FDS'
-            universe, mf_definitions = self._get_variable_definitions('FDS')
-            antecedent = ctrl.Antecedent(universe, 'FDS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['FDS'] = antecedent
-
         elif 'VDS' in self.available_vars:
             self.calculation_method = 'VDS'
-            universe, mf_definitions = self._get_variable_definitions('VDS')
-            antecedent = ctrl.Antecedent(universe, 'VDS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['VDS'] = antecedent
-
         elif 'FS' in self.available_vars:
             self.calculation_method = 'FS'
-            universe, mf_definitions = self._get_variable_definitions('FS')
-            antecedent = ctrl.Antecedent(universe, 'FS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['FS'] = antecedent
-
         elif 'VS' in self.available_vars:
             self.calculation_method = 'VS'
-            universe, mf_definitions = self._get_variable_definitions('VS')
-            antecedent = ctrl.Antecedent(universe, 'VS')
-            for label, params in mf_definitions.items():
-                if params['type'] == 'trapmf':
-                    antecedent[label] = fuzz.trapmf(antecedent.universe, params['params'])
-                elif params['type'] == 'trimf':
-                    antecedent[label] = fuzz.trimf(antecedent.universe, params['params'])
-            self.vars['VS'] = antecedent
-
         else:
             # Si no hay vars disponibles, error
             raise ValueError("No hay vars válidas disponibles para crear el sistema difuso.")
 
-        # Definir variable de salida
-        self.solids_level_universe = np.arange(0, 1.01, 0.01)
-        self.solids_level_var = ctrl.Consequent(self.solids_level_universe, 'solids_level')
-        self.solids_level_var['LOW'] = fuzz.trapmf(self.solids_level_var.universe, [0, 0, 0.2, 0.4])
-        self.solids_level_var['MODERATE'] = fuzz.trimf(self.solids_level_var.universe, [0.3, 0.5, 0.7])
-        self.solids_level_var['HIGH'] = fuzz.trimf(self.solids_level_var.universe, [0.6, 0.75, 0.9])
-        self.solids_level_var['VERY HIGH'] = fuzz.trapmf(self.solids_level_var.universe, [0.85, 0.95, 1, 1])
-
-        # Definir reglas difusas basadas en la variable seleccionada
-        if self.calculation_method in ['TS', 'TDS_TSS', 'FS_VS']:
-            # Reglas basadas en TS
-            self.rules.append(ctrl.Rule(self.vars['TS']['LOW'], self.solids_level_var['LOW']))
-            self.rules.append(ctrl.Rule(self.vars['TS']['MODERATE'], self.solids_level_var['MODERATE']))
-            self.rules.append(ctrl.Rule(self.vars['TS']['HIGH'], self.solids_level_var['HIGH']))
-            self.rules.append(ctrl.Rule(self.vars['TS']['VERY HIGH'], self.solids_level_var['VERY HIGH']))
-        elif self.calculation_method == 'FDS_VDS':
-            # Reglas basadas en TDS estimado
-            self.rules.append(ctrl.Rule(self.vars['TDS']['LOW'], self.solids_level_var['LOW']))
-            self.rules.append(ctrl.Rule(self.vars['TDS']['MODERATE'], self.solids_level_var['MODERATE']))
-            self.rules.append(ctrl.Rule(self.vars['TDS']['HIGH'], self.solids_level_var['HIGH']))
-            self.rules.append(ctrl.Rule(self.vars['TDS']['VERY HIGH'], self.solids_level_var['VERY HIGH']))
-        else:
-            # Reglas basadas en la variable individual seleccionada
-            var_name = self.calculation_method
-            antecedent = self.vars[var_name]
-            self.rules.append(ctrl.Rule(antecedent['LOW'], self.solids_level_var['LOW']))
-            self.rules.append(ctrl.Rule(antecedent['MODERATE'], self.solids_level_var['MODERATE']))
-            self.rules.append(ctrl.Rule(antecedent['HIGH'], self.solids_level_var['HIGH']))
-            self.rules.append(ctrl.Rule(antecedent['VERY HIGH'], self.solids_level_var['VERY HIGH']))
+        # Variable difusa de entrada (TS o TDS también cuando se estiman)
+        var_name = ESTIMATED_VARS.get(self.calculation_method, self.calculation_method)
+        self.vars = {var_name: self._get_variable(var_name).antecedent()}
+
+        # Variable de salida y reglas
+        self.solids_level_universe = UNIVERSE
+        self.solids_level_var = OUTPUT.consequent()
+        self.rules = spec.build_rules(RULES[var_name], self.vars, self.solids_level_var)
 
         # Crear el sistema de control
         self.control_system = ctrl.ControlSystem(self.rules)
-        self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.simulation = core.simulation(self.control_system)
+
+    def get_crisp_inputs(self, values):
+        if self.calculation_method == 'TS':
+            return {'TS': values['TS']}
+
+        elif self.calculation_method == 'TDS_TSS':
+            return {'TS': values['TDS'] + values['TSS']}
+
+        elif self.calculation_method == 'FS_VS':
+            return {'TS': values['FS'] + values['VS']}
+
+        elif self.calculation_method == 'FDS_VDS':
+            return {'TDS': values['FDS'] + values['VDS']}
+
+        else:
+            var_name = self.calculation_method
+            return {var_name: values[var_name]}
 
     def calculate_inference(self):
         if not hasattr(self, 'simulation'):
             raise ValueError("No ha sido posible crear el sistema de control.")
 
         try:
-            if self.calculation_method == 'TS':
-                ts_value = self.available_vars['TS']
-                self.simulation.input['TS'] = ts_value
-
-            elif self.calculation_method == 'TDS_TSS':
-                tds_value = self.available_vars['TDS']
-                tss_value = self.available_vars['TSS']
-                ts_value = tds_value + tss_value
-                self.simulation.input['TS'] = ts_value
-
-            elif self.calculation_method == 'FS_VS':
-                fs_value = self.available_vars['FS']
-                vs_value = self.available_vars['VS']
-                ts_value = fs_value + vs_value
-                self.simulation.input['TS'] = ts_value
-
-            elif self.calculation_method == 'FDS_VDS':
-                fds_value = self.available_vars['FDS']
-                vds_value = self.available_vars['VDS']
-                tds_value = fds_value + vds_value
-                self.simulation.input['TDS'] = tds_value
-
-            else:
-                var_name = self.calculation_method
-                var_value = self.available_vars[var_name]
+            crisp_inputs = self.get_crisp_inputs(self.available_vars)
+            for var_name, var_value in crisp_inputs.items():
                 self.simulation.input[var_name] = var_value
 
             # Realizar la computación
-            self.simulation.compute()
-            self.solids_level = self.simulation.output['solids_level']
+            self.solids_level = memo.compute(self, crisp_inputs)
 
         except Exception as e:
             raise ValueError(f"Error al calcular la inferencia: {e}")
@@ -313,19 +219,4 @@ class SolidsLevel:
         if np.isnan(self.solids_level):
             raise ValueError("El nivel de sólidos no está disponible.")
 
-        # Crear un diccionario para almacenar los degrees de pertenencia
-        membership_degrees = {}
-
-        # Para cada label en la variable de salida
-        for label in self.solids_level_var.terms:
-            # Obtener la función de pertenencia correspondiente
-            membership_function = self.solids_level_var[label].mf
-            # Calcular el degree de pertenencia del value de salida en esta función
-            degree = fuzz.interp_membership(self.solids_level_var.universe, membership_function, self.solids_level)
-            # Almacenar el degree en el diccionario
-            membership_degrees[label] = degree
-
-        # Encontrar la label con el mayor degree de pertenencia
-        predicted_label = max(membership_degrees, key=membership_degrees.get)
-
-        return predicted_label
+        return LABELER([self.solids_level])[0]
@@ -0,0 +1,314 @@
+import weakref
+
+import numpy as np
+from skfuzzy import control as ctrl
+from skfuzzy.control.term import Term, TermAggregate
+
+# Motor de la inferencia fila a fila de los componentes: 'native' (reglas
+# compiladas a matrices NumPy) o 'skfuzzy' (ControlSystemSimulation, referencia)
+BACKENDS = ('native', 'skfuzzy')
+backend = 'native'
+
+# Número máximo de filas evaluadas a la vez, acota la memoria de las matrices intermedias
+_CHUNK_SIZE = 4096
+
+# Sistema compilado de cada ctrl.ControlSystem; se libera junto con el sistema
+_compiled = weakref.WeakKeyDictionary()
+
+
+class CompiledSystem:
+    """
+    ctrl.ControlSystem de skfuzzy compilado a matrices NumPy (inferencia Mamdani).
+
+    - Cada término de los antecedentes es una columna de la matriz de
+      pertenencias de las filas, más una última columna constante a 1.
+    - Las reglas se pasan a forma normal disyuntiva: una fila de índices de
+      columnas por conjunción (rellena con la columna constante) y el grado de
+      la regla es el máximo de sus conjunciones. AND/OR de skfuzzy son min/max,
+      así que la forma normal da exactamente el mismo grado.
+    - weights (reglas x términos del consecuente) guarda el peso con que cada
+      regla activa cada término, 0 si no lo activa.
+    """
+
+    def __init__(self, control_system) -> None:
+        antecedents = list(control_system.antecedents)
+        consequent = next(iter(control_system.consequents))
+
+        self.labels = tuple(antecedent.label for antecedent in antecedents)
+        self.output_label = consequent.label
+
+        # Funciones de pertenencia por antecedente y sus pendientes entre puntos del universo
+        self.universes = []
+        self.mfs = []
+        self.slopes = []
+        self.negated = []
+
+        columns = {}
+
+        def column(term, negated):
+            key = (term.parent.label, term.label, negated)
+            if key not in columns:
+                columns[key] = len(columns)
+            return columns[key]
+
+        conjunctions = []
+        rule_of = []
+        targets = {}
+        activations = []
+
+        for index, rule in enumerate(control_system.rules):
+            for conjunction in _dnf(rule.antecedent, column):
+                conjunctions.append(conjunction)
+                rule_of.append(index)
+
+            for weighted_term in rule.consequent:
+                target = targets.setdefault(weighted_term.term.label, len(targets))
+                activations.append((index, target, weighted_term.weight))
+
+        self.columns = len(columns)
+        for antecedent in antecedents:
+            keys = [key for key in columns if key[0] == antecedent.label]
+            universe = antecedent.universe.astype(np.float64)
+            mf = np.array([antecedent[term_label].mf for _, term_label, _ in keys], dtype=np.float64)
+            mf = mf.reshape(len(keys), len(universe))
+
+            self.universes.append(universe)
+            self.mfs.append((np.array([columns[key] for key in keys], dtype=np.intp), mf))
+            self.slopes.append(np.diff(mf, axis=1) / np.diff(universe))
+            self.negated.append(np.array([key[2] for key in keys], dtype=bool))
+
+        width = max((len(conjunction) for conjunction in conjunctions), default=1)
+        self.conjunctions = np.full((len(conjunctions), width), self.columns, dtype=np.intp)
+        for row, conjunction in enumerate(conjunctions):
+            self.conjunctions[row, :len(conjunction)] = conjunction
+
+        # Primera conjunción de cada regla, para reducir por regla con reduceat
+        self.rule_starts = np.flatnonzero(np.diff(rule_of, prepend=-1))
+
+        self.weights = np.zeros((len(self.rule_starts), len(targets)))
+        for index, target, weight in activations:
+            self.weights[index, target] = max(self.weights[index, target], weight)
+
+        self.output_universe = consequent.universe.astype(np.float64)
+        self.output_mfs = np.array([consequent[label].mf for label in targets], dtype=np.float64)
+
+    def __call__(self, inputs: dict, chunk_size: int = _CHUNK_SIZE) -> np.ndarray:
+        """
+        Parámetros:
+            inputs (dict): Etiqueta del antecedente -> array 1-D con los valores crisp.
+            chunk_size (int): Filas evaluadas por bloque.
+
+        Retorna:
+            np.ndarray: Valor defuzzificado por fila, NaN donde la salida quedó vacía.
+        """
+        for label in inputs:
+            if label not in self.labels:
+                raise ValueError("Unexpected input: " + label)
+
+        if len(inputs) != len(self.labels):
+            raise ValueError("All antecedents must have input values!")
+
+        values = [np.asarray(inputs[label], dtype=np.float64).ravel() for label in self.labels]
+        size = len(values[0])
+
+        output = np.full(size, np.nan)
+
+        for start in range(0, size, chunk_size):
+            memberships = self.fuzzify([value[start:start + chunk_size] for value in values])
+            output[start:start + chunk_size] = self.defuzz(self.fire(memberships))
+
+        return output
+
+    def fuzzify(self, values: list) -> np.ndarray:
+        """
+        Matriz de pertenencias (filas x columnas) de los valores de cada antecedente,
+        recortados al universo. Interpola igual que np.interp.
+        """
+        memberships = np.empty((len(values[0]), self.columns + 1))
+        memberships[:, -1] = 1.0
+
+        for value, universe, (columns, mf), slopes, negated in zip(values, self.universes, self.mfs, self.slopes, self.negated):
+            value = np.clip(value, universe[0], universe[-1])
+            lower = np.clip(np.searchsorted(universe, value, side='right') - 1, 0, len(universe) - 2)
+
+            degree = slopes[:, lower] * (value - universe[lower]) + mf[:, lower]
+            degree = np.where(value == universe[-1], mf[:, -1:], degree)
+            degree[negated] = 1.0 - degree[negated]
+
+            memberships[:, columns] = degree.T
+
+        return memberships
+
+    def fire(self, memberships: np.ndarray) -> np.ndarray:
+        """
+        Nivel de activación (filas x términos del consecuente) de cada término:
+        máximo sobre las reglas del grado de la regla por su peso.
+
+        minimum/maximum y no fmin/fmax: una entrada NaN se propaga a la salida
+        (NaN, como una salida vacía) en vez de descartarse en silencio, así
+        que la fila termina en errors.
+        """
+        degrees = np.minimum.reduce(memberships[:, self.conjunctions], axis=2)
+        firing = np.maximum.reduceat(degrees, self.rule_starts, axis=1)
+
+        return np.maximum.reduce(firing[:, :, np.newaxis] * self.weights, axis=1)
+
+    def defuzz(self, cuts: np.ndarray) -> np.ndarray:
+        """
+        Centroide de la agregación (máximo de los términos recortados) por fila.
+        """
+        universe = self.output_universe
+        size = len(cuts)
+
+        points = [np.broadcast_to(universe, (size, len(universe)))]
+        for target, mf in enumerate(self.output_mfs):
+            points.append(_crossings(universe, mf, cuts[:, target]))
+
+        x = np.sort(np.concatenate(points, axis=1), axis=1)
+        y = np.zeros_like(x)
+
+        for target, mf in enumerate(self.output_mfs):
+            membership = np.interp(x, universe, mf, left=0.0, right=0.0)
+            np.maximum(y, np.minimum(cuts[:, target, np.newaxis], membership), out=y)
+
+        # Centroide exacto de la función lineal a trozos (mismo cálculo que fuzz.defuzz)
+        x1, x2 = x[:, :-1], x[:, 1:]
+        y1, y2 = y[:, :-1], y[:, 1:]
+        heights = y1 + y2
+
+        area = 0.5 * (x2 - x1) * heights
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moment = np.where(heights > 0, x1 + (x2 - x1) * (y1 + 2.0 * y2) / (3.0 * heights), 0.0)
+
+        sum_area = area.sum(axis=1)
+        output = (moment * area).sum(axis=1) / np.fmax(sum_area, np.finfo(float).eps)
+        output[y.sum(axis=1) == 0] = np.nan
+
+        return output
+
+
+class Simulation:
+    """
+    Sustituto de ctrl.ControlSystemSimulation sobre el sistema compilado:
+    input[etiqueta] = valor, compute() y output, con los mismos errores que
+    skfuzzy. Sin salida (ninguna regla activa o alguna entrada NaN) la
+    etiqueta no está en output.
+    """
+
+    def __init__(self, control_system) -> None:
+        self.system = compile_system(control_system)
+        self.input = _Inputs(self.system.labels)
+        self.output = {}
+
+    def compute(self) -> None:
+        if len(self.input) != len(self.system.labels):
+            raise ValueError("All antecedents must have input values!")
+
+        value = self.system({label: [value] for label, value in self.input.items()})[0]
+
+        self.output = {} if np.isnan(value) else {self.system.output_label: value}
+
+
+class _Inputs(dict):
+    def __init__(self, labels) -> None:
+        super().__init__()
+        self.labels = labels
+
+    def __setitem__(self, label, value) -> None:
+        if label not in self.labels:
+            raise ValueError("Unexpected input: " + label)
+
+        super().__setitem__(label, value)
+
+
+def compile_system(control_system) -> CompiledSystem:
+    """
+    Sistema compilado de control_system, compilado la primera vez que se pide.
+    """
+    compiled = _compiled.get(control_system)
+
+    if compiled is None:
+        compiled = _compiled[control_system] = CompiledSystem(control_system)
+
+    return compiled
+
+
+def simulation(control_system):
+    """
+    Simulación para la inferencia fila a fila con el backend activo.
+    """
+    if backend == 'skfuzzy':
+        return ctrl.ControlSystemSimulation(control_system, cache=False)
+
+    return Simulation(control_system)
+
+
+def set_backend(name: str) -> None:
+    """
+    Elige el backend de simulation(): 'native' o 'skfuzzy' para comparar
+    contra la implementación de referencia. Las evaluaciones por arrays
+    (batch, tablas, superficies) usan siempre el sistema compilado.
+    """
+    global backend
+
+    if name not in BACKENDS:
+        raise ValueError(f"Backend difuso desconocido: {name}")
+
+    backend = name
+
+
+def reference(control_system, inputs: dict) -> np.ndarray:
+    """
+    Igual que compile_system(control_system)(inputs), pero fila a fila con
+    ControlSystemSimulation de skfuzzy; sirve para verificar el sistema compilado.
+    """
+    simulation = ctrl.ControlSystemSimulation(control_system, cache=False)
+    label = next(iter(control_system.consequents)).label
+
+    values = {var: np.asarray(value, dtype=np.float64).ravel() for var, value in inputs.items()}
+    expected = np.full(len(next(iter(values.values()))), np.nan)
+
+    for i in range(len(expected)):
+        for var, value in values.items():
+            simulation.input[var] = value[i]
+        simulation.compute()
+
+        if label in simulation.output:
+            expected[i] = simulation.output[label]
+
+    return expected
+
+
+def _dnf(antecedent, column, negated=False) -> list:
+    # Conjunciones (tuplas de columnas) cuya disyunción equivale al antecedente;
+    # NOT se baja hasta los términos por De Morgan (1 - min = max de 1 -)
+    if isinstance(antecedent, Term):
+        return [(column(antecedent, negated),)]
+
+    if isinstance(antecedent, TermAggregate):
+        if antecedent.kind == 'not':
+            return _dnf(antecedent.term1, column, not negated)
+
+        left = _dnf(antecedent.term1, column, negated)
+        right = _dnf(antecedent.term2, column, negated)
+
+        if (antecedent.kind == 'and') != negated:
+            return [a + b for a in left for b in right]
+
+        return left + right
+
+    raise ValueError(f"Antecedente no soportado: {antecedent}")
+
+
+def _crossings(universe, mf, cut):
+    # Puntos donde cada función de pertenencia corta su nivel de activación;
+    # los tramos sin corte repiten un punto del universo (no alteran el centroide)
+    cut = cut[:, np.newaxis]
+    above = np.where(cut == 0.0, mf > cut, mf >= cut)
+    flips = above[:, 1:] != above[:, :-1]
+
+    x0, x1 = universe[:-1], universe[1:]
+    y0, y1 = mf[:-1], mf[1:]
+    slope = np.where(y1 != y0, y1 - y0, 1.0)
+
+    return np.where(flips, x0 + (cut - y0) * (x1 - x0) / slope, x0)
@@ -1,6 +1,15 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import numpy as np
 import pandas as pd
 
+from system.fuzzy import core, memo, surfaces, tables, timing
+from system.fuzzy.result import FuzzyResult
+from system.fuzzy.componentes import (
+    aditional, chemical, eutrophication, nitrogen, nutrients, oxygen, phosphorus, physical, solids, visibility,
+)
 from system.fuzzy.componentes.nitrogen import NitrogenLevel
 from system.fuzzy.componentes.physical import PhysicalConditions
 from system.fuzzy.componentes.nutrients import NutrientLevel
@@ -12,6 +21,58 @@ from system.fuzzy.componentes.solids import SolidsLevel
 from system.fuzzy.componentes.visibility import VisibilityLevel
 from system.fuzzy.componentes.phosphorus import PhosphorusLevel
 
+_PHASE_1 = (
+    ('nitrogen_level', NitrogenLevel),
+    ('phosphorus_level', PhosphorusLevel),
+    ('oxygen_balance', OxygenBalance),
+    ('solids_level', SolidsLevel),
+    ('visibility_level', VisibilityLevel),
+    ('additional_conditions', AdditionalConditions),
+)
+
+_PHASE_2 = (
+    ('nutrient_level', NutrientLevel, ('nitrogen_level', 'phosphorus_level')),
+)
+
+_PHASE_3 = (
+    ('physical_conditions', PhysicalConditions, ('solids_level', 'visibility_level')),
+    ('chemical_conditions', ChemicalConditions, ('nutrient_level', 'oxygen_balance')),
+)
+
+_PHASE_4 = (
+    ('eutrophication_level', EutrophicationLevel, ('chemical_conditions', 'physical_conditions', 'additional_conditions')),
+)
+
+# Etiquetado de cada etapa de la cadena; FuzzyResult.label guarda posiciones en labels
+_LABELERS = {
+    'nitrogen_level': nitrogen.LABELER,
+    'phosphorus_level': phosphorus.LABELER,
+    'oxygen_balance': oxygen.LABELER,
+    'solids_level': solids.LABELER,
+    'visibility_level': visibility.LABELER,
+    'additional_conditions': aditional.LABELER,
+    'physical_conditions': physical.LABELER,
+    'nutrient_level': nutrients.LABELER,
+    'chemical_conditions': chemical.LABELER,
+    'eutrophication_level': eutrophication.LABELER,
+}
+
+LABEL_CATEGORIES = {name: labeler.labels for name, labeler in _LABELERS.items()}
+
+# Grafo de dependencias de la cadena: etapa -> etapas de las que toma sus entradas
+_UPSTREAM = {
+    **{name: () for name, _ in _PHASE_1},
+    **{name: upstream for name, _, upstream in _PHASE_2 + _PHASE_3 + _PHASE_4},
+}
+
+# Filas mínimas para repartir la evaluación entre procesos; por debajo no compensa arrancarlos
+PARALLEL_THRESHOLD = 2000
+
+# Procesos reutilizados entre llamadas, conservan su caché de sistemas de control
+_pool = None
+_pool_options = None
+
+
 class FuzzyEngine:
     def __init__(self, **kwargs) -> None:
         self.phase = 4
@@ -84,17 +145,151 @@ class FuzzyEngine:
 
         self.errors = {}
 
+        # Tiempos por etapa (timing.Timings); None para no medirlos
+        self.timings = None
+
+        # Etapas pedidas (ver set_outputs); None para calcular toda la cadena
+        self.outputs = None
+
     def set_phase(self, *, phase: int) -> None:
         self.phase = phase
 
+    def set_timings(self, *, timings) -> None:
+        self.timings = timings
+
+    def set_outputs(self, *, outputs) -> None:
+        """
+        Limita run() a las etapas de outputs y a aquellas de las que dependen;
+        el resto queda con sus valores por defecto (value NaN, label UNKNOWN).
+        """
+        self.outputs = outputs
+
+    @classmethod
+    def run_batch(
+        cls,
+        df: pd.DataFrame,
+        phase: int = 4,
+        table_mode: bool = False,
+        columnar: bool = False,
+        timings=None,
+        outputs=None,
+    ):
+        """
+        Equivalente vectorizado de ejecutar FuzzyEngine(**row).run() fila por fila.
+
+        Las filas se agrupan por las vars disponibles de cada componente: el
+        sistema de control se construye una vez por grupo y se evalúa con
+        arrays de NumPy para todas sus filas. Con table_mode, los sistemas de
+        un único antecedente se responden interpolando una tabla precalculada
+        (ver tables.get_table) en lugar de evaluar el sistema. Los agregadores
+        con superficies de respuesta cargadas (ver surfaces.load_surfaces) se
+        responden por interpolación multilineal.
+
+        Con columnar retorna un FuzzyResult en lugar de (results, inputs, errors).
+        Con timings (timing.Timings) acumula en él los tiempos de cada etapa.
+
+        Con outputs solo se calculan esas etapas y las que necesitan (ver
+        resolve_stages), y solo se etiquetan las de outputs; las demás quedan
+        con label UNKNOWN y, si no hacen falta, también con value NaN.
+        """
+        size = len(df)
+        records = df.to_dict('records')
+        columns = {column: df[column].to_numpy() for column in df.columns}
+
+        chain = {
+            name: {
+                'vars': np.full(size, '-', dtype=object),
+                'confidence': np.zeros(size),
+                'value': np.full(size, np.nan),
+                'label': np.full(size, len(LABEL_CATEGORIES[name]) - 1, dtype=np.int8),
+            }
+            for name in cls().chain
+        }
+        inputs = [{} for _ in range(size)]
+        errors = [{} for _ in range(size)]
+
+        needed = resolve_stages(outputs) if outputs is not None else set(chain)
+        labeled = set(outputs) if outputs is not None else needed
+
+        if phase >= 1:
+            groups = _group_rows(df.isna().to_numpy())
+
+            for name, component in _PHASE_1:
+                if name not in needed:
+                    continue
+
+                for rows in groups:
+                    def build(rows=rows, component=component):
+                        return component(**records[rows[0]])
+
+                    def read(model, rows=rows):
+                        return {var: columns[var][rows] for var in model.available_vars}
+
+                    model = _infer_batch(
+                        chain[name], errors, name, rows, build, read, table_mode, timings, name in labeled,
+                    )
+
+                    if model is not None:
+                        for row in rows:
+                            if name not in errors[row]:
+                                inputs[row][name] = {var: records[row][var] for var in model.available_vars}
+
+            confidence_phase_1 = sum(chain[name]['confidence'] for name, _ in _PHASE_1) / 6.0
+
+        if phase >= 2:
+            _infer_stage(chain, errors, _select(_PHASE_2, needed), table_mode, timings, labeled)
+            confidence_phase_2 = chain['nutrient_level']['confidence']
+
+        if phase >= 3:
+            _infer_stage(chain, errors, _select(_PHASE_3, needed), table_mode, timings, labeled)
+            confidence_phase_3 = (
+                chain['physical_conditions']['confidence'] +
+                chain['chemical_conditions']['confidence']
+            ) / 2.0
+
+        if phase >= 4 and 'eutrophication_level' in needed:
+            _infer_stage(chain, errors, _select(_PHASE_4, needed), table_mode, timings, labeled)
+
+            confidence_phase_4 = chain['eutrophication_level']['confidence'].copy()
+            chain['eutrophication_level']['confidence'] = (
+                confidence_phase_1 +
+                confidence_phase_2 +
+                confidence_phase_3 +
+                confidence_phase_4
+            ) / 4.0
+
+        if columnar:
+            return FuzzyResult.from_chain(chain, LABEL_CATEGORIES, inputs, errors)
+
+        for name, fields in chain.items():
+            fields['label'] = LABEL_CATEGORIES[name][fields['label']]
+
+        results = [
+            {
+                name: {field: values[i] for field, values in fields.items()}
+                for name, fields in chain.items()
+            }
+            for i in range(size)
+        ]
+
+        return results, inputs, errors
+
     def run(self) -> None:
+        needed = resolve_stages(self.outputs) if self.outputs is not None else set(self.chain)
+
         if self.phase >= 1:
-            self._infer_nitrogen_level()
-            self._infer_phosphorus_level()
-            self._infer_oxygen_balance()
-            self._infer_solids_level()
-            self._infer_visibility_level()
-            self._infer_additional_conditions()
+            if 'nitrogen_level' in needed:
+                self._infer_nitrogen_level()
+            if 'phosphorus_level' in needed:
+                self._infer_phosphorus_level()
+            if 'oxygen_balance' in needed:
+                self._infer_oxygen_balance()
+            if 'solids_level' in needed:
+                self._infer_solids_level()
+            if 'visibility_level' in needed:
+                self._infer_visibility_level()
+            if 'additional_conditions' in needed:
+                self._infer_additional_conditions()
 
             confidence_phase_1 = (
                 self.chain['nitrogen_level']['confidence'] +
@@ -106,19 +301,23 @@ class FuzzyEngine:
             ) / 6.0
 
         if self.phase >= 2:
+            if 'nutrient_level' in needed:
+                self._infer_nutrient_level()
 
-            self._infer_nutrient_level()
             confidence_phase_2 = self.chain['nutrient_level']['confidence']
 
         if self.phase >= 3:
-            self._inferir_physical_conditions()
-            self._infer_chemical_conditions()
+            if 'physical_conditions' in needed:
+                self._inferir_physical_conditions()
+            if 'chemical_conditions' in needed:
+                self._infer_chemical_conditions()
+
             confidence_phase_3 = (
                 self.chain['physical_conditions']['confidence'] +
                 self.chain['chemical_conditions']['confidence']
             ) / 2.0
 
-        if self.phase >= 4:
+        if self.phase >= 4 and 'eutrophication_level' in needed:
             self._infer_eutrophication_level()
 
             confidence_phase_4 = self.chain['eutrophication_level']['confidence']
@@ -131,12 +330,23 @@ class FuzzyEngine:
 
             self.chain['eutrophication_level']['confidence'] = confidence_final
 
+
+    def _label(self, model, name: str) -> str:
+        # Igual que run_batch(): las etapas intermedias que no están en outputs no se etiquetan
+        if self.outputs is not None and name not in self.outputs:
+            return 'UNKNOWN'
+
+        return model.get_label()
+
     def _infer_nitrogen_level(self) -> None:
         try:
-            model = NitrogenLevel(**self.vars)
-            vars = model.calculate_inference()
-            value = model.nitrogen_level
-            label = model.get_label()
+            with timing.measure(self.timings, 'nitrogen_level', 'build'):
+                model = NitrogenLevel(**self.vars)
+
+            with timing.measure(self.timings, 'nitrogen_level', 'compute'):
+                vars = model.calculate_inference()
+                value = model.nitrogen_level
+                label = self._label(model, 'nitrogen_level')
 
             self.inputs['nitrogen_level'] = model.available_vars
 
@@ -150,10 +360,13 @@ class FuzzyEngine:
 
     def _infer_phosphorus_level(self) -> None:
         try:
-            model = PhosphorusLevel(**self.vars)
-            vars = model.calculate_inference()
-            value = model.phosphorus_level
-            label = model.get_label()
+            with timing.measure(self.timings, 'phosphorus_level', 'build'):
+                model = PhosphorusLevel(**self.vars)
+
+            with timing.measure(self.timings, 'phosphorus_level', 'compute'):
+                vars = model.calculate_inference()
+                value = model.phosphorus_level
+                label = self._label(model, 'phosphorus_level')
 
             self.inputs['phosphorus_level'] = model.available_vars
 
@@ -167,10 +380,13 @@ class FuzzyEngine:
 
     def _infer_oxygen_balance(self) -> None:
         try:
-            model = OxygenBalance(**self.vars)
-            vars = model.calculate_inference()
-            value = model.oxygen_balance
-            label = model.get_label()
+            with timing.measure(self.timings, 'oxygen_balance', 'build'):
+                model = OxygenBalance(**self.vars)
+
+            with timing.measure(self.timings, 'oxygen_balance', 'compute'):
+                vars = model.calculate_inference()
+                value = model.oxygen_balance
+                label = self._label(model, 'oxygen_balance')
 
             self.inputs['oxygen_balance'] = model.available_vars
 
@@ -184,10 +400,13 @@ class FuzzyEngine:
 
     def _infer_solids_level(self) -> None:
         try:
-            model = SolidsLevel(**self.vars)
-            vars = model.calculate_inference()
-            value = model.solids_level
-            label = model.get_label()
+            with timing.measure(self.timings, 'solids_level', 'build'):
+                model = SolidsLevel(**self.vars)
+
+            with timing.measure(self.timings, 'solids_level', 'compute'):
+                vars = model.calculate_inference()
+                value = model.solids_level
+                label = self._label(model, 'solids_level')
 
             self.inputs['solids_level'] = model.available_vars
 
@@ -201,10 +420,13 @@ class FuzzyEngine:
 
     def _infer_visibility_level(self) -> None:
         try:
-            model = VisibilityLevel(**self.vars)
-            vars = model.calculate_inference()
-            value = model.visibility_level
-            label = model.get_label()
+            with timing.measure(self.timings, 'visibility_level', 'build'):
+                model = VisibilityLevel(**self.vars)
+
+            with timing.measure(self.timings, 'visibility_level', 'compute'):
+                vars = model.calculate_inference()
+                value = model.visibility_level
+                label = self._label(model, 'visibility_level')
 
             self.inputs['visibility_level'] = model.available_vars
 
@@ -218,11 +440,13 @@ class FuzzyEngine:
 
     def _infer_additional_conditions(self) -> None:
         try:
-            model = AdditionalConditions(**self.vars)
+            with timing.measure(self.timings, 'additional_conditions', 'build'):
+                model = AdditionalConditions(**self.vars)
 
-            vars, confidence = model.calculate_inference()
-            value = model.additional_conditions
-            label = model.get_label()
+            with timing.measure(self.timings, 'additional_conditions', 'compute'):
+                vars, confidence = model.calculate_inference()
+                value = model.additional_conditions
+                label = self._label(model, 'additional_conditions')
 
             self.inputs['additional_conditions'] = model.available_vars
 
@@ -236,14 +460,16 @@ class FuzzyEngine:
 
     def _inferir_physical_conditions(self) -> None:
         try:
-            model = PhysicalConditions(
-                solids_level=self.chain['solids_level']['value'],
-                visibility_level=self.chain['visibility_level']['value']
-            )
+            with timing.measure(self.timings, 'physical_conditions', 'build'):
+                model = PhysicalConditions(
+                    solids_level=self.chain['solids_level']['value'],
+                    visibility_level=self.chain['visibility_level']['value']
+                )
 
-            vars, confidence = model.calculate_inference()
-            value = model.physical_conditions
-            label = model.get_label()
+            with timing.measure(self.timings, 'physical_conditions', 'compute'):
+                vars, confidence = model.calculate_inference()
+                value = model.physical_conditions
+                label = self._label(model, 'physical_conditions')
 
             self.chain['physical_conditions']['vars'] = vars
             self.chain['physical_conditions']['confidence'] = confidence
@@ -255,14 +481,16 @@ class FuzzyEngine:
 
     def _infer_nutrient_level(self) -> None:
         try:
-            model = NutrientLevel(
-                nitrogen_level=self.chain['nitrogen_level']['value'],
-                phosphorus_level=self.chain['phosphorus_level']['value'],
-            )
+            with timing.measure(self.timings, 'nutrient_level', 'build'):
+                model = NutrientLevel(
+                    nitrogen_level=self.chain['nitrogen_level']['value'],
+                    phosphorus_level=self.chain['phosphorus_level']['value'],
+                )
 
-            vars, confidence = model.calculate_inference()
-            value = model.nutrient_level
-            label = model.get_label()
+            with timing.measure(self.timings, 'nutrient_level', 'compute'):
+                vars, confidence = model.calculate_inference()
+                value = model.nutrient_level
+                label = self._label(model, 'nutrient_level')
 
             self.chain['nutrient_level']['vars'] = vars
             self.chain['nutrient_level']['confidence'] = confidence
@@ -274,14 +502,16 @@ class FuzzyEngine:
 
     def _infer_chemical_conditions(self) -> None:
         try:
-            model = ChemicalConditions(
-                nutrient_level=self.chain['nutrient_level']['value'],
-                oxygen_balance=self.chain['oxygen_balance']['value'],
-            )
+            with timing.measure(self.timings, 'chemical_conditions', 'build'):
+                model = ChemicalConditions(
+                    nutrient_level=self.chain['nutrient_level']['value'],
+                    oxygen_balance=self.chain['oxygen_balance']['value'],
+                )
 
-            vars, confidence = model.calculate_inference()
-            value = model.chemical_conditions
-            label = model.get_label()
+            with timing.measure(self.timings, 'chemical_conditions', 'compute'):
+                vars, confidence = model.calculate_inference()
+                value = model.chemical_conditions
+                label = self._label(model, 'chemical_conditions')
 
             self.chain['chemical_conditions']['vars'] = vars
             self.chain['chemical_conditions']['confidence'] = confidence
@@ -293,15 +523,17 @@ class FuzzyEngine:
 
     def _infer_eutrophication_level(self) -> None:
         try:
-            model = EutrophicationLevel(
-                chemical_conditions=self.chain['chemical_conditions']['value'],
-                physical_conditions=self.chain['physical_conditions']['value'],
-                additional_conditions=self.chain['additional_conditions']['value']
-            )
-
-            vars, confidence = model.calculate_inference()
-            value = model.eutrophication_level
-            label = model.get_label()
+            with timing.measure(self.timings, 'eutrophication_level', 'build'):
+                model = EutrophicationLevel(
+                    chemical_conditions=self.chain['chemical_conditions']['value'],
+                    physical_conditions=self.chain['physical_conditions']['value'],
+                    additional_conditions=self.chain['additional_conditions']['value']
+                )
+
+            with timing.measure(self.timings, 'eutrophication_level', 'compute'):
+                vars, confidence = model.calculate_inference()
+                value = model.eutrophication_level
+                label = self._label(model, 'eutrophication_level')
 
             self.chain['eutrophication_level']['vars'] = vars
             self.chain['eutrophication_level']['confidence'] = confidence
@@ -312,17 +544,259 @@ class FuzzyEngine:
             self.errors['eutrophication_level'] = str(e)
 
 
-def execute_engine(df: pd.DataFrame) -> tuple[list, list, list]:
+def _group_rows(mask: np.ndarray) -> list[np.ndarray]:
+    if len(mask) == 0:
+        return []
+
+    _, codes = np.unique(mask, axis=0, return_inverse=True)
+    codes = codes.ravel()
+
+    return [np.flatnonzero(codes == code) for code in np.unique(codes)]
+
+
+def _infer_batch(
+    stage: dict,
+    errors: list,
+    name: str,
+    rows: np.ndarray,
+    build,
+    read,
+    table_mode: bool = False,
+    timings=None,
+    labeled: bool = True,
+):
+    try:
+        with timing.measure(timings, name, 'build'):
+            model = build()
+
+        with timing.measure(timings, name, 'compute', len(rows)):
+            crisp_inputs = model.get_crisp_inputs(read(model))
+            surface = surfaces.get_surface(model)
+            table = tables.get_table(model) if table_mode and surface is None else None
+
+            if surface is not None and set(crisp_inputs) == set(surface.labels):
+                values = surface(crisp_inputs)
+            elif table is not None and set(crisp_inputs) == {table.label}:
+                values = table(crisp_inputs[table.label])
+            else:
+                values = memo.compute_batch(model, crisp_inputs)
+
+        consequent = next(iter(model.control_system.consequents))
+
+        if hasattr(model, 'get_used_vars'):
+            vars, confidence = model.get_used_vars()
+        else:
+            vars, confidence = model.calculation_method, 1.0
+
+    except Exception as e:
+        for row in rows:
+            errors[row][name] = str(e)
+        return None
+
+    computed = ~np.isnan(values)
+
+    for row in rows[~computed]:
+        errors[row][name] = f"Error al calcular la inferencia: '{consequent.label}'"
+
+    rows = rows[computed]
+    stage['vars'][rows] = vars
+    stage['confidence'][rows] = confidence
+    stage['value'][rows] = values[computed]
+
+    if labeled:
+        stage['label'][rows] = _LABELERS[name].encode(values[computed])
+
+    return model
+
+
+def _select(components: tuple, needed: set) -> tuple:
+    return tuple(component for component in components if component[0] in needed)
+
+
+def resolve_stages(outputs) -> set[str]:
+    """
+    Etapas necesarias para calcular outputs: ellas mismas y todas las etapas
+    de las que dependen, según el grafo de la cadena.
+
+    Parámetros:
+        outputs (iterable): Nombres de etapas, p. ej. 'eutrophication_level'.
+
+    Retorna:
+        set[str]: Etapas a calcular.
+    """
+    needed = set()
+    pending = list(outputs)
+
+    while pending:
+        name = pending.pop()
+
+        if name not in _UPSTREAM:
+            raise ValueError(f"Etapa desconocida: {name}")
+
+        if name not in needed:
+            needed.add(name)
+            pending.extend(_UPSTREAM[name])
+
+    return needed
+
+
+def _infer_stage(
+    chain: dict,
+    errors: list,
+    components: tuple,
+    table_mode: bool = False,
+    timings=None,
+    labeled=None,
+) -> None:
+    for name, component, upstream in components:
+        values = {var: chain[var]['value'] for var in upstream}
+        available = ~np.isnan(np.column_stack(list(values.values())))
+
+        for rows in _group_rows(available):
+            def build(rows=rows, component=component):
+                return component(**{var: value[rows[0]] for var, value in values.items()})
+
+            def read(model, rows=rows):
+                return {var: value[rows] for var, value in values.items()}
+
+            _infer_batch(
+                chain[name], errors, name, rows, build, read, table_mode, timings,
+                labeled is None or name in labeled,
+            )
+
+
+def execute_engine(
+    df: pd.DataFrame,
+    batch_mode: bool = False,
+    table_mode: bool = False,
+    workers: int = 1,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+    columnar: bool = False,
+    timings=None,
+    outputs=None,
+):
+    """
+    Ejecuta el motor difuso sobre todas las filas de df.
+
+    Parámetros:
+        df (pd.DataFrame): Una fila por muestra, una columna por variable.
+        batch_mode (bool): Evalúa las filas de forma vectorizada (ver FuzzyEngine.run_batch).
+        table_mode (bool): Usa tablas precalculadas en los sistemas de un solo antecedente.
+        workers (int): Procesos entre los que se reparten las filas.
+        parallel_threshold (int): Filas mínimas para usar más de un proceso.
+        columnar (bool): Retorna un FuzzyResult en lugar de listas por fila.
+        timings (timing.Timings): Acumula los tiempos de construcción y
+            evaluación de cada etapa, incluidos los de otros procesos.
+        outputs (list[str]): Etapas a calcular y etiquetar; las demás solo se
+            calculan si alguna de estas las necesita. None para toda la cadena.
+
+    Retorna:
+        tuple | FuzzyResult: (results, inputs, errors), una entrada por fila en
+        el orden de df, o el mismo resultado en columnas.
+    """
+    if workers > 1 and len(df) >= parallel_threshold:
+        return _execute_parallel(
+            df, workers, columnar, timings, batch_mode=batch_mode, table_mode=table_mode, outputs=outputs,
+        )
+
+    if batch_mode or table_mode:
+        return FuzzyEngine.run_batch(df, table_mode=table_mode, columnar=columnar, timings=timings, outputs=outputs)
+
     results = []
     inputs = []
     errors = []
 
     for _, row in df.iterrows():
         motor = FuzzyEngine(**row.to_dict())
+        motor.set_timings(timings=timings)
+        motor.set_outputs(outputs=outputs)
         motor.run()
 
         results.append(motor.chain)
         inputs.append(motor.inputs)
         errors.append(motor.errors)
 
-    return results, inputs, errors
\ No newline at end of file
+    if columnar:
+        return FuzzyResult.from_records(results, inputs, errors, LABEL_CATEGORIES)
+
+    return results, inputs, errors
+
+
+def _execute_parallel(df: pd.DataFrame, workers: int, columnar: bool, timings=None, **kwargs):
+    shards = [df.iloc[rows] for rows in np.array_split(np.arange(len(df)), workers)]
+
+    # map() devuelve los bloques en el orden de envío, así que se conserva el orden de las filas
+    parts = _get_pool(workers).map(
+        partial(_execute_shard, timed=timings is not None, columnar=columnar, **kwargs),
+        shards,
+    )
+
+    parts, shard_timings = zip(*parts)
+
+    for shard in shard_timings:
+        if shard is not None:
+            timings.merge(shard)
+
+    if columnar:
+        return FuzzyResult.concat(list(parts))
+
+    results = []
+    inputs = []
+    errors = []
+
+    for shard_results, shard_inputs, shard_errors in parts:
+        results.extend(shard_results)
+        inputs.extend(shard_inputs)
+        errors.extend(shard_errors)
+
+    return results, inputs, errors
+
+
+def _execute_shard(df: pd.DataFrame, timed: bool, **kwargs):
+    timings = timing.Timings() if timed else None
+
+    return execute_engine(df, timings=timings, **kwargs), timings
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_options
+
+    options = (workers, surfaces.directory, memo.outputs.maxsize if memo.is_enabled() else 0, core.backend, tables.directory)
+
+    if _pool is None or _pool_options != options:
+        if _pool is not None:
+            _pool.shutdown()
+
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=options[1:],
+        )
+        _pool_options = options
+
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """
+    Cierra el pool de execute_engine(workers=...). El pool vive mientras el
+    proceso para reutilizarse entre llamadas; un proceso que quiera terminar
+    antes debe cerrarlo. La siguiente llamada en paralelo crea uno nuevo.
+    """
+    global _pool, _pool_options
+
+    if _pool is not None:
+        _pool.shutdown()
+
+    _pool = None
+    _pool_options = None
+
+
+def _init_worker(surfaces_directory, memo_size, backend, tables_directory) -> None:
+    core.set_backend(backend)
+    tables.set_directory(tables_directory)
+    if surfaces_directory:
+        surfaces.load_surfaces(surfaces_directory)
+    if memo_size:
+        memo.enable(memo_size)
@@ -0,0 +1,140 @@
+import hashlib
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+from system.fuzzy import batch, core, engine, memo, spec, surfaces, tables
+from system.fuzzy.result import FuzzyResult
+from system.fuzzy.componentes import (
+    aditional, chemical, eutrophication, nitrogen, nutrients, oxygen, phosphorus, physical, solids, visibility,
+)
+
+# Código (módulos y FuzzyResult, que fija el formato del estado) que determina la salida del motor;
+# si cambia, el estado guardado deja de valer
+_SOURCES = (
+    engine, batch, core, spec, memo, tables, surfaces, FuzzyResult,
+    aditional, chemical, eutrophication, nitrogen, nutrients, oxygen, phosphorus, physical, solids, visibility,
+)
+
+_HASH = 'row_hash'
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash de contenido (uint64) de cada fila de df, independiente del índice.
+    """
+    return pd.util.hash_pandas_object(df[sorted(df.columns)], index=False).to_numpy()
+
+
+def fingerprint(df: pd.DataFrame, **kwargs) -> str:
+    """
+    Huella de todo lo que, además de los valores de cada fila, decide la
+    salida: código del motor y componentes, columnas de df, argumentos de
+    execute_engine que cambian los resultados y superficies o memoización
+    activas.
+    """
+    digest = hashlib.sha1()
+
+    for module in _SOURCES:
+        digest.update(inspect.getsource(module).encode())
+
+    digest.update(repr(sorted(df.columns)).encode())
+    digest.update(repr(bool(kwargs.get('table_mode'))).encode())
+    digest.update(repr(sorted(kwargs['outputs']) if kwargs.get('outputs') is not None else None).encode())
+    digest.update(repr(sorted(surfaces.surfaces)).encode())
+    digest.update(repr(memo.is_enabled()).encode())
+    digest.update(core.backend.encode())
+
+    return digest.hexdigest()
+
+
+def execute_engine(df: pd.DataFrame, state_file: str, **kwargs) -> FuzzyResult:
+    """
+    Igual que engine.execute_engine(df, columnar=True, **kwargs), pero solo
+    evalúa las filas cuyo contenido no está en state_file.
+
+    state_file guarda la cadena, inputs y errors de cada fila evaluada junto
+    con su hash (ver row_hashes) y se reescribe con las filas de df al
+    terminar, así que las filas reutilizadas salen igual que en una ejecución
+    completa. Si la huella del motor cambió, se evalúa todo.
+
+    Parámetros:
+        df (pd.DataFrame): Una fila por muestra, una columna por variable.
+        state_file (str): Archivo parquet del estado, p. ej. junto a fuzzy.parquet.
+        **kwargs: Argumentos de engine.execute_engine.
+
+    Retorna:
+        FuzzyResult: Una fila por fila de df, en el mismo orden.
+    """
+    kwargs.pop('columnar', None)
+
+    hashes = row_hashes(df)
+    current = fingerprint(df, **kwargs)
+    previous, previous_hashes = _load_state(state_file, current)
+
+    # Posición de cada fila en el estado anterior, -1 si hay que evaluarla
+    if previous is not None:
+        _, first = np.unique(previous_hashes, return_index=True)
+        cached = pd.Index(previous_hashes[first]).get_indexer(hashes)
+        cached[cached >= 0] = first[cached[cached >= 0]]
+    else:
+        cached = np.full(len(df), -1)
+
+    changed = np.flatnonzero(cached < 0)
+    reused = np.flatnonzero(cached >= 0)
+
+    logger.info(f"Fuzzy incremental: {len(reused)} rows reused, {len(changed)} rows evaluated")
+
+    parts = []
+
+    if len(reused):
+        parts.append(previous.take(cached[reused]))
+    if len(changed):
+        parts.append(engine.execute_engine(df.iloc[changed], columnar=True, **kwargs))
+
+    if not parts:
+        return engine.execute_engine(df, columnar=True, **kwargs)
+
+    # Las partes van en orden [reutilizadas, evaluadas]; se devuelven al orden de df
+    order = np.empty(len(df), dtype=np.intp)
+    order[np.concatenate([reused, changed])] = np.arange(len(df))
+
+    result = FuzzyResult.concat(parts).take(order)
+
+    _save_state(state_file, result, hashes, current)
+
+    return result
+
+
+def _load_state(state_file: str, current: str):
+    if not os.path.exists(state_file):
+        return None, None
+
+    try:
+        table = pq.read_table(state_file)
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Fuzzy state unreadable, evaluating all rows: {e}")
+        return None, None
+
+    metadata = table.schema.metadata or {}
+
+    if metadata.get(b'fingerprint', b'').decode() != current:
+        logger.info("Fuzzy engine or options changed since last run, evaluating all rows")
+        return None, None
+
+    hashes = table.column(_HASH).to_numpy()
+    previous = FuzzyResult.from_state_table(table.drop([_HASH]), engine.LABEL_CATEGORIES)
+
+    return previous, hashes
+
+
+def _save_state(state_file: str, result: FuzzyResult, hashes: np.ndarray, current: str) -> None:
+    table = result.state_table().append_column(_HASH, pa.array(hashes, type=pa.uint64()))
+    table = table.replace_schema_metadata({'fingerprint': current})
+
+    pq.write_table(table, state_file)
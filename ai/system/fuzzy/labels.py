@@ -0,0 +1,46 @@
+import numpy as np
+
+# Etiqueta de los valores sin inferencia (misma que usa FuzzyEngine)
+UNKNOWN = 'UNKNOWN'
+
+
+class Labeler:
+    """
+    Etiquetado vectorizado de una variable de salida: para cada valor, el
+    término con mayor grado de pertenencia (el primero en caso de empate,
+    igual que get_label()).
+
+    Solo necesita el universo y las funciones de pertenencia, así que no
+    construye ningún sistema de control.
+    """
+
+    def __init__(self, universe, terms: dict) -> None:
+        self.universe = np.asarray(universe, dtype=np.float64)
+        self.labels = np.array([*terms, UNKNOWN], dtype=object)
+        self.mfs = np.stack([np.asarray(mf, dtype=np.float64) for mf in terms.values()])
+
+    def __call__(self, values) -> np.ndarray:
+        """
+        Parámetros:
+            values (array-like): Valores defuzzificados.
+
+        Retorna:
+            np.ndarray: Etiqueta por valor (dtype object), UNKNOWN para los NaN.
+        """
+        return self.labels[self.encode(values)]
+
+    def encode(self, values) -> np.ndarray:
+        """
+        Igual que __call__ pero retorna la posición de cada etiqueta en labels (int8).
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        degrees = np.stack([
+            np.interp(values, self.universe, mf, left=0.0, right=0.0)
+            for mf in self.mfs
+        ])
+
+        codes = np.argmax(degrees, axis=0).astype(np.int8)
+        codes[np.isnan(values)] = len(self.labels) - 1
+
+        return codes
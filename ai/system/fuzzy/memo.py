@@ -0,0 +1,134 @@
+import numpy as np
+
+from system.fuzzy import batch, registry
+from system.tools.cache import LRUCache
+
+# Salida defuzzificada por (huella del sistema, entradas cuantizadas); NaN si el sistema no tiene salida.
+# Vacía y sin uso hasta que se llama a enable()
+outputs = LRUCache(maxsize=0)
+
+_enabled = False
+
+# Subdivisiones del paso del universo de cada antecedente al cuantizar las entradas
+RESOLUTION = 1000
+
+
+def enable(maxsize: int) -> None:
+    """
+    Activa la memoización de las salidas de los componentes difusos.
+
+    Las entradas se redondean a 1/RESOLUTION del paso del universo de cada
+    antecedente y el sistema se evalúa en ese punto, así que con la
+    memoización activa las salidas pasan a ser las de la entrada cuantizada.
+
+    Parámetros:
+        maxsize (int): Salidas guardadas como máximo; se descartan las menos usadas.
+    """
+    global _enabled
+
+    outputs.resize(maxsize)
+    _enabled = maxsize > 0
+
+
+def disable() -> None:
+    global _enabled
+
+    outputs.clear()
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def compute(component, crisp_inputs: dict) -> float:
+    """
+    Equivalente a component.simulation.compute() seguido de leer su salida.
+
+    Con la memoización activa, las entradas repetidas (tras cuantizar) no
+    vuelven a evaluar el sistema. Un sistema sin salida lanza el mismo
+    KeyError que skfuzzy, también en los aciertos.
+    """
+    simulation = component.simulation
+    label = next(iter(component.control_system.consequents)).label
+
+    if not _enabled:
+        simulation.compute()
+        return simulation.output[label]
+
+    steps = _quantize(component.control_system, {var: np.atleast_1d(value) for var, value in crisp_inputs.items()})
+    key = (registry.get_signature(component), tuple(int(step[0]) for step in steps.values()))
+
+    def evaluate():
+        for var, value in _dequantize(component.control_system, steps).items():
+            simulation.input[var] = value[0]
+
+        try:
+            simulation.compute()
+        except KeyError:
+            return np.nan
+
+        return simulation.output[label]
+
+    value = outputs.get_or_create(key, evaluate)
+
+    if np.isnan(value):
+        raise KeyError(label)
+
+    return value
+
+
+def compute_batch(component, crisp_inputs: dict) -> np.ndarray:
+    """
+    Equivalente memoizado de batch.compute(component.control_system, crisp_inputs):
+    solo se evalúan las entradas cuantizadas distintas que no están en la caché.
+    """
+    control_system = component.control_system
+
+    # Entradas ajenas al sistema: batch.compute lanza el mismo error que skfuzzy
+    if not _enabled or not set(crisp_inputs) <= set(_universes(control_system)):
+        return batch.compute(control_system, crisp_inputs)
+    steps = _quantize(control_system, crisp_inputs)
+    unique, inverse = np.unique(np.column_stack(list(steps.values())), axis=0, return_inverse=True)
+
+    signature = registry.get_signature(component)
+    keys = [(signature, tuple(int(step) for step in row)) for row in unique]
+
+    values = np.array([outputs.get(key, np.inf) for key in keys])
+    missing = np.flatnonzero(np.isinf(values))
+
+    if len(missing):
+        points = {var: unique[missing, column] for column, var in enumerate(steps)}
+        values[missing] = batch.compute(control_system, _dequantize(control_system, points))
+
+        for index in missing:
+            outputs.put(keys[index], values[index])
+
+    return values[inverse.ravel()]
+
+
+def _universes(control_system) -> dict:
+    return {antecedent.label: antecedent.universe for antecedent in control_system.antecedents}
+
+
+def _quantize(control_system, crisp_inputs: dict) -> dict:
+    universes = _universes(control_system)
+    steps = {}
+
+    # Orden fijo por etiqueta, para que la clave no dependa del orden de las entradas
+    for var in sorted(crisp_inputs):
+        universe = universes[var]
+        value = np.asarray(crisp_inputs[var], dtype=np.float64)
+        steps[var] = np.rint((value - universe[0]) / _quantum(universe)).astype(np.int64)
+
+    return steps
+
+
+def _dequantize(control_system, steps: dict) -> dict:
+    universes = _universes(control_system)
+
+    return {var: universes[var][0] + step * _quantum(universes[var]) for var, step in steps.items()}
+
+
+def _quantum(universe) -> float:
+    return (universe[1] - universe[0]) / RESOLUTION
@@ -0,0 +1,92 @@
+import hashlib
+
+import numpy as np
+
+from system.fuzzy import core
+from system.tools.cache import LRUCache
+
+# Sistemas de control compilados, compartidos por todas las filas y trabajos del proceso
+systems = LRUCache(maxsize=256)
+
+# Huella de la estructura de cada sistema del registro
+signatures = LRUCache(maxsize=256)
+
+
+def load_fuzzy_system(component, create_fuzzy_system, available_vars, custom_vars=None) -> None:
+    """
+    Construye el sistema difuso de un componente una sola vez por firma.
+
+    La estructura (antecedentes, consecuente, reglas y ctrl.ControlSystem)
+    solo depende del componente, de las vars disponibles y de las vars
+    personalizadas. En un fallo se ejecuta create_fuzzy_system() y se guardan
+    los atributos que crea; en un acierto se copian al componente. Cada
+    componente recibe su propia simulación (ver core.simulation) para no
+    acumular estado en los términos compartidos.
+    """
+    key = (
+        type(component).__name__,
+        tuple(sorted(available_vars)),
+        fingerprint(custom_vars or {}),
+    )
+
+    def build():
+        before = dict(vars(component))
+        create_fuzzy_system()
+
+        return {
+            name: value for name, value in vars(component).items()
+            if name not in before or before[name] is not value
+        }
+
+    component.__dict__.update(systems.get_or_create(key, build))
+    component.system_key = key
+    component.simulation = core.simulation(component.control_system)
+
+
+def get_signature(component) -> str:
+    """
+    Huella de la estructura del sistema de control de un componente.
+
+    Componentes con distintas vars disponibles comparten a menudo el mismo
+    sistema (mismo método de cálculo), así que los artefactos derivados del
+    sistema (tablas, superficies) se indexan por esta huella.
+    """
+    return signatures.get_or_create(component.system_key, lambda: _signature(component.control_system))
+
+
+def _signature(control_system) -> str:
+    digest = hashlib.sha1()
+
+    for variable in (*control_system.antecedents, *control_system.consequents):
+        digest.update(variable.label.encode())
+        digest.update(variable.universe.tobytes())
+
+        for term_label, term in variable.terms.items():
+            digest.update(term_label.encode())
+            digest.update(term.mf.tobytes())
+
+    for rule in control_system.rules:
+        digest.update(str(rule).encode())
+
+    return digest.hexdigest()
+
+
+def fingerprint(custom_vars: dict) -> str:
+    if not custom_vars:
+        return ''
+
+    digest = hashlib.sha1()
+
+    def feed(value):
+        if isinstance(value, dict):
+            for name in sorted(value):
+                digest.update(repr(name).encode())
+                feed(value[name])
+        elif isinstance(value, np.ndarray):
+            digest.update(value.tobytes())
+        else:
+            digest.update(repr(value).encode())
+
+    feed(custom_vars)
+
+    return digest.hexdigest()
@@ -0,0 +1,217 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from system.fuzzy import categories
+
+
+class FuzzyResult:
+    """
+    Resultado del motor difuso en columnas (struct-of-arrays).
+
+    Por cada etapa de la cadena guarda value y confidence como float64, label
+    como códigos int8 sobre label_categories[etapa] y vars como códigos int16
+    sobre vars_categories[etapa]. inputs y errors siguen siendo una lista de
+    dicts por fila, igual que en execute_engine().
+    """
+
+    def __init__(self, value, confidence, label, label_categories, vars, vars_categories, inputs, errors) -> None:
+        self.value = value
+        self.confidence = confidence
+        self.label = label
+        self.label_categories = label_categories
+        self.vars = vars
+        self.vars_categories = vars_categories
+        self.inputs = inputs
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.inputs)
+
+    @property
+    def stages(self) -> list[str]:
+        return list(self.value)
+
+    @classmethod
+    def from_chain(cls, chain: dict, label_categories: dict, inputs: list, errors: list):
+        """
+        Construye el resultado a partir de la cadena en arrays de run_batch(),
+        donde label ya está codificado sobre label_categories.
+        """
+        vars = {}
+        vars_categories = {}
+
+        for name, fields in chain.items():
+            categories, codes = np.unique(fields['vars'].astype(str), return_inverse=True)
+            vars[name] = codes.astype(np.int16)
+            vars_categories[name] = categories.astype(object)
+
+        return cls(
+            value={name: fields['value'].astype(np.float64) for name, fields in chain.items()},
+            confidence={name: fields['confidence'].astype(np.float64) for name, fields in chain.items()},
+            label={name: fields['label'] for name, fields in chain.items()},
+            label_categories=label_categories,
+            vars=vars,
+            vars_categories=vars_categories,
+            inputs=inputs,
+            errors=errors,
+        )
+
+    @classmethod
+    def from_records(cls, results: list, inputs: list, errors: list, label_categories: dict):
+        """
+        Construye el resultado a partir de la salida fila a fila de execute_engine().
+        """
+        chain = {}
+
+        for name, categories in label_categories.items():
+            codes = {label: code for code, label in enumerate(categories)}
+
+            chain[name] = {
+                'value': np.array([row[name]['value'] for row in results], dtype=np.float64),
+                'confidence': np.array([row[name]['confidence'] for row in results], dtype=np.float64),
+                'label': np.array([codes[row[name]['label']] for row in results], dtype=np.int8),
+                'vars': np.array([row[name]['vars'] for row in results], dtype=object),
+            }
+
+        return cls.from_chain(chain, label_categories, inputs, errors)
+
+    @classmethod
+    def concat(cls, parts: list):
+        first = parts[0]
+
+        vars = {}
+        vars_categories = {}
+
+        for name in first.stages:
+            # Cada bloque tiene sus propias categorías de vars: se unifican
+            names = np.concatenate([part.vars_categories[name][part.vars[name]] for part in parts]).astype(str)
+            categories, codes = np.unique(names, return_inverse=True)
+            vars[name] = codes.astype(np.int16)
+            vars_categories[name] = categories.astype(object)
+
+        return cls(
+            value={name: np.concatenate([part.value[name] for part in parts]) for name in first.stages},
+            confidence={name: np.concatenate([part.confidence[name] for part in parts]) for name in first.stages},
+            label={name: np.concatenate([part.label[name] for part in parts]) for name in first.stages},
+            label_categories=first.label_categories,
+            vars=vars,
+            vars_categories=vars_categories,
+            inputs=[row for part in parts for row in part.inputs],
+            errors=[row for part in parts for row in part.errors],
+        )
+
+    def take(self, rows):
+        """
+        Resultado con las filas de rows, en ese orden.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+
+        return type(self)(
+            value={name: values[rows] for name, values in self.value.items()},
+            confidence={name: values[rows] for name, values in self.confidence.items()},
+            label={name: codes[rows] for name, codes in self.label.items()},
+            label_categories=self.label_categories,
+            vars={name: codes[rows] for name, codes in self.vars.items()},
+            vars_categories=self.vars_categories,
+            inputs=[self.inputs[row] for row in rows],
+            errors=[self.errors[row] for row in rows],
+        )
+
+    def state_table(self) -> pa.Table:
+        """
+        Cadena completa, una columna '<etapa>.<campo>' por campo, más inputs y
+        errors de cada fila como JSON; from_state_table() reconstruye el resultado.
+        """
+        columns = {}
+
+        for name in self.stages:
+            columns[f'{name}.value'] = self.value[name]
+            columns[f'{name}.confidence'] = self.confidence[name]
+            columns[f'{name}.label'] = self.label[name]
+            columns[f'{name}.vars'] = pa.DictionaryArray.from_arrays(
+                self.vars[name], pa.array(self.vars_categories[name], type=pa.string()),
+            )
+
+        columns['inputs'] = pa.array([json.dumps(row, default=float) for row in self.inputs], type=pa.string())
+        columns['errors'] = pa.array([json.dumps(row) for row in self.errors], type=pa.string())
+
+        return pa.table(columns)
+
+    @classmethod
+    def from_state_table(cls, table: pa.Table, label_categories: dict):
+        """
+        Inverso de state_table().
+        """
+        chain = {
+            name: {
+                'value': table.column(f'{name}.value').to_numpy(),
+                'confidence': table.column(f'{name}.confidence').to_numpy(),
+                'label': table.column(f'{name}.label').to_numpy(),
+                'vars': np.array(table.column(f'{name}.vars').to_pylist(), dtype=object),
+            }
+            for name in label_categories
+        }
+
+        inputs = [json.loads(row) for row in table.column('inputs').to_pylist()]
+        errors = [json.loads(row) for row in table.column('errors').to_pylist()]
+
+        return cls.from_chain(chain, label_categories, inputs, errors)
+
+    def get_labels(self, name: str) -> np.ndarray:
+        return self.label_categories[name][self.label[name]]
+
+    def get_vars(self, name: str) -> np.ndarray:
+        return self.vars_categories[name][self.vars[name]]
+
+    def to_records(self) -> list[dict]:
+        """
+        Cadena fila a fila con el formato de FuzzyEngine.chain.
+        """
+        columns = {
+            name: {
+                'vars': self.get_vars(name),
+                'confidence': self.confidence[name],
+                'value': self.value[name],
+                'label': self.get_labels(name),
+            }
+            for name in self.stages
+        }
+
+        return [
+            {
+                name: {field: values[i] for field, values in fields.items()}
+                for name, fields in columns.items()
+            }
+            for i in range(len(self))
+        ]
+
+    def non_null_stages(self, names: list[str]) -> list[str]:
+        """
+        Etapas de names con al menos un valor inferido, en el mismo orden.
+        """
+        return [name for name in names if not np.isnan(self.value[name]).all()]
+
+    def values_table(self, names: list[str]) -> pa.Table:
+        return pa.table({name: self.value[name] for name in names})
+
+    def labels_table(self, names: list[str]) -> pa.Table:
+        # Columnas diccionario sobre la tabla de códigos común (ver categories.CATEGORIES)
+        return pa.table({
+            name: categories.dictionary_array(categories.recode(self.label[name], self.label_categories[name]))
+            for name in names
+        })
+
+    def write_parquet(self, names: list[str], values_file: str, labels_file: str) -> None:
+        pq.write_table(self.values_table(names), values_file)
+        pq.write_table(self.labels_table(names), labels_file)
+
+    def values_frame(self, names: list[str]) -> pd.DataFrame:
+        return self.values_table(names).to_pandas()
+
+    def labels_frame(self, names: list[str]) -> pd.DataFrame:
+        return self.labels_table(names).to_pandas()
+
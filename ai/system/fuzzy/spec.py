@@ -0,0 +1,221 @@
+import re
+import types
+
+import numpy as np
+import skfuzzy as fuzz
+from skfuzzy import control as ctrl
+
+from system.fuzzy import registry
+from system.tools.cache import LRUCache
+
+# Funciones de pertenencia admitidas en mf_definitions
+MEMBERSHIP_FUNCTIONS = {
+    'trapmf': fuzz.trapmf,
+    'trimf': fuzz.trimf,
+}
+
+# Variables con las personalizadas de un trabajo ya compiladas, por (variables base, huella)
+overrides = LRUCache(maxsize=64)
+
+_TOKEN = re.compile(r'\s*(?:(\w+)\[([^\]]+)\]|([&|~()]))')
+
+
+class Variable:
+    """
+    Variable difusa compilada: universo y función de pertenencia de cada
+    término, de solo lectura y compartidas por todos los sistemas que la usan.
+    """
+
+    __slots__ = ('label', 'universe', 'terms')
+
+    def __init__(self, label: str, universe, terms: dict) -> None:
+        universe = np.array(universe)
+        universe.setflags(write=False)
+
+        mfs = {}
+        for term_label, mf in terms.items():
+            mf = np.array(mf)
+            mf.setflags(write=False)
+            mfs[term_label] = mf
+
+        object.__setattr__(self, 'label', label)
+        object.__setattr__(self, 'universe', universe)
+        object.__setattr__(self, 'terms', types.MappingProxyType(mfs))
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    @classmethod
+    def parse(cls, label: str, definition: dict):
+        """
+        Compila una definición dict(universe=..., mf_definitions={término: {'type', 'params'}}).
+        """
+        universe = np.asarray(definition['universe'])
+        terms = {}
+
+        for term_label, params in definition['mf_definitions'].items():
+            if params['type'] not in MEMBERSHIP_FUNCTIONS:
+                raise ValueError(f"Función de pertenencia desconocida: {params['type']}")
+
+            terms[term_label] = MEMBERSHIP_FUNCTIONS[params['type']](universe, params['params'])
+
+        return cls(label, universe, terms)
+
+    def antecedent(self) -> ctrl.Antecedent:
+        return self._fill(ctrl.Antecedent(self.universe, self.label))
+
+    def consequent(self) -> ctrl.Consequent:
+        return self._fill(ctrl.Consequent(self.universe, self.label))
+
+    def _fill(self, variable):
+        for term_label, mf in self.terms.items():
+            variable[term_label] = mf
+
+        return variable
+
+
+class Rule:
+    """
+    Regla difusa compilada. antecedent es un árbol de tuplas: ('term', var,
+    término), ('not', a), ('and', a, b) u ('or', a, b).
+    """
+
+    __slots__ = ('antecedent', 'consequent')
+
+    def __init__(self, antecedent: tuple, consequent: str) -> None:
+        object.__setattr__(self, 'antecedent', antecedent)
+        object.__setattr__(self, 'consequent', consequent)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    @classmethod
+    def parse(cls, antecedent: str, consequent: str):
+        """
+        Compila una regla escrita como en skfuzzy, p. ej.
+        "TEMP[LOW] & (pH[ACID] | pH[ALKALINE])", con la misma precedencia que
+        los operadores de Python (~ antes que &, & antes que |).
+        """
+        tokens = _tokenize(antecedent)
+        tree, position = _parse_or(tokens, 0, antecedent)
+
+        if position != len(tokens):
+            raise ValueError(f"Regla no válida: {antecedent}")
+
+        return cls(tree, consequent)
+
+    def build(self, antecedents: dict, consequent: ctrl.Consequent) -> ctrl.Rule:
+        return ctrl.Rule(_build(self.antecedent, antecedents), consequent[self.consequent])
+
+
+def variables(definitions: dict) -> types.MappingProxyType:
+    """
+    Compila un dict nombre -> definición (ver Variable.parse) en un mapeo de solo lectura.
+    """
+    return types.MappingProxyType({
+        name: Variable.parse(name, definition) for name, definition in definitions.items()
+    })
+
+
+def rules(table: dict) -> types.MappingProxyType:
+    """
+    Compila una tabla método -> [(antecedente, término del consecuente), ...].
+    """
+    return types.MappingProxyType({
+        method: tuple(Rule.parse(antecedent, consequent) for antecedent, consequent in entries)
+        for method, entries in table.items()
+    })
+
+
+def override(base: types.MappingProxyType, custom_vars: dict) -> types.MappingProxyType:
+    """
+    base con las definiciones de custom_vars añadidas o reemplazadas. Se
+    compilan una sola vez por contenido de custom_vars, no por componente.
+    """
+    if not custom_vars:
+        return base
+
+    def build():
+        merged = dict(base)
+        merged.update(variables(custom_vars))
+        return types.MappingProxyType(merged)
+
+    return overrides.get_or_create((id(base), registry.fingerprint(custom_vars)), build)
+
+
+def build_rules(compiled: tuple, antecedents: dict, consequent: ctrl.Consequent) -> list:
+    return [rule.build(antecedents, consequent) for rule in compiled]
+
+
+def _build(tree, antecedents):
+    kind = tree[0]
+
+    if kind == 'term':
+        return antecedents[tree[1]][tree[2]]
+
+    if kind == 'not':
+        return ~_build(tree[1], antecedents)
+
+    left = _build(tree[1], antecedents)
+    right = _build(tree[2], antecedents)
+
+    return left & right if kind == 'and' else left | right
+
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Regla no válida: {text}")
+
+        var, term, operator = match.groups()
+        tokens.append(('term', var, term) if var else operator)
+        position = match.end()
+
+    return tokens
+
+
+def _parse_or(tokens, position, text):
+    tree, position = _parse_and(tokens, position, text)
+
+    while position < len(tokens) and tokens[position] == '|':
+        right, position = _parse_and(tokens, position + 1, text)
+        tree = ('or', tree, right)
+
+    return tree, position
+
+
+def _parse_and(tokens, position, text):
+    tree, position = _parse_unary(tokens, position, text)
+
+    while position < len(tokens) and tokens[position] == '&':
+        right, position = _parse_unary(tokens, position + 1, text)
+        tree = ('and', tree, right)
+
+    return tree, position
+
+
+def _parse_unary(tokens, position, text):
+    if position >= len(tokens):
+        raise ValueError(f"Regla no válida: {text}")
+
+    token = tokens[position]
+
+    if token == '~':
+        tree, position = _parse_unary(tokens, position + 1, text)
+        return ('not', tree), position
+
+    if token == '(':
+        tree, position = _parse_or(tokens, position + 1, text)
+        if position >= len(tokens) or tokens[position] != ')':
+            raise ValueError(f"Regla no válida: {text}")
+        return tree, position + 1
+
+    if isinstance(token, tuple):
+        return token, position + 1
+
+    raise ValueError(f"Regla no válida: {text}")
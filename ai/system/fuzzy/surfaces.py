@@ -0,0 +1,159 @@
+import itertools
+import os
+
+import numpy as np
+from loguru import logger
+
+from system.fuzzy import batch, registry
+from system.fuzzy.componentes.nutrients import NutrientLevel
+from system.fuzzy.componentes.chemical import ChemicalConditions
+from system.fuzzy.componentes.physical import PhysicalConditions
+from system.fuzzy.componentes.eutrophication import EutrophicationLevel
+
+# Componentes agregadores: todas sus entradas son niveles en [0, 1] con paso 0.01
+_AGGREGATORS = (
+    (NutrientLevel, ('nitrogen_level', 'phosphorus_level')),
+    (ChemicalConditions, ('nutrient_level', 'oxygen_balance')),
+    (PhysicalConditions, ('solids_level', 'visibility_level')),
+    (EutrophicationLevel, ('chemical_conditions', 'physical_conditions', 'additional_conditions')),
+)
+
+# Superficies cargadas en el proceso, por huella del sistema (ver registry.get_signature)
+surfaces = {}
+
+# Directorio desde el que se cargaron, para cargarlas también en otros procesos
+directory = None
+
+
+class ResponseSurface:
+    """
+    Salida defuzzificada de un sistema evaluada en todos los nodos de la malla
+    formada por los universos de sus antecedentes.
+
+    Como las funciones de pertenencia son lineales entre nodos del universo,
+    la salida se interpola multilinealmente dentro de cada celda. Las celdas
+    con algún vértice sin salida (skfuzzy falla) contienen discontinuidades y
+    se evalúan con el sistema completo.
+    """
+
+    def __init__(self, control_system, values) -> None:
+        antecedents = sorted(control_system.antecedents, key=lambda antecedent: antecedent.label)
+
+        self.control_system = control_system
+        self.labels = tuple(antecedent.label for antecedent in antecedents)
+        self.axes = tuple(antecedent.universe.astype(np.float64) for antecedent in antecedents)
+        self.values = values
+
+        if values.shape != tuple(len(axis) for axis in self.axes):
+            raise ValueError(f"La superficie no corresponde al sistema: {values.shape}")
+
+    @classmethod
+    def build(cls, control_system):
+        antecedents = sorted(control_system.antecedents, key=lambda antecedent: antecedent.label)
+        grid = np.meshgrid(*(antecedent.universe for antecedent in antecedents), indexing='ij')
+
+        values = batch.compute(
+            control_system,
+            {antecedent.label: axis.ravel() for antecedent, axis in zip(antecedents, grid)},
+        )
+
+        return cls(control_system, values.reshape(grid[0].shape))
+
+    def __call__(self, inputs: dict) -> np.ndarray:
+        lower = []
+        weights = []
+
+        for label, axis in zip(self.labels, self.axes):
+            value = np.clip(np.asarray(inputs[label], dtype=np.float64), axis[0], axis[-1])
+            index = np.clip(np.searchsorted(axis, value, side='right') - 1, 0, len(axis) - 2)
+
+            lower.append(index)
+            weights.append((value - axis[index]) / (axis[index + 1] - axis[index]))
+
+        size = len(lower[0])
+        output = np.zeros(size)
+        exact = np.zeros(size, dtype=bool)
+
+        for corner in itertools.product((0, 1), repeat=len(self.labels)):
+            value = self.values[tuple(index + offset for index, offset in zip(lower, corner))]
+            weight = np.prod([w if offset else 1.0 - w for w, offset in zip(weights, corner)], axis=0)
+
+            exact |= np.isnan(value)
+            output += weight * np.nan_to_num(value)
+
+        if exact.any():
+            output[exact] = batch.compute(
+                self.control_system,
+                {label: np.asarray(inputs[label], dtype=np.float64)[exact] for label in self.labels},
+            )
+
+        return output
+
+
+def get_surface(model):
+    """
+    Superficie cargada para el sistema de control del componente, o None.
+    """
+    if not surfaces:
+        return None
+
+    return surfaces.get(registry.get_signature(model))
+
+
+def load_surfaces(path: str) -> dict:
+    """
+    Carga las superficies de respuesta de los agregadores desde path.
+
+    Hay un artefacto .npy por subconjunto de vars disponibles de cada
+    agregador; los que faltan (o no corresponden ya al sistema) se construyen
+    y se guardan, así que la primera carga en un directorio vacío es la que
+    materializa la caché.
+
+    Parámetros:
+        path (str): Directorio de los artefactos.
+
+    Retorna:
+        dict: Huella del sistema -> ResponseSurface, también disponible en surfaces.
+    """
+    global directory
+
+    os.makedirs(path, exist_ok=True)
+    directory = path
+
+    for component, upstream in _AGGREGATORS:
+        for size in range(1, len(upstream) + 1):
+            for available in itertools.combinations(upstream, size):
+                model = component(**{var: 0.5 for var in available})
+                signature = registry.get_signature(model)
+
+                if signature in surfaces:
+                    continue
+
+                file = os.path.join(path, f"{type(model).__name__}-{'-'.join(available)}-{signature[:12]}.npy")
+
+                try:
+                    surface = ResponseSurface(model.control_system, np.load(file))
+                except (OSError, ValueError):
+                    logger.info(f"Building response surface: {os.path.basename(file)}")
+
+                    surface = ResponseSurface.build(model.control_system)
+
+                    # Escritura atómica: los workers del pool pueden estar leyendo el mismo directorio
+                    tmp_file = f'{file}.{os.getpid()}.tmp.npy'
+                    np.save(tmp_file, surface.values)
+                    os.replace(tmp_file, file)
+
+                surfaces[signature] = surface
+
+    logger.info(f"Response surfaces loaded: {len(surfaces)}")
+
+    return surfaces
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construye las superficies de respuesta de los agregadores difusos.")
+    parser.add_argument('path', help="Directorio de los artefactos .npy")
+
+    load_surfaces(parser.parse_args().path)
@@ -0,0 +1,187 @@
+import os
+
+import numpy as np
+from loguru import logger
+
+from system.fuzzy import batch, core, registry
+from system.tools.cache import LRUCache
+
+# Tablas ya validadas (o None si no alcanzaron la tolerancia), por estructura del sistema
+tables = LRUCache(maxsize=256)
+
+# Directorio donde se guardan las tablas construidas, para no reconstruirlas en
+# cada ejecución ni en cada proceso; None para mantenerlas solo en memoria
+directory = None
+
+# Subdivisiones por paso del universo que se prueban hasta cumplir la tolerancia
+_REFINEMENTS = (4, 16, 64)
+
+
+class LookupTable:
+    """
+    Salida defuzzificada precalculada sobre una malla densa de un único antecedente.
+
+    Entre dos puntos de la malla la salida se interpola linealmente. En los
+    nodos donde ninguna función de pertenencia está activa la salida no existe
+    (skfuzzy falla) y suele ser discontinua, así que se guardan los límites por
+    izquierda y por derecha, y los valores que caen sobre esos nodos se evalúan
+    con el sistema completo.
+    """
+
+    def __init__(self, control_system, label, grid, left, right, empty) -> None:
+        self.control_system = control_system
+        self.label = label
+        self.grid = grid
+        self.left = left
+        self.right = right
+        self.empty = grid[empty]
+        self.margin = np.diff(grid).min() * 1e-6
+
+    def __call__(self, values) -> np.ndarray:
+        values = np.clip(np.asarray(values, dtype=np.float64), self.grid[0], self.grid[-1])
+
+        upper = np.clip(np.searchsorted(self.grid, values, side='right'), 1, len(self.grid) - 1)
+        lower = upper - 1
+
+        x0, x1 = self.grid[lower], self.grid[upper]
+        t = (values - x0) / (x1 - x0)
+
+        output = (1.0 - t) * self.right[lower] + t * self.left[upper]
+
+        if len(self.empty):
+            nearest = np.clip(np.searchsorted(self.empty, values), 1, len(self.empty) - 1)
+            distance = np.minimum(
+                np.abs(values - self.empty[nearest - 1]),
+                np.abs(values - self.empty[nearest]),
+            )
+
+            exact = distance <= self.margin
+            if exact.any():
+                output[exact] = batch.compute(self.control_system, {self.label: values[exact]})
+
+        return output
+
+
+def get_table(model, tolerance: float = 1e-3, samples: int = 16):
+    """
+    Obtiene la tabla del sistema de control de un componente con un único antecedente.
+
+    Retorna None si el sistema tiene más de un antecedente o si la tabla no
+    alcanza la tolerancia; en ese caso se debe evaluar el sistema completo.
+    """
+    if len(list(model.control_system.antecedents)) != 1:
+        return None
+
+    signature = registry.get_signature(model)
+
+    return tables.get_or_create(
+        (signature, tolerance, samples),
+        lambda: _load_or_build(model.control_system, signature, tolerance, samples),
+    )
+
+
+def set_directory(path) -> None:
+    """
+    Guarda en path las tablas que se construyan y carga de ahí las ya
+    construidas. Las tablas solo dependen de la estructura del sistema (ver
+    registry.get_signature) y de la tolerancia, así que sirven entre ejecuciones.
+
+    Parámetros:
+        path (str): Directorio de los artefactos .npz; None para no persistirlas.
+    """
+    global directory
+
+    if path:
+        os.makedirs(path, exist_ok=True)
+
+    directory = path or None
+
+
+def build_table(control_system, tolerance: float = 1e-3, samples: int = 16):
+    """
+    Construye la tabla refinando la malla hasta cumplir la tolerancia.
+
+    El error de interpolación se mide en el punto medio de cada intervalo de la
+    malla (el peor caso) contra la evaluación vectorizada, y en una muestra
+    aleatoria de tamaño samples contra ControlSystemSimulation de skfuzzy.
+    """
+    antecedent = next(iter(control_system.antecedents))
+    universe = antecedent.universe.astype(np.float64)
+
+    rng = np.random.default_rng(0)
+    checks = rng.uniform(universe[0], universe[-1], samples)
+    expected = core.reference(control_system, {antecedent.label: checks})
+
+    for refinement in _REFINEMENTS:
+        table = _build(control_system, antecedent.label, universe, refinement)
+        midpoints = (table.grid[:-1] + table.grid[1:]) / 2.0
+
+        if (
+            _within(table(midpoints), batch.compute(control_system, {antecedent.label: midpoints}), tolerance) and
+            _within(table(checks), expected, tolerance)
+        ):
+            return table
+
+    return None
+
+
+def _load_or_build(control_system, signature, tolerance, samples):
+    if directory is None:
+        return build_table(control_system, tolerance, samples)
+
+    label = next(iter(control_system.antecedents)).label
+    file = os.path.join(directory, f"{signature}-{tolerance}-{samples}-{'-'.join(map(str, _REFINEMENTS))}.npz")
+
+    try:
+        with np.load(file) as artifact:
+            # Tabla vacía: el sistema no alcanzó la tolerancia
+            if not len(artifact['grid']):
+                return None
+
+            return LookupTable(
+                control_system, label, artifact['grid'], artifact['left'], artifact['right'], artifact['empty'],
+            )
+    except (OSError, ValueError, KeyError):
+        logger.info(f"Building lookup table: {os.path.basename(file)}")
+
+    table = build_table(control_system, tolerance, samples)
+
+    if table is None:
+        arrays = dict(grid=np.empty(0), left=np.empty(0), right=np.empty(0), empty=np.empty(0, dtype=bool))
+    else:
+        arrays = dict(grid=table.grid, left=table.left, right=table.right, empty=np.isin(table.grid, table.empty))
+
+    # Escritura atómica: otros procesos pueden estar leyendo el mismo directorio
+    tmp_file = f'{file}.{os.getpid()}.tmp.npz'
+    np.savez(tmp_file, **arrays)
+    os.replace(tmp_file, file)
+
+    return table
+
+
+def _within(values, expected, tolerance) -> bool:
+    # Ambos NaN cuenta como coincidencia: skfuzzy tampoco obtiene salida
+    same_nan = np.isnan(values) == np.isnan(expected)
+    error = np.abs(values - expected)
+
+    return bool(same_nan.all() and np.all(np.isnan(error) | (error <= tolerance)))
+
+
+def _build(control_system, label, universe, refinement):
+    steps = np.linspace(0.0, 1.0, refinement, endpoint=False)
+    grid = (universe[:-1, np.newaxis] + np.diff(universe)[:, np.newaxis] * steps).ravel()
+    grid = np.append(grid, universe[-1])
+
+    values = batch.compute(control_system, {label: grid})
+
+    left = values.copy()
+    right = values.copy()
+
+    # Límites laterales en los nodos sin salida
+    empty = np.flatnonzero(np.isnan(values))
+    if len(empty):
+        delta = np.diff(universe).min() * 1e-9
+        left[empty] = batch.compute(control_system, {label: grid[empty] - delta})
+        right[empty] = batch.compute(control_system, {label: grid[empty] + delta})
+
+    return LookupTable(control_system, label, grid, left, right, np.isnan(values))
@@ -0,0 +1,76 @@
+import contextlib
+import json
+import time
+
+from loguru import logger
+
+
+class Timings:
+    """
+    Tiempos acumulados del motor difuso por etapa de la cadena.
+
+    Separa la construcción de los componentes (build: sistema de control y
+    vars disponibles) de la evaluación (compute: inferencia y etiquetado).
+    Por etapa cuenta también las construcciones (calls, incluidas las que
+    fallan por falta de vars) y las filas evaluadas (rows); en modo batch un
+    componente responde a varias filas.
+    """
+
+    def __init__(self) -> None:
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def measure(self, stage: str, step: str, rows: int = 1):
+        """
+        Parámetros:
+            stage (str): Etapa de la cadena, p. ej. 'nitrogen_level'.
+            step (str): 'build' o 'compute'.
+            rows (int): Filas evaluadas, solo se cuentan en compute.
+        """
+        entry = self.stages.setdefault(stage, {'calls': 0, 'rows': 0, 'build': 0.0, 'compute': 0.0})
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            entry[step] += time.perf_counter() - start
+
+            if step == 'build':
+                entry['calls'] += 1
+            else:
+                entry['rows'] += rows
+
+    def merge(self, other) -> None:
+        for stage, values in other.stages.items():
+            entry = self.stages.setdefault(stage, {'calls': 0, 'rows': 0, 'build': 0.0, 'compute': 0.0})
+
+            for key, value in values.items():
+                entry[key] += value
+
+    def to_dict(self) -> dict:
+        return {
+            'build': sum(entry['build'] for entry in self.stages.values()),
+            'compute': sum(entry['compute'] for entry in self.stages.values()),
+            'stages': self.stages,
+        }
+
+    def log(self) -> None:
+        for stage, entry in self.stages.items():
+            logger.info(
+                f"Fuzzy {stage}: {entry['calls']} built in {entry['build']:.3f}s, "
+                f"{entry['rows']} rows computed in {entry['compute']:.3f}s"
+            )
+
+    def save(self, file: str) -> None:
+        with open(file, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def measure(timings, stage: str, step: str, rows: int = 1):
+    """
+    timings.measure(...), o un contexto vacío si no se están midiendo tiempos.
+    """
+    if timings is None:
+        return contextlib.nullcontext()
+
+    return timings.measure(stage, step, rows)
@@ -0,0 +1,98 @@
+import hashlib
+import inspect
+import os
+
+import pandas as pd
+import pyarrow as pa
+from loguru import logger
+
+from system.imputation import dual, grud, lstm
+
+# Módulos cuyo código (modelos, hiperparámetros, entrenamiento) determina la imputación
+_SOURCES = (dual, grud, lstm)
+
+# Argumentos de dual_imputation que solo cambian cómo se reparte el trabajo, no el resultado
+_EXECUTION_ARGS = ('concurrent', 'torch_threads', 'tf_threads')
+
+
+def fingerprint(df: pd.DataFrame, features: list[str], **kwargs) -> str:
+    """
+    Huella de contenido de una imputación: filas de df (valores e índice),
+    columnas, features, código de los imputadores y argumentos de
+    dual_imputation que afectan al resultado (pesos, modo de GRU-D, semilla).
+    """
+    digest = hashlib.sha1()
+
+    for module in _SOURCES:
+        digest.update(inspect.getsource(module).encode())
+
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr(list(features)).encode())
+    digest.update(repr(sorted((k, v) for k, v in kwargs.items() if k not in _EXECUTION_ARGS)).encode())
+
+    return digest.hexdigest()
+
+
+def dual_imputation(df: pd.DataFrame, features: list[str], directory: str, max_entries: int = 64, **kwargs) -> pd.DataFrame:
+    """
+    Igual que dual.dual_imputation(df, features, **kwargs), pero guarda el
+    resultado en directory bajo su huella (ver fingerprint) y lo reutiliza
+    cuando otro entrenamiento imputa la misma serie con los mismos ajustes.
+    Se conservan las max_entries entradas usadas más recientemente.
+
+    Parámetros:
+        df (pd.DataFrame): Serie a imputar.
+        features (list[str]): Columnas numéricas para la LSTM.
+        directory (str): Directorio de la caché, p. ej. {BASE_PATH}/imputation_cache.
+        max_entries (int): Entradas guardadas como máximo; se borran las menos usadas.
+        **kwargs: Argumentos de dual.dual_imputation.
+
+    Retorna:
+        pd.DataFrame: Serie imputada.
+    """
+    key = fingerprint(df, features, **kwargs)
+    path = f'{directory}/{key}.parquet'
+
+    if os.path.exists(path):
+        try:
+            imputed = pd.read_parquet(path)
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Imputation cache entry unreadable, imputing again: {e}")
+            _remove(path)
+        else:
+            logger.info(f"Imputation cache hit: {key}")
+            # La fecha de modificación marca el último uso, para el orden LRU de _evict
+            os.utime(path)
+            return imputed
+
+    logger.info(f"Imputation cache miss: {key}")
+
+    imputed = dual.dual_imputation(df, features, **kwargs)
+
+    # Escritura atómica: un entrenamiento concurrente nunca lee un archivo a medias
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    imputed.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+    _evict(directory, max_entries)
+
+    return imputed
+
+
+def _evict(directory: str, max_entries: int) -> None:
+    entries = [entry for entry in os.scandir(directory) if entry.name.endswith('.parquet')]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+
+    for entry in entries[max_entries:]:
+        logger.info(f"Imputation cache evicting: {entry.name}")
+        _remove(entry.path)
+
+
+def _remove(path: str) -> None:
+    # Otro entrenamiento puede haberla borrado ya
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,21 +1,100 @@
-import pandas as pd
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import tensorflow as tf
+import torch
 from system.imputation import grud, lstm
 
 
 
-def dual_imputation(data_serie, numeric_columns):
+def dual_imputation(
+    data_serie,
+    numeric_columns,
+    grud_training='step',
+    grud_chunk_size=64,
+    grud_weight=0.7,
+    lstm_weight=0.3,
+    concurrent=False,
+    torch_threads=0,
+    tf_threads=0,
+    seed=None,
+):
+    """
+    Imputa data_serie con GRU-D y LSTM y mezcla ambas en los huecos.
+
+    Con concurrent=True cada imputador se entrena en su propio proceso a la
+    vez que el otro, con torch_threads hilos intra-op para PyTorch y
+    tf_threads para TensorFlow (0 reparte los núcleos a medias). seed se
+    aplica en cada proceso, como hace el caster en el principal.
+    """
     data_serie_filled = data_serie.copy()
 
-    grud_data_imputed = grud.grud_imputation(data_serie)
+    if concurrent:
+        torch_threads, tf_threads = _thread_budgets(torch_threads, tf_threads)
+
+        with _imputer_pool(_init_torch_worker, torch_threads, seed) as grud_pool, \
+                _imputer_pool(_init_tf_worker, tf_threads, seed) as lstm_pool:
+            grud_future = grud_pool.submit(grud.grud_imputation, data_serie, training=grud_training, chunk_size=grud_chunk_size)
+            lstm_future = lstm_pool.submit(lstm.lstm_imputation, data_serie, numeric_columns)
+
+            grud_data_imputed = grud_future.result()
+            lstm_data_imputed = lstm_future.result()
+    else:
+        grud_data_imputed = grud.grud_imputation(data_serie, training=grud_training, chunk_size=grud_chunk_size)
+        lstm_data_imputed = lstm.lstm_imputation(data_serie, numeric_columns)
+
     grud_data_imputed = grud_data_imputed.reset_index(drop=True)
 
-    lstm_data_imputed = lstm.lstm_imputation(data_serie, numeric_columns)
+    # Mezcla de ambas imputaciones en todos los huecos a la vez, alineadas por etiqueta de fila
+    missing = data_serie.isnull()
+    columns = missing.columns[missing.any()]
+
+    imputed_values = grud_data_imputed.loc[data_serie.index, columns].to_numpy()
+    crazy_prediction_values = lstm_data_imputed.loc[data_serie.index, columns].to_numpy()
+    blend = (imputed_values * grud_weight) + (crazy_prediction_values * lstm_weight)
+
+    data_serie_filled[columns] = np.where(missing[columns], blend, data_serie[columns])
+
+    return data_serie_filled
+
+
+def _thread_budgets(torch_threads, tf_threads):
+    cpus = os.cpu_count() or 2
+
+    torch_threads = torch_threads or max(1, cpus // 2)
+    tf_threads = tf_threads or max(1, cpus - torch_threads)
+
+    return torch_threads, tf_threads
+
+
+def _imputer_pool(initializer, threads, seed) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initializer,
+        initargs=(threads, seed),
+    )
+
+
+def _init_torch_worker(threads, seed) -> None:
+    torch.set_num_threads(threads)
+    _set_seed(seed)
+
+
+def _init_tf_worker(threads, seed) -> None:
+    # Debe fijarse antes de que TensorFlow cree su contexto de ejecución
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    _set_seed(seed)
+
 
-    for column in data_serie.columns:
-        for index in data_serie.index:
-            if pd.isnull(data_serie.loc[index, column]):
-                imputed_value = grud_data_imputed.loc[index, column]
-                crazy_prediction_value = lstm_data_imputed.loc[index, column]
-                data_serie_filled.loc[index, column] = (imputed_value * 0.7) + (crazy_prediction_value * 0.3)
+def _set_seed(seed) -> None:
+    if seed is None:
+        return
 
-    return data_serie_filled
\ No newline at end of file
+    tf.random.set_seed(seed)
+    np.random.seed(seed)
+    random.seed(seed)
+    torch.manual_seed(seed)
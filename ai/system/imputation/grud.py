@@ -1,9 +1,16 @@
+import copy
+
 import numpy as np 
 import pandas as pd
 import torch
 import torch.nn as nn
 from sklearn.preprocessing import MinMaxScaler
 
+# Modos de entrenamiento: 'step' (toda la serie en un solo grafo por época, 100 épocas)
+# o 'chunked' (tramos de chunk_size pasos con BPTT truncado, varias series a la vez
+# y parada temprana)
+TRAINING_MODES = ('step', 'chunked')
+
 class GRUD(nn.Module):
     def __init__(self, input_size, hidden_size):
         super(GRUD, self).__init__()
@@ -43,7 +50,6 @@ class GRUD(nn.Module):
 
 def _process_data_multivariate(data):
     values = data.values
-    num_features = values.shape[1]
     time = data.index.astype(np.int64) // 10**9  # Timestamps en segundos
     time = time.values
 
@@ -52,29 +58,16 @@ def _process_data_multivariate(data):
 
     values_filled = np.nan_to_num(values)
 
-    x_last_obs = np.zeros_like(values)
-    delta_t_x = np.zeros_like(values)
-    delta_t_h = np.zeros(len(time))
-
-    for i in range(num_features):
-        first_obs_idx = np.where(mask[:, i] == 1)[0]
-        if len(first_obs_idx) > 0:
-            first_idx = first_obs_idx[0]
-            x_last_obs[first_idx, i] = values_filled[first_idx, i]
-        else:
-            first_idx = 0
+    # Índice de la última observación de cada variable hasta cada instante (0 si aún no hay ninguna)
+    rows = np.arange(len(time))[:, np.newaxis]
+    last_obs_idx = np.maximum.accumulate(np.where(mask == 1, rows, 0), axis=0)
 
-    for i in range(1, len(time)):
-        delta = time[i] - time[i - 1]
-        delta_t_h[i] = delta
+    # En t se usa la última observación anterior a t; en el primer instante, la propia fila
+    last_obs_idx = np.vstack([last_obs_idx[:1], last_obs_idx[:-1]])
 
-        for j in range(num_features):
-            if mask[i - 1, j]:
-                x_last_obs[i, j] = values_filled[i - 1, j]
-                delta_t_x[i, j] = delta
-            else:
-                x_last_obs[i, j] = x_last_obs[i - 1, j]
-                delta_t_x[i, j] = delta_t_x[i - 1, j] + delta
+    x_last_obs = np.take_along_axis(values_filled, last_obs_idx, axis=0)
+    delta_t_x = (time[:, np.newaxis] - time[last_obs_idx]).astype(float)
+    delta_t_h = np.diff(time, prepend=time[:1]).astype(float)
 
     delta_t_x = delta_t_x / delta_t_x.max()
     delta_t_h = delta_t_h / delta_t_h.max()
@@ -187,7 +180,121 @@ def _impute_grud(model, x, mask, delta_t_x, delta_t_h, x_last_obs, scaler, data_
     return imputed_data
 
 
-def grud_imputation(data_serie, hidden_size=32):
+def _stack_series(prepared):
+    # Tensores (series, tiempo, variables) con las series rellenadas al final hasta la
+    # más larga; el relleno cuenta como observado para que no entre en la pérdida
+    steps = max(len(values_filled) for values_filled, *_ in prepared)
+    arrays = [[], [], [], [], []]
+
+    for values_filled, mask, delta_t_x, delta_t_h, x_last_obs, *_ in prepared:
+        padding = steps - len(values_filled)
+
+        for array, value, fill in zip(arrays, (values_filled, mask, delta_t_x, delta_t_h, x_last_obs), (0, 1, 0, 0, 0)):
+            pad_width = [(0, padding)] + [(0, 0)] * (value.ndim - 1)
+            array.append(np.pad(value, pad_width, constant_values=fill))
+
+    return [torch.tensor(np.stack(array), dtype=torch.float32) for array in arrays]
+
+
+def _train_grud_chunked(x, mask, delta_t_x, delta_t_h, x_last_obs, hidden_size, chunk_size, max_epochs=100, patience=10, min_delta=0.0001):
+    model = GRUD(x.shape[2], hidden_size)
+    criterion = nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+
+    best_loss = np.inf
+    best_state = copy.deepcopy(model.state_dict())
+    epochs_without_improvement = 0
+
+    for epoch in range(max_epochs):
+        model.train()
+
+        h = torch.zeros(x.shape[0], hidden_size)
+        epoch_loss = 0.0
+
+        # BPTT truncado: el estado oculto pasa de un tramo al siguiente sin su grafo
+        for start in range(0, x.shape[1], chunk_size):
+            optimizer.zero_grad()
+            h = h.detach()
+            loss = 0
+
+            for t in range(start, min(start + chunk_size, x.shape[1])):
+                h, x_imputed = model(x[:, t], x_last_obs[:, t], mask[:, t], delta_t_x[:, t], delta_t_h[:, t], h)
+                loss += criterion(x_imputed * (1 - mask[:, t]), x[:, t] * (1 - mask[:, t]))
+
+            loss.backward()
+            optimizer.step()
+
+            epoch_loss += loss.item()
+
+        print(f"Epoch [{epoch+1}/{max_epochs}], Loss: {epoch_loss:.4f}")
+
+        # Parada temprana sobre la pérdida de la época, restaurando los mejores pesos
+        if epoch_loss < best_loss - min_delta:
+            best_loss = epoch_loss
+            best_state = copy.deepcopy(model.state_dict())
+            epochs_without_improvement = 0
+        else:
+            epochs_without_improvement += 1
+            if epochs_without_improvement >= patience:
+                break
+
+    model.load_state_dict(best_state)
+
+    return model
+
+
+def _impute_grud_chunked(model, x, mask, delta_t_x, delta_t_h, x_last_obs, hidden_size):
+    model.eval()
+    with torch.no_grad():
+        h = torch.zeros(x.shape[0], hidden_size)
+        imputations = torch.empty_like(x)
+
+        for t in range(x.shape[1]):
+            h, x_imputed = model(x[:, t], x_last_obs[:, t], mask[:, t], delta_t_x[:, t], delta_t_h[:, t], h)
+            imputations[:, t] = torch.where(mask[:, t] == 0, x_imputed, x[:, t])
+
+    return imputations.numpy()
+
+
+def grud_imputation_batch(data_series, hidden_size=32, chunk_size=64):
+    """
+    Imputa varias series (p. ej. varios cuerpos de agua) con un único modelo
+    GRU-D entrenado sobre todas a la vez en modo 'chunked'.
+
+    Parámetros:
+        data_series (list[pd.DataFrame]): Series con las mismas columnas, como en grud_imputation.
+        hidden_size (int): Tamaño del estado oculto.
+        chunk_size (int): Pasos de tiempo por tramo de BPTT truncado.
+
+    Retorna:
+        list[pd.DataFrame]: Serie imputada por cada serie de entrada, en el mismo orden.
+    """
+    prepared = [_prepare_data(data_serie) for data_serie in data_series]
+
+    columns = prepared[0][7]
+    if any(not columns.equals(data_columns) for *_, data_columns in prepared):
+        raise ValueError("All series must have the same columns")
+
+    tensors = _stack_series(prepared)
+    model = _train_grud_chunked(*tensors, hidden_size, chunk_size)
+    imputed_values = _impute_grud_chunked(model, *tensors, hidden_size)
+
+    imputed_series = []
+    for imputed, (values_filled, *_, scaler, data_index, data_columns) in zip(imputed_values, prepared):
+        # Invertir la escala de las imputaciones, sin las filas de relleno
+        imputed_values_rescaled = scaler.inverse_transform(imputed[:len(values_filled)])
+        imputed_series.append(pd.DataFrame(imputed_values_rescaled, index=data_index, columns=data_columns))
+
+    return imputed_series
+
+
+def grud_imputation(data_serie, hidden_size=32, training='step', chunk_size=64):
+    if training not in TRAINING_MODES:
+        raise ValueError(f"Unknown GRU-D training mode: {training}")
+
+    if training == 'chunked':
+        return grud_imputation_batch([data_serie], hidden_size, chunk_size)[0]
+
     values_filled, mask, delta_t_x, delta_t_h, x_last_obs, scaler, data_index, data_columns = _prepare_data(data_serie)
     model, x, mask, delta_t_x, delta_t_h, x_last_obs = _train_grud(values_filled, mask, delta_t_x, delta_t_h, x_last_obs, hidden_size)
     return _impute_grud(model, x, mask, delta_t_x, delta_t_h, x_last_obs, scaler, data_index, data_columns, hidden_size)
@@ -1,5 +1,10 @@
+import time
+
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import tensorflow as tf
+from loguru import logger
 
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Input
@@ -10,11 +15,16 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.impute import KNNImputer
 
 def _create_sequences(dataset, window_size):
-    X, y = [], []
-    for i in range(len(dataset) - window_size):
-        X.append(dataset[i:i+window_size])
-        y.append(dataset[i+window_size])
-    return np.array(X), np.array(y)
+    # Ventanas como vista del dataset (sin copiar): X[i] = dataset[i:i+window_size], y[i] = dataset[i+window_size]
+    dataset = np.asarray(dataset)
+
+    if len(dataset) <= window_size:
+        return np.empty((0, window_size) + dataset.shape[1:], dtype=dataset.dtype), dataset[:0]
+
+    X = sliding_window_view(dataset[:-1], window_size, axis=0).swapaxes(1, 2)
+    y = dataset[window_size:]
+
+    return X, y
 
 
 def _prepare_data(data_serie, features):
@@ -67,19 +77,32 @@ def _train_model(model, knn_data, features, window_size):
 
 
 def _predict_future(X, model, window_size, features, future_predictions_size, scaler):
+    # Paso de predicción compilado una sola vez: evita el coste fijo de model.predict en cada paso
+    predict_step = tf.function(lambda window: model(window, training=False))
+
+    # Buffer preasignado: la ventana del paso i son las filas [i, i + window_size)
+    # y su predicción se escribe justo detrás, sin realojar la secuencia
+    sequence = np.empty((window_size + future_predictions_size, len(features)), dtype=np.float32)
+    sequence[:window_size] = X[-1]
+
+    latencies = np.empty(future_predictions_size)
+
     # Generación de predicciones futuras
-    future_predictions = []
-    last_sequence = X[-1]
+    for i in range(future_predictions_size):
+        start = time.perf_counter()
+
+        next_pred = predict_step(sequence[np.newaxis, i:i + window_size])
+        sequence[window_size + i] = next_pred[0].numpy()
 
-    for _ in range(future_predictions_size):
-        # Realiza la predicción
-        next_pred = model.predict(last_sequence.reshape(1, window_size, len(features)))
+        latencies[i] = time.perf_counter() - start
 
-        # Agrega la predicción a la lista de predicciones futuras
-        future_predictions.append(next_pred[0])
+    if future_predictions_size:
+        logger.info(
+            f"LSTM imputation: {future_predictions_size} steps, first {latencies[0] * 1e3:.1f} ms, "
+            f"median {np.median(latencies) * 1e3:.2f} ms, max {latencies.max() * 1e3:.2f} ms"
+        )
 
-        # Actualiza la última secuencia:
-        last_sequence = np.append(last_sequence[1:], next_pred, axis=0)
+    future_predictions = sequence[window_size:]
 
     # Creación del DataFrame con las predicciones
     crazy_predictions = pd.DataFrame(future_predictions, columns=features)
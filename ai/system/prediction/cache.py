@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+import tensorflow as tf
+
+from system.tools.cache import LRUCache
+
+
+def _sizeof(value) -> int:
+    # Memoria aproximada de una entrada: datos de la serie o pesos del modelo
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+
+    return sum(weight.nbytes for weight in value.get_weights())
+
+
+# Modelos y series leídos por los trabajos de predicción, por (tipo, ruta, mtime, tamaño del archivo).
+# Desactivada (maxbytes=0) hasta que se llama a configure()
+artifacts = LRUCache(maxsize=64, maxbytes=0, sizeof=_sizeof)
+
+
+def configure(maxbytes: int) -> None:
+    """
+    Fija la memoria máxima de la caché; 0 la desactiva.
+
+    Parámetros:
+        maxbytes (int): Suma máxima de los tamaños en memoria de modelos y series.
+    """
+    artifacts.resize(artifacts.maxsize, maxbytes)
+
+
+def load_model(model_file: str):
+    """
+    tf.keras.models.load_model(model_file), reutilizando el modelo ya cargado
+    mientras el archivo no cambie. El modelo se comparte entre trabajos.
+    """
+    return _load('model', model_file, tf.keras.models.load_model)
+
+
+def read_parquet(data_file: str) -> pd.DataFrame:
+    """
+    pd.read_parquet(data_file), reutilizando la serie ya leída mientras el
+    archivo no cambie. La serie se comparte entre trabajos: no modificarla.
+    """
+    return _load('parquet', data_file, pd.read_parquet)
+
+
+def _load(kind, path, loader):
+    if not artifacts.maxbytes:
+        return loader(path)
+
+    stat = os.stat(path)
+    key = (kind, path, stat.st_mtime_ns, stat.st_size)
+
+    def load():
+        # Las versiones anteriores del mismo archivo ya no se pueden pedir
+        for stale in artifacts.keys():
+            if stale[:2] == (kind, path):
+                artifacts.pop(stale)
+
+        return loader(path)
+
+    return artifacts.get_or_create(key, load)
@@ -1,29 +1,43 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Input
 from tensorflow.keras.callbacks import EarlyStopping
 from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.optimizers.schedules import CosineDecay
+
+from system.prediction import cache
+
+# Tasa de aprendizaje con batch_size=1; con lotes mayores se escala por sqrt(batch_size)
+_BASE_LEARNING_RATE = 1e-4
+_MAX_EPOCHS = 1000
+_WARMUP_EPOCHS = 5
 
 
 def _create_sequences(dataset, window_size):
-    X, y = [], []
-    for i in range(len(dataset) - window_size):
-        X.append(dataset[i:i+window_size])
-        y.append(dataset[i+window_size])
-    return np.array(X), np.array(y)
+    # Ventanas como vista del dataset (sin copiar): X[i] = dataset[i:i+window_size], y[i] = dataset[i+window_size]
+    dataset = np.asarray(dataset)
 
+    if len(dataset) <= window_size:
+        return np.empty((0, window_size) + dataset.shape[1:], dtype=dataset.dtype), dataset[:0]
 
-def _create_model(window_size, features):
+    X = sliding_window_view(dataset[:-1], window_size, axis=0).swapaxes(1, 2)
+    y = dataset[window_size:]
+
+    return X, y
+
+
+def _create_model(window_size, features, learning_rate=_BASE_LEARNING_RATE):
     num_features = len(features)
 
     model = Sequential()
     model.add(Input(shape=(window_size, num_features)))  # Capa de entrada
     model.add(LSTM(64))         # Capa LSTM sin input_shape
     model.add(Dense(num_features))
-    model.compile(optimizer=Adam(learning_rate=1e-4), loss='mse')
+    model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse')
     
     return model
 
@@ -36,7 +50,59 @@ def _prepare_data(fuzz_data, features, window_size):
     return X, y
 
 
-def _train_model(model, X, y):
+def _make_dataset(dataset, window_size, batch_size, shuffle=True, cache=True, prefetch=tf.data.AUTOTUNE):
+    """
+    Ventanas (X[i], y[i]) de _create_sequences como tf.data.Dataset: se cortan
+    de la serie bajo demanda en lugar de materializar todas en memoria.
+
+    Parámetros:
+        dataset (np.ndarray): Serie (tiempo x variables).
+        window_size (int): Pasos de tiempo por ventana.
+        batch_size (int): Ventanas por lote.
+        shuffle (bool): Barajar las ventanas en cada época, como model.fit con arrays.
+        cache (bool): Guardar en memoria las ventanas tras la primera época.
+        prefetch (int): Lotes preparados por adelantado; tf.data.AUTOTUNE (-1) lo ajusta solo y 0 no precarga.
+
+    Retorna:
+        tf.data.Dataset: Lotes (X, y).
+    """
+    series = tf.constant(dataset, dtype=tf.float32)
+    num_sequences = max(len(dataset) - window_size, 0)
+
+    windows = tf.data.Dataset.range(num_sequences).map(
+        lambda i: (series[i:i + window_size], series[i + window_size]),
+        num_parallel_calls=tf.data.AUTOTUNE,
+    )
+
+    if cache:
+        windows = windows.cache()
+    if shuffle:
+        windows = windows.shuffle(max(num_sequences, 1), reshuffle_each_iteration=True)
+
+    windows = windows.batch(batch_size)
+
+    if prefetch:
+        windows = windows.prefetch(prefetch)
+
+    return windows
+
+
+def _learning_rate(batch_size, steps_per_epoch):
+    # Con batch_size=1 se mantiene la tasa fija original; con lotes mayores,
+    # calentamiento lineal hasta la tasa escalada y decaimiento coseno
+    if batch_size <= 1:
+        return _BASE_LEARNING_RATE
+
+    return CosineDecay(
+        initial_learning_rate=_BASE_LEARNING_RATE,
+        decay_steps=_MAX_EPOCHS * steps_per_epoch,
+        alpha=0.1,
+        warmup_target=_BASE_LEARNING_RATE * np.sqrt(batch_size),
+        warmup_steps=_WARMUP_EPOCHS * steps_per_epoch,
+    )
+
+
+def _train_model(model, dataset):
     
     early_stopping = EarlyStopping(
         monitor='loss',                   # Métrica a monitorear
@@ -48,10 +114,8 @@ def _train_model(model, X, y):
     )
 
     model.fit(
-        X,
-        y,
-        epochs=1000,
-        batch_size=1,
+        dataset,
+        epochs=_MAX_EPOCHS,
         callbacks=[
             early_stopping
         ]
@@ -60,34 +124,68 @@ def _train_model(model, X, y):
     return model
 
 
+def _forecast_fn(model, window_size, num_features):
+    """
+    Predicción autorregresiva compilada en un solo grafo: cada paso predice
+    con la ventana actual y la desplaza añadiendo su predicción al final.
+    """
+    @tf.function(input_signature=[
+        tf.TensorSpec((window_size, num_features), tf.float32),
+        tf.TensorSpec((), tf.int32),
+    ])
+    def forecast(window, num_predictions):
+        predictions = tf.TensorArray(tf.float32, size=num_predictions, element_shape=(num_features,))
+
+        for i in tf.range(num_predictions):
+            next_pred = model(window[tf.newaxis], training=False)[0]
+            predictions = predictions.write(i, next_pred)
+            window = tf.concat([window[1:], next_pred[tf.newaxis]], axis=0)
+
+        return predictions.stack()
+
+    return forecast
+
+
+def _forecast_fns(model) -> dict:
+    # Funciones compiladas guardadas en el propio modelo: un modelo en caché no se
+    # retraza en cada trabajo y se liberan junto con él. object.__setattr__ evita
+    # que Keras registre el dict como estado del modelo (y lo guarde con model.save)
+    try:
+        return model._forecast_fns
+    except AttributeError:
+        object.__setattr__(model, '_forecast_fns', {})
+        return model._forecast_fns
+
+
 def _predict(X, model, window_size, features, num_predictions=12):
     num_features = len(features)
 
-    # Generación de predicciones futuras
-    future_predictions = []
-    last_sequence = X[-1]
-
-    for _ in range(num_predictions):
-        next_pred = model.predict(last_sequence.reshape(1, window_size, num_features))
-        future_predictions.append(next_pred[0])
-        last_sequence = np.append(last_sequence[1:], next_pred, axis=0)
+    # Generación de predicciones futuras, todas en una sola llamada
+    forecasts = _forecast_fns(model)
+    if (window_size, num_features) not in forecasts:
+        forecasts[(window_size, num_features)] = _forecast_fn(model, window_size, num_features)
+    forecast = forecasts[(window_size, num_features)]
+    future_predictions = forecast(tf.constant(X[-1], dtype=tf.float32), tf.constant(num_predictions, dtype=tf.int32))
 
-    fuz_predictions = pd.DataFrame(future_predictions, columns=features)
+    fuz_predictions = pd.DataFrame(future_predictions.numpy(), columns=features)
 
     return fuz_predictions
 
 
-def lstm_triain(fuzz_data, window_size, features, work_dir):
-    X, y = _prepare_data(fuzz_data, features, window_size)
-    model = _create_model(window_size, features)
-    model = _train_model(model, X, y)
+def lstm_triain(fuzz_data, window_size, features, work_dir, batch_size=1, shuffle=True, cache=True, prefetch=tf.data.AUTOTUNE):
+    dataset = fuzz_data[features].values
+    steps_per_epoch = max(int(np.ceil((len(dataset) - window_size) / batch_size)), 1)
+
+    train_data = _make_dataset(dataset, window_size, batch_size, shuffle, cache, prefetch)
+    model = _create_model(window_size, features, _learning_rate(batch_size, steps_per_epoch))
+    model = _train_model(model, train_data)
 
     model.save(f'{work_dir}/model.keras')
 
 
 def only_prediction(fuzz_data, model_file, window_size, features, num_predictions=12):
     X, _ = _prepare_data(fuzz_data, features, window_size)
-    model = tf.keras.models.load_model(model_file)
+    model = cache.load_model(model_file)
     fuz_predictions = _predict(X, model, window_size, features, num_predictions)
 
     return fuz_predictions
\ No newline at end of file
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Caché en memoria con política LRU, tamaño acotado y contadores de aciertos.
+
+    Con maxbytes y sizeof (valor -> bytes) también se acota la memoria: se
+    descartan las entradas menos usadas hasta que la suma de sus tamaños
+    cabe en maxbytes.
+    """
+
+    def __init__(self, maxsize: int = 128, maxbytes: int = None, sizeof=None) -> None:
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizeof = sizeof
+        self._sizes = {}
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def get_or_create(self, key, factory):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return value
+
+        value = factory()
+        self._store(key, value)
+        self._evict()
+
+        return value
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._data.move_to_end(key)
+
+        return value
+
+    def put(self, key, value) -> None:
+        self._store(key, value)
+        self._data.move_to_end(key)
+        self._evict()
+
+    def pop(self, key, default=None):
+        self.nbytes -= self._sizes.pop(key, 0)
+
+        return self._data.pop(key, default)
+
+    def keys(self) -> list:
+        return list(self._data)
+
+    def resize(self, maxsize: int, maxbytes: int = None) -> None:
+        self.maxsize = maxsize
+        if maxbytes is not None:
+            self.maxbytes = maxbytes
+        self._evict()
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+
+        stats = {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'evictions': self.evictions,
+        }
+
+        if self.maxbytes is not None:
+            stats['nbytes'] = self.nbytes
+            stats['maxbytes'] = self.maxbytes
+
+        return stats
+
+    def _store(self, key, value) -> None:
+        self._data[key] = value
+
+        if self._sizeof is not None:
+            size = self._sizeof(value)
+            self.nbytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+
+    def _evict(self) -> None:
+        while self._data and (len(self._data) > self.maxsize or self._over_budget()):
+            key, _ = self._data.popitem(last=False)
+            self.nbytes -= self._sizes.pop(key, 0)
+            self.evictions += 1
+
+    def _over_budget(self) -> bool:
+        return self.maxbytes is not None and self.nbytes > self.maxbytes
@@ -10,11 +10,17 @@ from loguru import logger
 
 from system.commons import enums, dto
 from system.workers import train, predict
+from system.fuzzy import memo, surfaces, tables
+from system.prediction import cache as prediction_cache
 
-def process_task(redis_cli, base_path, task):
+def process_task(redis_cli, base_path, fuzzy_table_mode, fuzzy_workers, imputation, forecast, task):
     logger.info(f'Processing task: {task["id"]}')
 
     task['payload']['base_path'] = base_path
+    task['payload']['fuzzy_table_mode'] = fuzzy_table_mode
+    task['payload']['fuzzy_workers'] = fuzzy_workers
+    task['payload'].update(imputation)
+    task['payload'].update(forecast)
 
     if task['payload']['mode'] == enums.OperationMode.TRAIN.value:
         config = dto.TrainSettings(**task['payload'])
@@ -41,6 +47,24 @@ def execute(
     queue_name,
     base_path,
     seed,
+    fuzzy_table_mode=False,
+    fuzzy_surfaces_path=None,
+    fuzzy_workers=1,
+    fuzzy_memo_size=0,
+    grud_training='step',
+    grud_chunk_size=64,
+    grud_weight=0.7,
+    lstm_weight=0.3,
+    imputation_concurrent=False,
+    imputation_torch_threads=0,
+    imputation_tf_threads=0,
+    imputation_cache=True,
+    imputation_cache_size=64,
+    forecast_batch_size=1,
+    forecast_shuffle=True,
+    forecast_cache=True,
+    forecast_prefetch=-1,
+    predict_cache_mb=0,
 ) -> None:
     tf.random.set_seed(seed)
     np.random.seed(seed)
@@ -53,6 +77,41 @@ def execute(
     torch.backends.cudnn.deterministic = True
     torch.backends.cudnn.benchmark = False
 
+    # Ajustes de la imputación; la semilla se repite en los procesos de la imputación concurrente
+    imputation = dict(
+        grud_training=grud_training,
+        grud_chunk_size=grud_chunk_size,
+        grud_weight=grud_weight,
+        lstm_weight=lstm_weight,
+        imputation_concurrent=imputation_concurrent,
+        imputation_torch_threads=imputation_torch_threads,
+        imputation_tf_threads=imputation_tf_threads,
+        imputation_seed=seed,
+        imputation_cache=imputation_cache,
+        imputation_cache_size=imputation_cache_size,
+    )
+
+    # Ajustes del pipeline de entrenamiento de la LSTM de predicción (-1 en prefetch: AUTOTUNE)
+    forecast = dict(
+        forecast_batch_size=forecast_batch_size,
+        forecast_shuffle=forecast_shuffle,
+        forecast_cache=forecast_cache,
+        forecast_prefetch=forecast_prefetch,
+    )
+
+    if fuzzy_surfaces_path:
+        surfaces.load_surfaces(fuzzy_surfaces_path)
+
+    # Las tablas se construyen una vez y se reutilizan entre entrenamientos
+    if fuzzy_table_mode:
+        tables.set_directory(f'{base_path}/fuzzy_tables')
+
+    if fuzzy_memo_size:
+        memo.enable(fuzzy_memo_size)
+
+    if predict_cache_mb:
+        prediction_cache.configure(predict_cache_mb * 1024 ** 2)
+
     while True:
         try:
             _, task = redis_cli.blpop(queue_name)
@@ -68,7 +127,7 @@ def execute(
             continue
 
         try:
-            process_task(redis_cli, base_path, task_def)
+            process_task(redis_cli, base_path, fuzzy_table_mode, fuzzy_workers, imputation, forecast, task_def)
         except Exception as e:
             redis_cli.set(task_def['id'], 'FAILED')
             logger.error(f'Error processing task: {task_def["id"]}')
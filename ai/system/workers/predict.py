@@ -1,19 +1,28 @@
 import pandas as pd
-import numpy as np
 
 from loguru import logger
 
 from system.commons import enums, dto
-from system.prediction import lstm
+from system.prediction import cache, lstm
+from system.fuzzy import batch, categories
 from system.fuzzy.componentes import eutrophication, chemical, physical, aditional
 
+_LABELERS = {
+    'eutrophication_level': eutrophication.LABELER,
+    'chemical_conditions': chemical.LABELER,
+    'physical_conditions': physical.LABELER,
+    'additional_conditions': aditional.LABELER,
+}
+
+_CONDITIONS = ['chemical_conditions', 'physical_conditions', 'additional_conditions']
+
 def execute(
     *,
     config: dto.PredictSettings
 )-> None:
     logger.info("RUNNING PREDICT...")
 
-    fuz_data = pd.read_parquet(config.data_file)
+    fuz_data = cache.read_parquet(config.data_file)
     features = fuz_data.columns.tolist()
     
     predictions = lstm.only_prediction(
@@ -25,45 +34,37 @@ def execute(
     )
 
     fuz_tags = {
-        feature: [] for feature in features
+        feature: categories.label(_LABELERS[feature], predictions[feature].to_numpy()) for feature in features
     }
-    fuz_tags['inferred_eutrophication_level_tag'] = []
-
-    for i in range(predictions.shape[0]):
-
-        chemical_conditions = predictions.iloc[i]['chemical_conditions'] if 'chemical_conditions' in features else np.nan
-        physical_conditions = predictions.iloc[i]['physical_conditions'] if 'physical_conditions' in features else np.nan
-        additional_conditions = predictions.iloc[i]['additional_conditions'] if 'additional_conditions' in features else np.nan
+    fuz_tags['inferred_eutrophication_level_tag'] = infer_eutrophication_level(
+        predictions=predictions,
+        features=features
+    )
 
-        a = eutrophication.EutrophicationLevel(
-            chemical_conditions=chemical_conditions,
-            physical_conditions=physical_conditions,
-            additional_conditions=additional_conditions
-        )
-        a.calculate_inference()
-        fuz_tags['inferred_eutrophication_level_tag'].append(a.get_label())
+    fuz_tags = pd.DataFrame(fuz_tags)
+    predictions.to_parquet(config.output_file)
+    fuz_tags.to_parquet(config.output_file.replace('.parquet', '_tags.parquet'))
 
-        a.eutrophication_level = predictions.iloc[i]['eutrophication_level']
-        fuz_tags['eutrophication_level'].append(a.get_label())
+    
+    if cache.artifacts.maxbytes:
+        logger.info(f"Prediction cache: {cache.artifacts.stats()}")
 
-        if 'chemical_conditions' in features:
-            a = chemical.ChemicalConditions(0.1, 0.1)
-            a.chemical_conditions = predictions.iloc[i]['chemical_conditions']
-            fuz_tags['chemical_conditions'].append(a.get_label())
+    logger.info("FINISHED PREDICT")
 
-        if 'physical_conditions' in features:
-            a = physical.PhysicalConditions(0.1, 0.1)
-            a.physical_conditions = predictions.iloc[i]['physical_conditions']
-            fuz_tags['physical_conditions'].append(a.get_label())
 
-        if 'additional_conditions' in features:
-            a = aditional.AdditionalConditions(**{'TEMP': 0.1, 'PH': 0.1})
-            a.additional_conditions = predictions.iloc[i]['additional_conditions']
-            fuz_tags['additional_conditions'].append(a.get_label())
+def infer_eutrophication_level(
+    *,
+    predictions: pd.DataFrame,
+    features: list[str]
+) -> pd.Categorical:
+    # Todas las filas tienen las mismas condiciones disponibles: un solo
+    # sistema evaluado sobre las columnas completas
+    available = [condition for condition in _CONDITIONS if condition in features]
 
-    fuz_tags = pd.DataFrame(fuz_tags)
-    predictions.to_parquet(config.output_file)
-    fuz_tags.to_parquet(config.output_file.replace('.parquet', '_tags.parquet'))
+    model = eutrophication.EutrophicationLevel(**{condition: 0.5 for condition in available})
+    values = batch.compute(
+        model.control_system,
+        model.get_crisp_inputs({condition: predictions[condition].to_numpy() for condition in available})
+    )
 
-    
-    logger.info("FINISHED PREDICT")
\ No newline at end of file
+    return categories.label(eutrophication.LABELER, values)
@@ -4,9 +4,9 @@ from loguru import logger
 
 from system.commons import enums, dto
 from system.tools import spacer
-from system.imputation import dual
+from system.imputation import cache, dual
 from system.prediction import lstm
-from system.fuzzy import engine
+from system.fuzzy import incremental, memo, registry, timing
 
 _BASE_COLUMNS = [
     "Chl_a",
@@ -73,7 +73,7 @@ def execute(
         features=features
     )
 
-    df = impute_data(df=df, features=features)
+    df = impute_data(df=df, features=features, config=config)
 
     fuz_df, fuz_features = run_fuzzy(df=df, config=config)
 
@@ -157,11 +157,29 @@ def set_data_serie(
 def impute_data(
     *,
     df,
-    features
+    features,
+    config: dto.TrainSettings
 ) -> pd.DataFrame:
     logger.info("5. Imputing data with GRUD and LSTM...")
     
-    data_serie_filled = dual.dual_imputation(df, features)
+    kwargs = dict(
+        grud_training=config.grud_training,
+        grud_chunk_size=config.grud_chunk_size,
+        grud_weight=config.grud_weight,
+        lstm_weight=config.lstm_weight,
+        concurrent=config.imputation_concurrent,
+        torch_threads=config.imputation_torch_threads,
+        tf_threads=config.imputation_tf_threads,
+        seed=config.imputation_seed,
+    )
+
+    # Compartida por todos los estudios: la misma serie con los mismos ajustes se imputa una vez
+    if config.imputation_cache:
+        return cache.dual_imputation(
+            df, features, f'{config.base_path}/imputation_cache', config.imputation_cache_size, **kwargs
+        )
+
+    data_serie_filled = dual.dual_imputation(df, features, **kwargs)
 
     return data_serie_filled
 
@@ -173,42 +191,38 @@ def run_fuzzy(
 ) -> tuple[pd.DataFrame, list[str]]:
     logger.info("6. Running fuzzy engine...")
 
-    fuz_data_serie, _, _ = engine.execute_engine(df)
-
     fuz_vars = ['eutrophication_level', 'chemical_conditions', 'physical_conditions', 'additional_conditions']
-    fuz_data = {
-        'eutrophication_level': [],
-        'chemical_conditions': [],
-        'physical_conditions': [],
-        'additional_conditions': []
-    }
-
-    for i in fuz_data_serie:
-        for c in fuz_vars:
-            fuz_data[c].append(i[c]['value'])
-
-    fuz_data = pd.DataFrame(fuz_data)
+    timings = timing.Timings()
+
+    # Solo se evalúan las filas que cambiaron desde el último entrenamiento del estudio
+    result = incremental.execute_engine(
+        df,
+        f'{config.base_path}/{config.work_dir}/fuzzy_state.parquet',
+        batch_mode=True,
+        table_mode=config.fuzzy_table_mode,
+        workers=config.fuzzy_workers,
+        timings=timings,
+        outputs=fuz_vars,
+    )
 
-    non_null_columns = fuz_data.columns[fuz_data.notna().any()].tolist()
-    fuz_features = [col for col in fuz_vars if col in non_null_columns]
+    logger.info(f"Fuzzy systems cache: {registry.systems.stats()}")
 
-    fuz_data = fuz_data[fuz_features]
+    if memo.is_enabled():
+        logger.info(f"Fuzzy outputs memo: {memo.outputs.stats()}")
+    timings.log()
+    timings.save(f'{config.base_path}/{config.work_dir}/fuzzy_timings.json')
 
-    fuz_tags = {
-        feature: [] for feature in fuz_features
-    }
+    fuz_features = result.non_null_stages(fuz_vars)
 
-    for i in fuz_data_serie:
-        for c in fuz_features:
-            fuz_tags[c].append(i[c]['label'])
+    result.write_parquet(
+        fuz_features,
+        f'{config.base_path}/{config.work_dir}/fuzzy.parquet',
+        f'{config.base_path}/{config.work_dir}/fuzzy_tags.parquet',
+    )
 
-    fuz_tags = pd.DataFrame(fuz_tags)
-    
+    fuz_data = result.values_frame(fuz_features)
     fuz_data.info()
 
-    fuz_data.to_parquet(f'{config.base_path}/{config.work_dir}/fuzzy.parquet')
-    fuz_tags.to_parquet(f'{config.base_path}/{config.work_dir}/fuzzy_tags.parquet')
-
     return fuz_data, fuz_features
 
 
@@ -224,7 +238,11 @@ def train_model(
         fuzz_data=fuz_data,
         window_size=config.window_size,
         features=fuz_features,
-        work_dir=f'{config.base_path}/{config.work_dir}'
+        work_dir=f'{config.base_path}/{config.work_dir}',
+        batch_size=config.forecast_batch_size,
+        shuffle=config.forecast_shuffle,
+        cache=config.forecast_cache,
+        prefetch=config.forecast_prefetch,
     )
 
     return None
\ No newline at end of file
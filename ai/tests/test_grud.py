@@ -0,0 +1,80 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('torch')
+
+from system.imputation import grud
+
+DATASETS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), '..', '..', 'research', 'datasets', '*.csv')))
+
+
+def _process_data_multivariate_loop(data):
+    # Implementación original con bucles, referencia de la versión vectorizada
+    values = data.values
+    num_features = values.shape[1]
+    time = data.index.astype(np.int64) // 10**9
+    time = time.values
+
+    mask = ~np.isnan(values)
+    mask = mask.astype(float)
+
+    values_filled = np.nan_to_num(values)
+
+    x_last_obs = np.zeros_like(values)
+    delta_t_x = np.zeros_like(values)
+    delta_t_h = np.zeros(len(time))
+
+    for i in range(num_features):
+        first_obs_idx = np.where(mask[:, i] == 1)[0]
+        if len(first_obs_idx) > 0:
+            first_idx = first_obs_idx[0]
+            x_last_obs[first_idx, i] = values_filled[first_idx, i]
+
+    for i in range(1, len(time)):
+        delta = time[i] - time[i - 1]
+        delta_t_h[i] = delta
+
+        for j in range(num_features):
+            if mask[i - 1, j]:
+                x_last_obs[i, j] = values_filled[i - 1, j]
+                delta_t_x[i, j] = delta
+            else:
+                x_last_obs[i, j] = x_last_obs[i - 1, j]
+                delta_t_x[i, j] = delta_t_x[i - 1, j] + delta
+
+    delta_t_x = delta_t_x / delta_t_x.max()
+    delta_t_h = delta_t_h / delta_t_h.max()
+
+    return values_filled, mask, delta_t_x, delta_t_h, x_last_obs
+
+
+def _load(path):
+    df = pd.read_csv(path)
+    df.index = pd.to_datetime(df.pop('Sample Date'))
+
+    return df.select_dtypes('number').sort_index().astype(float)
+
+
+def _assert_same(data):
+    expected = _process_data_multivariate_loop(data)
+    actual = grud._process_data_multivariate(data)
+
+    for name, a, b in zip(('X', 'M', 'Delta_x', 'Delta_h', 'X_last_obs'), actual, expected):
+        assert a.dtype == b.dtype, name
+        np.testing.assert_array_equal(a, b, err_msg=name)
+
+
+@pytest.mark.parametrize('path', DATASETS, ids=os.path.basename)
+def test_process_data_multivariate_matches_loop(path):
+    _assert_same(_load(path))
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_process_data_multivariate_single_row():
+    data = pd.DataFrame([[1.0, np.nan, 3.0]], index=pd.to_datetime(['2020-01-01']))
+
+    _assert_same(data)
@@ -8,6 +8,7 @@ from app.core.config import settings
 from app.models.prediction import PredictionStatus
 from app.models.study import StudyStatus
 from app.core.redis import redis_client
+from app.core.tags import read_tags
 import json
 import pandas as pd
 from fastapi.responses import StreamingResponse
@@ -252,7 +253,7 @@ def download_prediction_results(
     # Cargar los dataframes
     try:
         df_prediction = pd.read_parquet(prediction_file)
-        df_prediction_tags = pd.read_parquet(prediction_tags_file)
+        df_prediction_tags = read_tags(prediction_tags_file)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al leer los archivos de resultados")
 
@@ -336,7 +337,7 @@ def get_prediction_results(
     # Cargar los dataframes
     try:
         df_prediction = pd.read_parquet(prediction_file)
-        df_prediction_tags = pd.read_parquet(prediction_tags_file)
+        df_prediction_tags = read_tags(prediction_tags_file)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al leer los archivos de resultados")
 
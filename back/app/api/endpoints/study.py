@@ -8,6 +8,7 @@ import os
 from app.core.config import settings
 import shutil
 from app.core.redis import redis_client
+from app.core.tags import read_tags
 import json
 from fastapi.responses import StreamingResponse
 from fastapi.responses import JSONResponse
@@ -284,7 +285,7 @@ def download_study_results(
     # Cargar los dataframes
     try:
         df_fuzzy = pd.read_parquet(fuzzy_file)
-        df_fuzzy_tags = pd.read_parquet(fuzzy_tags_file)
+        df_fuzzy_tags = read_tags(fuzzy_tags_file)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al leer los archivos de resultados")
 
@@ -364,7 +365,7 @@ def get_study_results(
     # Cargar los dataframes
     try:
         df_fuzzy = pd.read_parquet(fuzzy_file)
-        df_fuzzy_tags = pd.read_parquet(fuzzy_tags_file)
+        df_fuzzy_tags = read_tags(fuzzy_tags_file)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error al leer los archivos de resultados")
 
@@ -0,0 +1,16 @@
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+def read_tags(file: str) -> pd.DataFrame:
+    """
+    Lee un archivo de etiquetas difusas (*_tags.parquet) con todas sus columnas
+    como categóricas.
+
+    Los archivos actuales ya guardan las etiquetas como columnas diccionario;
+    en los anteriores (columnas de texto) se decodifican también a diccionario
+    al leerlos, así que el resultado es el mismo.
+    """
+    columns = pq.read_schema(file).names
+
+    return pq.read_table(file, read_dictionary=columns).to_pandas()